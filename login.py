@@ -1,7 +1,7 @@
 import streamlit as st
-import json
 import random  # Importa a biblioteca para funcionalidades aleatórias
 from utils.auth import verificar_credenciais
+from utils import repositorio
 
 # --- Início da Seção de Versículos ---
 # Você pode adicionar, remover ou editar versículos nesta lista facilmente
@@ -35,11 +35,7 @@ versiculos = [
 
 
 def carregar_config():
-    try:
-        with open("data/config.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"nome_igreja": "Sistema Igreja", "logo": None}
+    return repositorio.carregar("data/config.json", padrao={}) or {"nome_igreja": "Sistema Igreja", "logo": None}
 
 def login():
     config = carregar_config()
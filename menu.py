@@ -1,35 +1,19 @@
 import streamlit as st
 import importlib
-import json
 from datetime import datetime
+from utils import referencias_membros, repositorio
 
 def carregar_config():
-    try:
-        with open("data/config.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {"nome_igreja": "Nome da Igreja", "logo": "data/logo_igreja.png"}
+    return repositorio.carregar("data/config.json", padrao={}) or {"nome_igreja": "Nome da Igreja", "logo": "data/logo_igreja.png"}
 
 def carregar_membros():
-    try:
-        with open("data/membros.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return []
+    return repositorio.carregar("data/membros.json")
 
 def carregar_eventos():
-    try:
-        with open("data/eventos.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return []
+    return repositorio.carregar("data/eventos.json")
 
 def carregar_ministerios():
-    try:
-        with open("data/ministerios.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return []
+    return repositorio.carregar("data/ministerios.json")
 
 def mostrar_menu():
     config = carregar_config()
@@ -89,7 +73,7 @@ def mostrar_menu():
 
         st.subheader("💒 Ministérios")
         for minist in ministerios:
-            st.markdown(f"- {minist['nome']} - Líder: {minist.get('responsavel', 'N/A')}")
+            st.markdown(f"- {minist['nome']} - Líder: {referencias_membros.nome(minist.get('responsavel')) or 'N/A'}")
 
     elif menu in opcoes_disponiveis:
         try:
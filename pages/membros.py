@@ -1,33 +1,22 @@
 import streamlit as st
-import json
 import os
 from datetime import datetime, date
 from PIL import Image
 import uuid
 # Para aprimorar a visualização dos dados na lista
 import pandas as pd 
+from utils import busca_membros, contribuicoes, imagens, referencias_membros, repositorio
 
 # --- Configurações de Caminho ---
 CAMINHO_DADOS = "data/membros.json"
-CAMINHO_FOTOS = "data/fotos_membros"
-os.makedirs(CAMINHO_FOTOS, exist_ok=True)
+LARGURA_FOTO = 150  # largura de exibição (e da miniatura) da foto nos detalhes do membro
+TAMANHOS_PAGINA = [10, 25, 50, 100]
+TAMANHO_PAGINA_PADRAO = 25
 # --------------------------------
 
 def carregar_membros():
-    """Carrega a lista de membros do arquivo JSON."""
-    if os.path.exists(CAMINHO_DADOS):
-        try:
-            with open(CAMINHO_DADOS, "r", encoding="utf-8") as f:
-                # Garante que, se o arquivo estiver vazio, retorna uma lista vazia
-                return json.load(f) or []
-        except json.JSONDecodeError:
-            return []
-    return []
-
-def salvar_membros(membros):
-    """Salva a lista de membros no arquivo JSON."""
-    with open(CAMINHO_DADOS, "w", encoding="utf-8") as f:
-        json.dump(membros, f, indent=4, ensure_ascii=False)
+    """Carrega a lista de membros (visão somente leitura do repositório compartilhado)."""
+    return repositorio.carregar(CAMINHO_DADOS)
 
 def exibir():
     st.title("👥 Gerenciamento de Membros")
@@ -131,20 +120,15 @@ def cadastrar_membro_form():
                 st.error("Campos marcados com * são obrigatórios (Nome Completo e Função na Igreja).")
                 return
 
-            membros = carregar_membros()
             id_membro = str(uuid.uuid4())
 
             # Lógica de salvar foto
             caminho_foto_salva = ""
             if foto:
                 try:
-                    extensao = foto.name.split('.')[-1]
-                    nome_arquivo = f"{id_membro}.{extensao}"
-                    caminho_foto_salva = os.path.join(CAMINHO_FOTOS, nome_arquivo)
-                    
-                    # Salva a imagem
-                    with open(caminho_foto_salva, "wb") as f:
-                        f.write(foto.read())
+                    # Orientação corrigida, sem metadados e tamanho limitado; se o cadastro falhar,
+                    # a imagem sem registro é apagada pela coleta (utils/imagens.py)
+                    caminho_foto_salva = imagens.salvar_imagem(foto, larguras=[LARGURA_FOTO])
                     st.toast("Foto salva!", icon="📷")
                 except Exception as e:
                      st.warning(f"Erro ao salvar a foto: {e}")
@@ -172,8 +156,7 @@ def cadastrar_membro_form():
                 "cadastrado_em": str(datetime.now().strftime("%d/%m/%Y %H:%M"))
             }
 
-            membros.append(novo_membro)
-            salvar_membros(membros)
+            repositorio.inserir(CAMINHO_DADOS, novo_membro)
             st.success("✅ Membro cadastrado com sucesso! Recarregando...")
             # Não usamos st.rerun() dentro de um form, mas a mensagem é exibida.
 
@@ -195,67 +178,96 @@ def listar_membros():
     with col_status_filtro:
         filtro_status = st.selectbox("Filtrar Status", ["Todos", "Ativo", "Inativo", "Afastado"], index=0)
 
-    # Lógica de Filtragem
-    membros_filtrados = membros
+    # Lógica de Filtragem (a busca usa o índice de utils/busca_membros.py: sem acentos,
+    # por início ou trecho do nome e pelos dígitos do CPF/telefone, mais relevantes primeiro)
+    membros_filtrados = busca_membros.buscar(busca) if busca.strip() else membros
     if filtro_status != "Todos":
         membros_filtrados = [m for m in membros_filtrados if m.get("status") == filtro_status]
 
-    if busca:
-        busca_lower = busca.lower()
-        membros_filtrados = [
-            m for m in membros_filtrados 
-            if busca_lower in m["nome"].lower() or 
-               busca_lower in m.get("cpf", "").lower() or 
-               busca_lower in m.get("telefone", "").lower()
-        ]
-
-    st.info(f"Mostrando **{len(membros_filtrados)}** de **{len(membros)}** membros.")
-    
     if not membros_filtrados:
+        st.info(f"Mostrando **0** de **{len(membros)}** membros.")
         st.warning("Nenhum membro encontrado com os filtros aplicados.")
         return
 
-    # Melhoria: Tabela de resumo (para visibilidade rápida)
-    df_membros = pd.DataFrame(membros_filtrados)
-    df_exibicao = df_membros[['nome', 'funcao', 'status', 'telefone', 'cidade']]
+    # Paginação no servidor: só a página atual vai para a tabela e só o membro aberto ganha
+    # painel de detalhes (foto, endereço, JSON); a sessão guarda apenas a página e o membro em edição
+    col_resumo, col_tamanho = st.columns([3, 1])
+    with col_tamanho:
+        tamanho_pagina = st.selectbox("Membros por página", TAMANHOS_PAGINA, index=TAMANHOS_PAGINA.index(TAMANHO_PAGINA_PADRAO))
+
+    recorte = (busca, filtro_status, tamanho_pagina)
+    if st.session_state.get("recorte_membros") != recorte:
+        # Nova busca, filtro ou tamanho de página: volta para a primeira página e fecha o membro aberto
+        st.session_state["recorte_membros"] = recorte
+        st.session_state["pagina_membros"] = 1
+        st.session_state.pop("tabela_membros", None)
+
+    total_paginas = -(-len(membros_filtrados) // tamanho_pagina)
+    pagina = min(st.session_state.get("pagina_membros", 1), total_paginas)
+    inicio = (pagina - 1) * tamanho_pagina
+    membros_pagina = membros_filtrados[inicio:inicio + tamanho_pagina]
+
+    col_resumo.info(f"Mostrando **{inicio + 1}–{inicio + len(membros_pagina)}** de **{len(membros_filtrados)}** membros encontrados ({len(membros)} cadastrados).")
+
+    # Melhoria: Tabela de resumo (selecione uma linha para abrir o membro)
+    df_exibicao = pd.DataFrame(membros_pagina, columns=['nome', 'funcao', 'status', 'telefone', 'cidade'])
     df_exibicao.columns = ['Nome', 'Função', 'Status', 'Telefone', 'Cidade']
-    st.dataframe(df_exibicao, use_container_width=True, hide_index=True)
-    
+    st.dataframe(df_exibicao, use_container_width=True, hide_index=True,
+                 on_select="rerun", selection_mode="single-row", key="tabela_membros")
+
+    col_anterior, col_pagina, col_proxima = st.columns([1, 2, 1])
+    if col_anterior.button("⬅️ Anterior", disabled=pagina <= 1, use_container_width=True):
+        mudar_pagina_membros(pagina - 1)
+    col_pagina.markdown(f"<div style='text-align: center'>Página <b>{pagina}</b> de <b>{total_paginas}</b></div>", unsafe_allow_html=True)
+    if col_proxima.button("Próxima ➡️", disabled=pagina >= total_paginas, use_container_width=True):
+        mudar_pagina_membros(pagina + 1)
+
     st.markdown("---")
 
-    # Exibição Detalhada e Edição/Exclusão
-    for membro in membros_filtrados:
-        # A chave de estado para controle de edição é crucial
-        if f"editando_{membro['id']}" not in st.session_state:
-            st.session_state[f"editando_{membro['id']}"] = False
+    # Exibição Detalhada e Edição/Exclusão (apenas do membro aberto)
+    id_editando = st.session_state.get("membro_editando")
+    membro_editando = repositorio.buscar(CAMINHO_DADOS, id_editando) if id_editando else None
+    if membro_editando:
+        # --- Modo de Edição ---
+        exibir_form_edicao(membro_editando)
+        return
 
-        if st.session_state[f"editando_{membro['id']}"]:
-            # --- Modo de Edição ---
-            exibir_form_edicao(membro, membros)
-            
-        else:
-            # --- Modo de Visualização ---
-            with st.expander(f"**{membro['nome']}** ({membro.get('funcao', '')}) - Status: {membro.get('status', '')}", expanded=False):
-                col_info, col_botoes = st.columns([3, 1])
-                
-                with col_botoes:
-                    if st.button("✏️ Editar", key=f"btn_editar_{membro['id']}", use_container_width=True):
-                        st.session_state[f"editando_{membro['id']}"] = True
-                        st.rerun() # Recarrega para mostrar o formulário de edição
-
-                    if st.button("🗑️ Excluir", key=f"btn_excluir_{membro['id']}", use_container_width=True):
-                        excluir_membro(membro, membros)
-                        
-                with col_info:
-                    exibir_detalhes_membro(membro)
+    linhas = (st.session_state.get("tabela_membros") or {}).get("selection", {}).get("rows", [])
+    if not linhas or linhas[0] >= len(membros_pagina):
+        st.caption("Selecione um membro na tabela para ver os detalhes.")
+        return
+
+    # --- Modo de Visualização ---
+    membro = membros_pagina[linhas[0]]
+    with st.container(border=True):
+        st.markdown(f"### {membro['nome']} ({membro.get('funcao', '')}) - Status: {membro.get('status', '')}")
+        col_info, col_botoes = st.columns([3, 1])
+
+        with col_botoes:
+            if st.button("✏️ Editar", key="btn_editar_membro", use_container_width=True):
+                st.session_state["membro_editando"] = membro["id"]
+                st.rerun() # Recarrega para mostrar o formulário de edição
+
+            if st.button("🗑️ Excluir", key="btn_excluir_membro", use_container_width=True):
+                excluir_membro(membro)
+
+        with col_info:
+            exibir_detalhes_membro(membro)
+
+def mudar_pagina_membros(pagina):
+    """Vai para outra página da lista (a seleção da tabela é da página anterior e é descartada)."""
+    st.session_state["pagina_membros"] = pagina
+    st.session_state.pop("tabela_membros", None)
+    st.rerun()
 
 def exibir_detalhes_membro(membro):
-    """Exibe os detalhes de um membro dentro do expander."""
+    """Exibe os detalhes do membro aberto na lista."""
     cols_detalhe = st.columns([1, 2])
     
     # Coluna 1: Foto
-    if membro.get("foto") and os.path.exists(membro["foto"]):
-        cols_detalhe[0].image(membro["foto"], width=150)
+    miniatura = imagens.miniatura(membro.get("foto"), LARGURA_FOTO)
+    if miniatura:
+        cols_detalhe[0].image(miniatura, width=LARGURA_FOTO)
     else:
         cols_detalhe[0].markdown("🖼️ **Sem Foto**")
 
@@ -279,9 +291,16 @@ def exibir_detalhes_membro(membro):
         
         st.markdown(f"**Endereço:** {membro.get('rua', '')}, {membro.get('numero', '')} - {membro.get('bairro', '')}, {membro.get('cidade', '')} - {membro.get('estado', '')} | CEP: {membro.get('cep', '')}")
         st.markdown(f"**Observações:** *{membro.get('observacoes', 'Nenhuma.')}*")
+
+        # Vínculos pelos índices reversos (id do membro -> ministérios, turmas e contribuições)
+        ministerios = [m["nome"] for m in referencias_membros.ministerios_do_membro(membro["id"])]
+        turmas = [t["nome"] for t in referencias_membros.turmas_do_membro(membro["id"])]
+        contribuicao = contribuicoes.do_membro(membro["id"], date.today().year)
+        st.markdown(f"**Ministérios:** {', '.join(ministerios) or 'Nenhum'} | **Turmas:** {', '.join(turmas) or 'Nenhuma'}")
+        st.markdown(f"**Dízimos em {date.today().year}:** R$ {contribuicao['total']:,.2f} ({contribuicao['quantidade']} lançamento(s))")
         st.caption(f"Cadastrado em: {membro.get('cadastrado_em', 'N/A')}")
 
-def exibir_form_edicao(membro, membros):
+def exibir_form_edicao(membro):
     """Formulário de edição para um membro específico."""
     st.subheader(f"✏️ Editando: {membro['nome']}")
     with st.form(f"form_editar_{membro['id']}"):
@@ -343,7 +362,7 @@ def exibir_form_edicao(membro, membros):
         cancelar = col_cancelar.form_submit_button("❌ Cancelar Edição", use_container_width=True)
 
         if salvar:
-            membro.update({
+            repositorio.atualizar(CAMINHO_DADOS, membro["id"], {
                 "nome": nome_edit, "cpf": cpf_edit, "rg": rg_edit,
                 "nascimento": str(nascimento_edit), "funcao": funcao_edit,
                 "status": status_edit, "telefone": telefone_edit, 
@@ -352,21 +371,19 @@ def exibir_form_edicao(membro, membros):
                 "cidade": cidade_edit, "estado": estado_edit,
                 "observacoes": observacoes_edit,
             })
-            salvar_membros(membros)
             st.success("✅ Membro atualizado com sucesso!")
-            st.session_state[f"editando_{membro['id']}"] = False
+            st.session_state["membro_editando"] = None
             st.rerun()
             
         if cancelar:
-            st.session_state[f"editando_{membro['id']}"] = False
+            st.session_state["membro_editando"] = None
             st.rerun()
 
-def excluir_membro(membro, membros):
+def excluir_membro(membro):
     """Remove um membro e sua foto (se existir)."""
-    membros[:] = [m for m in membros if m["id"] != membro["id"]]
-    salvar_membros(membros)
-    if membro.get("foto") and os.path.exists(membro["foto"]):
-        os.remove(membro["foto"])
+    repositorio.remover(CAMINHO_DADOS, membro["id"])
+    imagens.coletar_lixo()  # a foto sai se nenhum outro registro a usa
+    st.session_state.pop("tabela_membros", None)  # a linha selecionada era a do membro excluído
     st.success(f"Membro **{membro['nome']}** excluído com sucesso.")
     st.rerun()
 
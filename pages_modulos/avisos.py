@@ -1,11 +1,10 @@
 import streamlit as st
-import os
-import json
 import uuid
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from utils import referencias_membros, repositorio
 
 CAMINHO_AVISOS = "data/avisos.json"
 CAMINHO_MINISTERIOS = "data/ministerios.json"
@@ -15,29 +14,13 @@ EMAIL_REMETENTE = "combavecarapebus@gmail.com"
 SENHA_APP = "pmlzkbcbexzdokjo"
 
 def carregar_avisos():
-    if os.path.exists(CAMINHO_AVISOS):
-        with open(CAMINHO_AVISOS, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return []
-    return []
-
-def salvar_avisos(lista):
-    with open(CAMINHO_AVISOS, "w", encoding="utf-8") as f:
-        json.dump(lista, f, indent=4, ensure_ascii=False)
+    return repositorio.carregar(CAMINHO_AVISOS)
 
 def carregar_membros():
-    if os.path.exists(CAMINHO_MEMBROS):
-        with open(CAMINHO_MEMBROS, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return repositorio.carregar(CAMINHO_MEMBROS)
 
 def carregar_ministerios():
-    if os.path.exists(CAMINHO_MINISTERIOS):
-        with open(CAMINHO_MINISTERIOS, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return repositorio.carregar(CAMINHO_MINISTERIOS)
 
 def enviar_emails(destinatarios_emails, titulo, mensagem, autor):
     smtp_server = "smtp.gmail.com"
@@ -81,7 +64,7 @@ def exibir():
     membros = carregar_membros()
 
     nomes_ministerios = [m["nome"] for m in ministerios]
-    nomes_membros = [m["nome"] for m in membros]
+    ids_membros = [m["id"] for m in membros]
 
     if aba == "➕ Novo Aviso":
         with st.form("form_aviso", clear_on_submit=True):
@@ -100,9 +83,11 @@ def exibir():
                 emails_destino = [m.get("email") for m in membros if m.get("funcao") == ministerio and m.get("email")]
 
             elif destinatario_tipo == "Selecionar Membros":
-                membros_escolhidos = st.multiselect("Escolha os Membros", nomes_membros)
+                membros_escolhidos = st.multiselect("Escolha os Membros", ids_membros, format_func=referencias_membros.rotulo)
                 destinatarios = membros_escolhidos
-                emails_destino = [m.get("email") for m in membros if m["nome"] in membros_escolhidos and m.get("email")]
+                emails_destino = [
+                    m.get("email") for m in map(referencias_membros.membro, membros_escolhidos) if m and m.get("email")
+                ]
 
             else:
                 destinatarios = ["Todos"]
@@ -123,8 +108,7 @@ def exibir():
                         "tipo_destinatario": destinatario_tipo,
                         "data_envio": str(datetime.now())
                     }
-                    avisos.append(aviso)
-                    salvar_avisos(avisos)
+                    repositorio.inserir(CAMINHO_AVISOS, aviso)
 
                     if emails_destino:
                         enviar_emails(emails_destino, titulo, mensagem, autor)
@@ -143,7 +127,10 @@ def exibir():
             with st.expander(f"{aviso['titulo']} — por {aviso['autor']}"):
                 st.markdown(f"**🕒 Enviado em:** {aviso['data_envio']}")
                 st.markdown(f"**📨 Destinatários ({aviso['tipo_destinatario']}):**")
-                for d in aviso['destinatarios']:
+                destinatarios = aviso['destinatarios']
+                if aviso['tipo_destinatario'] == referencias_membros.AVISO_PARA_MEMBROS:
+                    destinatarios = referencias_membros.nomes(destinatarios)
+                for d in destinatarios:
                     st.markdown(f"- {d}")
                 st.markdown("---")
                 st.markdown("**📝 Mensagem:**")
@@ -151,7 +138,6 @@ def exibir():
 
                 col1, col2 = st.columns([1, 1])
                 if col1.button("🗑️ Excluir", key=f"del_{aviso['id']}"):
-                    avisos = [a for a in avisos if a["id"] != aviso["id"]]
-                    salvar_avisos(avisos)
+                    repositorio.remover(CAMINHO_AVISOS, aviso["id"])
                     st.success("Aviso excluído.")
                     st.rerun()
\ No newline at end of file
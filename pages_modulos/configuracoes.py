@@ -1,28 +1,21 @@
 import streamlit as st
 import os
-import json
 from PIL import Image
+from utils import repositorio, respostas_formularios
 
 CAMINHO_CONFIG = "data/config.json"
 CAMINHO_LOGO = "data/logo_igreja.png"
 
 def carregar_config():
-    if os.path.exists(CAMINHO_CONFIG):
-        with open(CAMINHO_CONFIG, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-    return {}
+    return repositorio.carregar(CAMINHO_CONFIG, padrao={})
 
 def salvar_config(config):
-    with open(CAMINHO_CONFIG, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=4, ensure_ascii=False)
+    repositorio.salvar(CAMINHO_CONFIG, config)
 
 def exibir():
     st.title("⚙️ Configurações do Sistema")
 
-    config = carregar_config()
+    config = dict(carregar_config())  # cópia editável
 
     nome_atual = config.get("nome_igreja", "")
     email_atual = config.get("email_igreja", "")
@@ -69,4 +62,21 @@ def exibir():
                     f.write(nova_logo.read())
 
             st.success("✅ Configurações atualizadas com sucesso!")
-            st.rerun()
\ No newline at end of file
+            st.rerun()
+
+    st.markdown("---")
+    with st.expander("📊 Desempenho do cache de dados"):
+        estatisticas = repositorio.estatisticas()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Leituras em cache", estatisticas["acertos"])
+        col2.metric("Leituras do disco", estatisticas["falhas"])
+        col3.metric("Taxa de acerto", f"{estatisticas['taxa_acerto']:.0%}")
+        st.caption(f"Armazenamento: {repositorio.ARMAZENAMENTO} | Coleções em memória: {estatisticas['colecoes_em_cache']} | Gravações: {estatisticas['escritas']}")
+
+    with st.expander("📨 Fila de gravação das respostas de formulários"):
+        fila = respostas_formularios.metricas_fila()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Na fila agora", fila["profundidade"])
+        col2.metric("Latência média do lote", f"{fila['latencia_media_ms']:.1f} ms")
+        col3.metric("Respostas por lote", f"{fila['media_por_lote']:.1f}")
+        st.caption(f"Lotes gravados: {fila['lotes']} | Respostas gravadas: {fila['respostas']} | Maior lote: {fila['maior_lote']} | Último lote: {fila['latencia_ultima_ms']:.1f} ms | Reenvios descartados: {fila['duplicadas']}")
\ No newline at end of file
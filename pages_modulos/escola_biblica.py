@@ -1,30 +1,16 @@
 import streamlit as st
-import os
-import json
 import uuid
 from datetime import datetime
+from utils import referencias_membros, repositorio
 
 CAMINHO_TURMAS = "data/escola_biblica.json"
 CAMINHO_MEMBROS = "data/membros.json"
 
 def carregar_turmas():
-    if os.path.exists(CAMINHO_TURMAS):
-        with open(CAMINHO_TURMAS, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return []
-    return []
-
-def salvar_turmas(lista):
-    with open(CAMINHO_TURMAS, "w", encoding="utf-8") as f:
-        json.dump(lista, f, indent=4, ensure_ascii=False)
+    return repositorio.carregar(CAMINHO_TURMAS)
 
 def carregar_membros():
-    if os.path.exists(CAMINHO_MEMBROS):
-        with open(CAMINHO_MEMBROS, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return repositorio.carregar(CAMINHO_MEMBROS)
 
 def exibir():
     st.title("📚 Escola Bíblica / Discipulado")
@@ -32,15 +18,15 @@ def exibir():
     aba = st.radio("Selecione:", ["➕ Nova Turma", "📋 Turmas Cadastradas"])
     turmas = carregar_turmas()
     membros = carregar_membros()
-    nomes_membros = [m["nome"] for m in membros]
+    ids_membros = [m["id"] for m in membros]
 
     if aba == "➕ Nova Turma":
         with st.form("form_turma", clear_on_submit=True):
             nome = st.text_input("Nome da Turma")
-            professor_nome = st.selectbox("Professor Responsável", nomes_membros)
+            professor_id = st.selectbox("Professor Responsável", ids_membros, format_func=referencias_membros.rotulo)
             dia_semana = st.selectbox("Dia da Semana", ["Domingo", "Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"])
             horario = st.time_input("Horário da Aula")
-            alunos = st.multiselect("Alunos", nomes_membros)
+            alunos = st.multiselect("Alunos", ids_membros, format_func=referencias_membros.rotulo)
             descricao = st.text_area("Descrição / Observações")
 
             enviado = st.form_submit_button("💾 Salvar Turma")
@@ -49,15 +35,14 @@ def exibir():
                 nova_turma = {
                     "id": str(uuid.uuid4()),
                     "nome": nome,
-                    "professor": professor_nome,
+                    "professor": professor_id,
                     "dia_semana": dia_semana,
                     "horario": str(horario),
                     "alunos": alunos,
                     "descricao": descricao,
                     "criado_em": str(datetime.now())
                 }
-                turmas.append(nova_turma)
-                salvar_turmas(turmas)
+                repositorio.inserir(CAMINHO_TURMAS, nova_turma)
                 st.success("✅ Turma cadastrada com sucesso!")
                 st.rerun()
 
@@ -67,18 +52,17 @@ def exibir():
             return
 
         for turma in turmas:
-            with st.expander(f"{turma['nome']} — Prof: {turma['professor']}"):
+            with st.expander(f"{turma['nome']} — Prof: {referencias_membros.nome(turma['professor'])}"):
                 st.markdown(f"📆 **Dia/Horário:** {turma['dia_semana']} às {turma['horario']}")
                 st.markdown(f"📝 **Descrição:** {turma['descricao']}")
                 st.markdown(f"👥 **Alunos ({len(turma['alunos'])}):**")
-                for aluno in turma["alunos"]:
+                for aluno in referencias_membros.nomes(turma["alunos"]):
                     st.markdown(f"- {aluno}")
                 st.markdown(f"_Criado em: {turma['criado_em']}_")
 
                 col1, col2 = st.columns([1, 1])
                 if col1.button("🗑️ Excluir", key=f"del_{turma['id']}"):
-                    turmas = [t for t in turmas if t["id"] != turma["id"]]
-                    salvar_turmas(turmas)
+                    repositorio.remover(CAMINHO_TURMAS, turma["id"])
                     st.success("Turma excluída.")
                     st.rerun()
 
@@ -91,23 +75,30 @@ def exibir():
             turma = next((t for t in turmas if t["id"] == st.session_state["editando_turma"]), None)
             if turma:
                 st.subheader(f"✏️ Editar Turma: {turma['nome']}")
+                # Referências sem membro (nomes antigos, homônimos ou membros removidos) continuam
+                # como opção selecionada, para não serem trocadas ou perdidas ao salvar
+                opcoes_professor = ids_membros if turma["professor"] in ids_membros or not turma["professor"] else [turma["professor"], *ids_membros]
+                opcoes_alunos = list(dict.fromkeys([*ids_membros, *turma["alunos"]]))
                 with st.form("form_editar_turma"):
                     nome = st.text_input("Nome da Turma", value=turma["nome"])
-                    professor_nome = st.selectbox("Professor Responsável", nomes_membros, index=nomes_membros.index(turma["professor"]))
+                    professor_id = st.selectbox("Professor Responsável", opcoes_professor, format_func=referencias_membros.rotulo,
+                                                index=opcoes_professor.index(turma["professor"]) if turma["professor"] in opcoes_professor else 0)
                     dia_semana = st.selectbox("Dia da Semana", ["Domingo", "Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"], index=["Domingo", "Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"].index(turma["dia_semana"]))
                     horario = st.time_input("Horário da Aula")
-                    alunos = st.multiselect("Alunos", nomes_membros, default=turma["alunos"])
+                    alunos = st.multiselect("Alunos", opcoes_alunos, format_func=referencias_membros.rotulo,
+                                            default=list(dict.fromkeys(turma["alunos"])))
                     descricao = st.text_area("Descrição / Observações", value=turma["descricao"])
                     salvar = st.form_submit_button("💾 Salvar Alterações")
 
                     if salvar:
-                        turma["nome"] = nome
-                        turma["professor"] = professor_nome
-                        turma["dia_semana"] = dia_semana
-                        turma["horario"] = str(horario)
-                        turma["alunos"] = alunos
-                        turma["descricao"] = descricao
-                        salvar_turmas(turmas)
+                        repositorio.atualizar(CAMINHO_TURMAS, turma["id"], {
+                            "nome": nome,
+                            "professor": professor_id,
+                            "dia_semana": dia_semana,
+                            "horario": str(horario),
+                            "alunos": alunos,
+                            "descricao": descricao,
+                        })
                         st.success("Turma atualizada com sucesso!")
                         del st.session_state["editando_turma"]
                         st.rerun()
\ No newline at end of file
@@ -1,30 +1,18 @@
 import streamlit as st
 import os
-import json
 import uuid
 from datetime import datetime, date
+from utils import repositorio
 
 CAMINHO_EVENTOS = "data/eventos.json"
 
 def carregar_eventos():
-    """Carrega a lista de eventos do arquivo JSON."""
-    if os.path.exists(CAMINHO_EVENTOS):
-        with open(CAMINHO_EVENTOS, "r", encoding="utf-8") as f:
-            try:
-                # Retorna a lista, ou uma lista vazia se o arquivo estiver vazio
-                return json.load(f) or [] 
-            except json.JSONDecodeError:
-                return []
-    return []
-
-def salvar_eventos(eventos):
-    """Salva a lista de eventos no arquivo JSON."""
-    with open(CAMINHO_EVENTOS, "w", encoding="utf-8") as f:
-        json.dump(eventos, f, indent=4, ensure_ascii=False)
+    """Carrega a lista de eventos (visão somente leitura do repositório compartilhado)."""
+    return repositorio.carregar(CAMINHO_EVENTOS)
 
 # --- Funções Auxiliares de Exibição ---
 
-def exibir_form_cadastro(eventos):
+def exibir_form_cadastro():
     """Exibe o formulário de cadastro de novo evento com layout em colunas."""
     st.subheader("➕ Novo Evento")
     
@@ -68,8 +56,7 @@ def exibir_form_cadastro(eventos):
                 "descricao": descricao,
                 "criado_em": datetime.now().strftime("%d/%m/%Y %H:%M")
             }
-            eventos.append(novo_evento)
-            salvar_eventos(eventos)
+            repositorio.inserir(CAMINHO_EVENTOS, novo_evento)
             st.session_state["evento_sucesso"] = True
             st.rerun()
 
@@ -121,7 +108,7 @@ def listar_eventos(eventos):
 
         if st.session_state[f"editando_{evento['id']}"]:
             # --- Modo de Edição ---
-            exibir_form_edicao(evento, eventos)
+            exibir_form_edicao(evento)
         else:
             # --- Modo de Visualização ---
             data_formatada = datetime.strptime(evento['data'], "%Y-%m-%d").strftime("%d/%m/%Y")
@@ -144,12 +131,11 @@ def listar_eventos(eventos):
                         st.rerun()
 
                     if col_botoes.button("🗑️ Excluir", key=f"btn_excluir_{evento['id']}", use_container_width=True, type="secondary"):
-                        eventos = [e for e in eventos if e["id"] != evento["id"]]
-                        salvar_eventos(eventos)
+                        repositorio.remover(CAMINHO_EVENTOS, evento["id"])
                         st.success("Evento excluído com sucesso.")
                         st.rerun()
 
-def exibir_form_edicao(evento, eventos):
+def exibir_form_edicao(evento):
     """Formulário para editar um evento."""
     st.subheader(f"✏️ Editando: {evento['titulo']}")
 
@@ -184,20 +170,14 @@ def exibir_form_edicao(evento, eventos):
                 st.error("O Título e o Responsável são obrigatórios.")
                 return
 
-            # Encontra e atualiza o evento na lista
-            for i, e in enumerate(eventos):
-                if e["id"] == evento["id"]:
-                    eventos[i].update({
-                        "titulo": titulo_edit,
-                        "data": str(data_edit),
-                        "horario": str(horario_edit),
-                        "local": local_edit,
-                        "responsavel": responsavel_edit,
-                        "descricao": descricao_edit,
-                    })
-                    break
-            
-            salvar_eventos(eventos)
+            repositorio.atualizar(CAMINHO_EVENTOS, evento["id"], {
+                "titulo": titulo_edit,
+                "data": str(data_edit),
+                "horario": str(horario_edit),
+                "local": local_edit,
+                "responsavel": responsavel_edit,
+                "descricao": descricao_edit,
+            })
             st.success("✅ Evento atualizado com sucesso!")
             st.session_state[f"editando_{evento['id']}"] = False
             st.rerun()
@@ -216,7 +196,7 @@ def exibir():
     st.markdown("---")
 
     if aba == "➕ Novo Evento":
-        exibir_form_cadastro(eventos)
+        exibir_form_cadastro()
 
     elif aba == "📋 Lista de Eventos":
         listar_eventos(eventos)
@@ -1,41 +1,47 @@
 import streamlit as st
-import os
+import hashlib
 import json
+import threading
 import uuid
-from datetime import datetime, date
+from collections import OrderedDict
+from datetime import datetime, date, timedelta
 from io import BytesIO
+from xml.sax.saxutils import escape
 import pandas as pd
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from utils import importacao_extrato, livro_caixa, referencias_membros, repositorio
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 
-CAMINHO_FINANCEIRO = "data/financeiro.json"
 CAMINHO_MEMBROS = "data/membros.json"
 
 # Categorias aprimoradas
 CATEGORIAS_ENTRADA = ["Dízimo", "Oferta", "Doação Específica", "Renda de Eventos", "Outra Receita"]
 CATEGORIAS_SAIDA = ["Aluguel/IPTU", "Luz/Água/Telefone", "Salários/Pró-Labore", "Manutenção/Reformas", "Missões", "Ação Social", "Outra Despesa"]
+# Regras da importação de extratos: {categoria: expressão regular na descrição sem acentos, em minúsculas}
+REGRAS_ENTRADA = {
+    "Dízimo": r"dizimo",
+    "Oferta": r"oferta",
+    "Doação Específica": r"doacao",
+    "Renda de Eventos": r"evento|bazar|cantina|inscric",
+}
+REGRAS_SAIDA = {
+    "Aluguel/IPTU": r"aluguel|iptu|condominio",
+    "Luz/Água/Telefone": r"energia|\bluz\b|enel|cemig|copel|light|sabesp|\bagua\b|saneamento|telefon|internet|\bvivo\b|\bclaro\b",
+    "Salários/Pró-Labore": r"salario|folha|pro.?labore|prebenda|\binss\b|fgts",
+    "Manutenção/Reformas": r"manutencao|reforma|material de construcao|eletricista|encanador",
+    "Missões": r"miss(?:ao|oes|ionari)",
+    "Ação Social": r"cesta basica|acao social",
+}
+# PDFs já gerados, do mais antigo ao mais recente uso: {hash do recorte: bytes}
+LIMITE_CACHE_PDF_BYTES = 20 * 1024 * 1024
+_cache_pdf = OrderedDict()
+_trava_pdf = threading.Lock()
+
+COLUNAS_MOVIMENTO = ["id", "data", "tipo", "categoria", "valor", "descricao", "dizimista", "mes_referencia", "observacoes"]
 MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
 
-# --- Funções de Leitura/Escrita ---
-
-def carregar_json(caminho):
-    """Carrega a lista de dados do arquivo JSON."""
-    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
-    if os.path.exists(caminho):
-        try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                return json.load(f) or []
-        except json.JSONDecodeError:
-            return []
-    return []
-
-def salvar_json(dados, caminho):
-    """Salva a lista de dados no arquivo JSON."""
-    with open(caminho, "w", encoding="utf-8") as f:
-        json.dump(dados, f, indent=4, ensure_ascii=False)
-
 # --- Funções de Relatório PDF ---
 
 def gerar_pdf_analise(dados):
@@ -68,23 +74,102 @@ def gerar_pdf_analise(dados):
             d.get("descricao", "-")
         ])
 
-    tabela = Table(dados_tabela, colWidths=[60, 40, 90, 60, 150], repeatRows=1)
+    tabela = _tabela_pdf(dados_tabela, [60, 40, 90, 60, 150], coluna_valor=3)
+    elements.append(Paragraph("Histórico de Movimentações:", styles["Heading3"]))
+    elements.append(Spacer(1, 6))
+    elements.append(tabela)
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer
+
+def _tabela_pdf(dados_tabela, larguras, coluna_valor):
+    """Tabela dos relatórios: cabeçalho cinza, grade e a coluna de valores alinhada à direita."""
+    tabela = Table(dados_tabela, colWidths=larguras, repeatRows=1)
     tabela.setStyle(TableStyle([
         ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
         ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
         ('FONTSIZE', (0,0), (-1,-1), 8),
-        ('ALIGN', (3,1), (3,-1), 'RIGHT'),
+        ('ALIGN', (coluna_valor,1), (coluna_valor,-1), 'RIGHT'),
     ]))
-    elements.append(Paragraph("Histórico de Movimentações:", styles["Heading3"]))
-    elements.append(Spacer(1, 6))
-    elements.append(tabela)
-    doc.build(elements)
+    return tabela
+
+def _elementos_contribuicoes(extrato, styles):
+    """Conteúdo do comprovante anual de contribuições de um membro (ver contribuicoes.extratos)."""
+    membro = extrato["membro"]
+    elements = [
+        Paragraph(f"Comprovante de Contribuições - {extrato['ano']}", styles["Heading1"]),
+        Paragraph(escape(extrato.get("igreja", "")), styles["Heading3"]),
+        Spacer(1, 12),
+        Paragraph(f"<b>Membro:</b> {escape(membro.get('nome', '-'))}", styles["Normal"]),
+    ]
+    if membro.get("cpf"):
+        elements.append(Paragraph(f"<b>CPF:</b> {escape(membro['cpf'])}", styles["Normal"]))
+    elements.append(Spacer(1, 12))
+
+    dados_tabela = [["Data", "Mês de Referência", "Descrição", "Valor"]]
+    for d in extrato["movimentos"]:
+        dados_tabela.append([
+            d.get("data", "-"),
+            d.get("mes_referencia") or "-",
+            d.get("descricao") or "-",
+            f"R$ {d.get('valor', 0):,.2f}",
+        ])
+    dados_tabela.append(["", "", "Total no ano", f"R$ {extrato['total']:,.2f}"])
+    elements.append(_tabela_pdf(dados_tabela, [60, 90, 220, 70], coluna_valor=3))
+    elements.append(Spacer(1, 18))
+    elements.append(Paragraph(
+        f"Declaramos que o membro acima contribuiu com dízimos no total de R$ {extrato['total']:,.2f} "
+        f"em {len(extrato['movimentos'])} lançamento(s) durante o ano de {extrato['ano']}.",
+        styles["Normal"],
+    ))
+    return elements
+
+def gerar_pdf_contribuicoes(extrato):
+    """PDF do comprovante anual de contribuições de um membro."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    doc.build(_elementos_contribuicoes(extrato, getSampleStyleSheet()))
     buffer.seek(0)
     return buffer
 
+def gerar_pdf_contribuicoes_lote(extratos):
+    """Um único PDF com os comprovantes de vários membros, cada um começando em uma página nova."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = []
+    for extrato in extratos:
+        if elements:
+            elements.append(PageBreak())
+        elements.extend(_elementos_contribuicoes(extrato, styles))
+    doc.build(elements or [Paragraph("Nenhuma contribuição no período.", styles["Normal"])])
+    buffer.seek(0)
+    return buffer
+
+def _chave_pdf(dados, inicio, fim):
+    """Hash do recorte do livro-caixa (movimentos e período) que identifica o PDF."""
+    conteudo = json.dumps([str(inicio), str(fim), dados], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def pdf_analise_em_cache(dados, inicio, fim):
+    """Retorna o PDF do recorte, gerando-o só se ele não estiver no cache (LRU limitado em bytes)."""
+    chave = _chave_pdf(dados, inicio, fim)
+    with _trava_pdf:
+        if chave in _cache_pdf:
+            _cache_pdf.move_to_end(chave)
+            return _cache_pdf[chave]
+
+    pdf = gerar_pdf_analise(dados).getvalue()
+    with _trava_pdf:
+        _cache_pdf[chave] = pdf
+        while len(_cache_pdf) > 1 and sum(len(p) for p in _cache_pdf.values()) > LIMITE_CACHE_PDF_BYTES:
+            _cache_pdf.popitem(last=False)
+    return pdf
+
 # --- Funções de Exibição de Telas ---
 
-def exibir_registro_movimento(dados, nomes_membros):
+def exibir_registro_movimento(ids_membros):
     """Exibe o formulário de registro de entrada/saída."""
     st.subheader("➕ Registrar Nova Movimentação")
     
@@ -110,9 +195,10 @@ def exibir_registro_movimento(dados, nomes_membros):
         
         # Dizimista (aparece apenas para Dízimo)
         dizimista = ""
-        if categoria == "Dízimo" and tipo == "Entrada" and nomes_membros:
+        if categoria == "Dízimo" and tipo == "Entrada" and ids_membros:
             st.markdown("---")
-            dizimista = st.selectbox("Selecione o membro dizimista (Opcional)", ["Não Identificado"] + nomes_membros)
+            dizimista = st.selectbox("Selecione o membro dizimista (Opcional)", [""] + ids_membros,
+                                     format_func=lambda i: referencias_membros.rotulo(i) or "Não Identificado")
 
         descricao = st.text_input("Descrição (Obrigatório)*", placeholder="Ex: Pagamento da conta de luz de Outubro")
         observacoes = st.text_area("Observações (Opcional)")
@@ -134,11 +220,14 @@ def exibir_registro_movimento(dados, nomes_membros):
                 "mes_referencia": mes_referencia,
                 "descricao": descricao,
                 "observacoes": observacoes,
-                "dizimista": dizimista if dizimista != "Não Identificado" else "",
+                "dizimista": dizimista,
                 "registrado_em": datetime.now().strftime("%d/%m/%Y %H:%M")
             }
-            dados.append(novo)
-            salvar_json(dados, CAMINHO_FINANCEIRO)
+            try:
+                livro_caixa.inserir(novo)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                return
             st.session_state["financeiro_sucesso"] = True
             st.rerun()
 
@@ -146,38 +235,48 @@ def exibir_registro_movimento(dados, nomes_membros):
         st.success("✅ Registro salvo com sucesso!")
         del st.session_state["financeiro_sucesso"]
 
-def exibir_historico_e_balanco(dados, nomes_membros):
+def exibir_historico_e_balanco():
     """Exibe o Balanço, Métricas, Gráficos e a Tabela de Ação."""
-    if not dados:
+    limites = livro_caixa.limites_datas()
+    if not limites:
         st.info("Nenhuma movimentação registrada ainda. Registre a primeira na aba '➕ Registrar Movimento'.")
         return
 
-    df = pd.DataFrame(dados)
-    df['data'] = pd.to_datetime(df['data'])
-    
     # Filtros de Período
     st.markdown("### 🔎 Filtro de Período")
     col_inicio, col_fim = st.columns(2)
-    data_min = df['data'].min().date()
-    data_max = df['data'].max().date()
+    data_min, data_max = limites
     
     filtro_inicio = col_inicio.date_input("Data Inicial", value=data_min, min_value=data_min, max_value=data_max)
     filtro_fim = col_fim.date_input("Data Final", value=data_max, min_value=data_min, max_value=data_max)
     
-    dados_filtrados = df[(df['data'].dt.date >= filtro_inicio) & (df['data'].dt.date <= filtro_fim)]
+    # Métricas e gráficos vêm do manifesto; só a tabela detalhada lê a partição (colunar) do período
+    totais = livro_caixa.totais_periodo(filtro_inicio, filtro_fim)
     
     # 1. Visão Geral (Métricas)
     st.markdown("---")
     st.markdown("## 📊 Visão Geral do Caixa")
 
-    total_entradas = dados_filtrados[dados_filtrados['tipo'] == 'Entrada']['valor'].sum()
-    total_saidas = dados_filtrados[dados_filtrados['tipo'] == 'Saída']['valor'].sum()
+    total_entradas = totais['Entrada']
+    total_saidas = totais['Saída']
     saldo = total_entradas - total_saidas
     
     col1, col2, col3 = st.columns(3)
     col1.metric("💸 Total Entradas", f"R$ {total_entradas:,.2f}")
     col2.metric("💵 Total Saídas", f"R$ {total_saidas:,.2f}")
     col3.metric("📈 Saldo no Período", f"R$ {saldo:,.2f}", delta_color=("normal" if saldo >= 0 else "inverse"))
+
+    # Saldos acumulados (índice de somas acumuladas por dia, busca binária)
+    saldo_inicial = livro_caixa.saldo_em(filtro_inicio - timedelta(days=1))
+    saldo_final = livro_caixa.saldo_em(filtro_fim)
+    col4, col5 = st.columns(2)
+    col4.metric(f"🏦 Saldo Acumulado em {filtro_inicio.strftime('%d/%m/%Y')} (abertura)", f"R$ {saldo_inicial:,.2f}")
+    col5.metric(f"🏦 Saldo Acumulado em {filtro_fim.strftime('%d/%m/%Y')}", f"R$ {saldo_final:,.2f}", delta=f"R$ {saldo_final - saldo_inicial:,.2f}")
+
+    with st.expander("📈 Evolução do Saldo (todo o histórico, fim de cada mês)"):
+        evolucao = pd.DataFrame(livro_caixa.saldo_acumulado(), columns=["Data", "Saldo (R$)"])
+        evolucao["Data"] = pd.to_datetime(evolucao["Data"], errors="coerce")
+        st.line_chart(evolucao.dropna().set_index("Data"))
     
     # 2. Balanço por Categoria (Gráficos)
     st.markdown("---")
@@ -186,7 +285,7 @@ def exibir_historico_e_balanco(dados, nomes_membros):
     col_grafico1, col_grafico2 = st.columns(2)
     
     # Distribuição de Entradas
-    entradas_cat = dados_filtrados[dados_filtrados['tipo'] == 'Entrada'].groupby('categoria')['valor'].sum().sort_values(ascending=False)
+    entradas_cat = pd.Series(totais['por_categoria']['Entrada'], dtype=float).sort_values(ascending=False)
     if not entradas_cat.empty:
         col_grafico1.markdown("#### Distribuição de Receitas")
         col_grafico1.dataframe(entradas_cat.apply(lambda x: f"R$ {x:,.2f}"), use_container_width=True)
@@ -195,7 +294,7 @@ def exibir_historico_e_balanco(dados, nomes_membros):
         col_grafico1.info("Sem Entradas no período.")
     
     # Distribuição de Saídas
-    saidas_cat = dados_filtrados[dados_filtrados['tipo'] == 'Saída'].groupby('categoria')['valor'].sum().sort_values(ascending=False)
+    saidas_cat = pd.Series(totais['por_categoria']['Saída'], dtype=float).sort_values(ascending=False)
     if not saidas_cat.empty:
         col_grafico2.markdown("#### Distribuição de Despesas")
         col_grafico2.dataframe(saidas_cat.apply(lambda x: f"R$ {x:,.2f}"), use_container_width=True)
@@ -206,13 +305,18 @@ def exibir_historico_e_balanco(dados, nomes_membros):
     # 3. Histórico de Movimentações (Tabela de Ação)
     st.markdown("---")
     st.markdown("## 📋 Histórico Detalhado (Selecionar Linha para Ação)")
+
+    dados_filtrados = pd.DataFrame(livro_caixa.quadro(COLUNAS_MOVIMENTO, inicio=filtro_inicio, fim=filtro_fim), columns=COLUNAS_MOVIMENTO)
+    dados_filtrados['data'] = pd.to_datetime(dados_filtrados['data'])
+    # Nomes dos dizimistas resolvidos uma vez por referência distinta, não por linha
+    dados_filtrados['dizimista'] = dados_filtrados['dizimista'].map(referencias_membros.mapa_nomes(dados_filtrados['dizimista']))
     
-    # Botão de Exportar PDF
+    # Botão de Exportar PDF (gerado só no clique e reaproveitado para o mesmo recorte)
     col_pdf, col_spacer = st.columns([1, 3])
     with col_pdf:
          st.download_button(
             "📥 Baixar PDF do Balanço",
-            data=gerar_pdf_analise(dados_filtrados.to_dict('records')),
+            data=lambda: pdf_analise_em_cache(dados_filtrados.to_dict('records'), filtro_inicio, filtro_fim),
             file_name=f"balanco_financeiro_{filtro_inicio.strftime('%Y%m%d')}_a_{filtro_fim.strftime('%Y%m%d')}.pdf",
             mime="application/pdf",
             use_container_width=True
@@ -242,7 +346,7 @@ def exibir_historico_e_balanco(dados, nomes_membros):
     if selecao and selecao.get('selection') and len(selecao['selection']['rows']) > 0:
         index_selecionado = selecao['selection']['rows'][0]
         id_selecionado = dados_filtrados.iloc[index_selecionado]['id']
-        movimento_selecionado = df[df['id'] == id_selecionado].iloc[0].to_dict()
+        movimento_selecionado = livro_caixa.buscar(id_selecionado)
         
         st.markdown("---")
         st.markdown(f"### ⚙️ Ação: {movimento_selecionado['descricao'][:50]}...")
@@ -254,15 +358,18 @@ def exibir_historico_e_balanco(dados, nomes_membros):
             st.rerun()
 
         if col_exclui.button("🗑️ Excluir Movimento", key="btn_exclui_mov", use_container_width=True, type="secondary"):
-            dados_atualizados = [d for d in dados if d["id"] != id_selecionado]
-            salvar_json(dados_atualizados, CAMINHO_FINANCEIRO)
+            try:
+                livro_caixa.remover(id_selecionado)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                return
             st.success("Movimentação excluída com sucesso.")
             st.rerun()
 
-def exibir_form_edicao_historico(dados):
+def exibir_form_edicao_historico():
     """Exibe o formulário de edição para um item selecionado."""
     mov_id = st.session_state["edicao_financeira_id"]
-    mov_original = next((d for d in dados if d["id"] == mov_id), None)
+    mov_original = livro_caixa.buscar(mov_id)
 
     if not mov_original:
         st.error("Erro: Movimentação não encontrada para edição.")
@@ -285,16 +392,13 @@ def exibir_form_edicao_historico(dados):
         # Lógica de dizimista para edição
         novo_dizimista = mov_original.get("dizimista", "")
         if mov_original["categoria"] == "Dízimo":
-            membros = carregar_json(CAMINHO_MEMBROS)
-            nomes_membros = [m["nome"] for m in membros]
-            # Encontra o índice para pré-seleção
-            default_options = ["Não Identificado"] + nomes_membros
-            try:
-                default_index = default_options.index(novo_dizimista) if novo_dizimista else 0
-            except ValueError:
-                default_index = 0
+            membros = repositorio.carregar(CAMINHO_MEMBROS)
+            # Mantém a referência atual na lista mesmo que não seja mais de um membro cadastrado
+            default_options = list(dict.fromkeys(["", novo_dizimista] + [m["id"] for m in membros]))
+            default_index = default_options.index(novo_dizimista)
             
-            novo_dizimista = st.selectbox("Membro Dizimista", default_options, index=default_index)
+            novo_dizimista = st.selectbox("Membro Dizimista", default_options, index=default_index,
+                                          format_func=lambda i: referencias_membros.rotulo(i) or "Não Identificado")
 
         nova_desc = st.text_input("Descrição*", value=mov_original["descricao"])
         nova_obs = st.text_area("Observações", value=mov_original["observacoes"])
@@ -309,14 +413,18 @@ def exibir_form_edicao_historico(dados):
                 st.error("Por favor, preencha o **Valor** e a **Descrição**.")
                 return
 
-            mov_original["valor"] = novo_valor
-            mov_original["data"] = str(novo_data)
-            mov_original["mes_referencia"] = novo_mes
-            mov_original["descricao"] = nova_desc
-            mov_original["observacoes"] = nova_obs
-            mov_original["dizimista"] = novo_dizimista if novo_dizimista != "Não Identificado" else ""
-            
-            salvar_json(dados, CAMINHO_FINANCEIRO)
+            try:
+                livro_caixa.atualizar(mov_id, {
+                    "valor": novo_valor,
+                    "data": str(novo_data),
+                    "mes_referencia": novo_mes,
+                    "descricao": nova_desc,
+                    "observacoes": nova_obs,
+                    "dizimista": novo_dizimista,
+                })
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                return
             st.success("Movimentação atualizada com sucesso!")
             st.session_state["edicao_financeira_id"] = None
             st.rerun()
@@ -325,28 +433,162 @@ def exibir_form_edicao_historico(dados):
              st.session_state["edicao_financeira_id"] = None
              st.rerun()
 
+def exibir_importacao_extrato():
+    """Importa um extrato OFX/CSV: categoriza, marca duplicados e grava os lançamentos escolhidos de uma vez."""
+    st.subheader("📥 Importar Extrato Bancário")
+    arquivo = st.file_uploader("Extrato do banco (OFX ou CSV)", type=["ofx", "csv"])
+    if arquivo is None:
+        st.caption(
+            "Os lançamentos do extrato são categorizados pela descrição; os que já existem no "
+            "livro-caixa (mesma data, tipo, valor e descrição) vêm desmarcados."
+        )
+        return
+
+    # O extrato é lido e categorizado uma vez por arquivo; os reruns do editor reaproveitam o resultado
+    importacao = st.session_state.get("importacao_extrato")
+    if importacao is None or importacao[0] != arquivo.file_id:
+        try:
+            extrato = importacao_extrato.ler_extrato(arquivo, arquivo.name)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        if extrato.empty:
+            st.warning("Nenhum lançamento encontrado no arquivo.")
+            return
+        extrato = importacao_extrato.categorizar(extrato, REGRAS_ENTRADA, REGRAS_SAIDA, "Outra Receita", "Outra Despesa")
+        existentes = pd.DataFrame(livro_caixa.quadro(
+            ["data", "tipo", "valor", "descricao"], inicio=extrato["data"].min(), fim=extrato["data"].max()
+        ), columns=["data", "tipo", "valor", "descricao"])
+        extrato["duplicado"] = importacao_extrato.duplicados(extrato, existentes)
+        extrato["encerrado"] = extrato["data"].str[:4].map(livro_caixa.encerrado)
+        extrato["importar"] = ~(extrato["duplicado"] | extrato["encerrado"])
+        extrato["valor"] = extrato["valor"].abs()
+        importacao = (arquivo.file_id, extrato)
+        st.session_state["importacao_extrato"] = importacao
+    extrato = importacao[1]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Lançamentos no extrato", len(extrato))
+    col2.metric("Já registrados", int(extrato["duplicado"].sum()))
+    col3.metric("Em exercícios encerrados", int(extrato["encerrado"].sum()))
+
+    editado = st.data_editor(
+        extrato[["importar", "data", "tipo", "categoria", "valor", "descricao", "duplicado"]],
+        column_config={
+            "importar": st.column_config.CheckboxColumn("Importar"),
+            "data": "Data",
+            "tipo": "Tipo",
+            "categoria": st.column_config.SelectboxColumn("Categoria", options=CATEGORIAS_ENTRADA + CATEGORIAS_SAIDA, required=True),
+            "valor": st.column_config.NumberColumn("Valor (R$)", format="%.2f"),
+            "descricao": "Descrição",
+            "duplicado": st.column_config.CheckboxColumn("Já registrado"),
+        },
+        disabled=["data", "tipo", "valor", "duplicado"],
+        hide_index=True,
+        use_container_width=True,
+        key="editor_importacao_extrato",
+    )
+    selecionados = editado[editado["importar"] & ~extrato["encerrado"]]
+
+    if st.button(f"💾 Importar {len(selecionados)} lançamento(s)", type="primary", disabled=selecionados.empty):
+        # O editor oferece todas as categorias; cada linha precisa de uma do seu tipo
+        # (as das regras de REGRAS_ENTRADA/REGRAS_SAIDA mais a categoria "Outra ..." do tipo)
+        categorias_do_tipo = {"Entrada": CATEGORIAS_ENTRADA, "Saída": CATEGORIAS_SAIDA}
+        invalidos = [
+            f"{linha.data} {linha.descricao} ({linha.tipo}: {linha.categoria})"
+            for linha in selecionados.itertuples(index=False)
+            if linha.categoria not in categorias_do_tipo.get(linha.tipo, ())
+        ]
+        if invalidos:
+            st.error("❌ Categoria incompatível com o tipo do lançamento: " + "; ".join(invalidos[:5])
+                     + (f" e mais {len(invalidos) - 5}." if len(invalidos) > 5 else ""))
+            return
+        registrado_em = datetime.now().strftime("%d/%m/%Y %H:%M")
+        novos = [{
+            "id": str(uuid.uuid4()),
+            "tipo": linha.tipo,
+            "categoria": linha.categoria,
+            "valor": float(linha.valor),
+            "data": linha.data,
+            "mes_referencia": MESES[int(linha.data[5:7]) - 1],
+            "descricao": linha.descricao,
+            "observacoes": f"Importado do extrato {arquivo.name}",
+            "dizimista": "",
+            "registrado_em": registrado_em,
+        } for linha in selecionados.itertuples(index=False)]
+        try:
+            quantidade = livro_caixa.inserir_lote(novos)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        del st.session_state["importacao_extrato"]
+        st.success(f"✅ {quantidade} lançamento(s) importado(s).")
+
+def exibir_encerramento_exercicio():
+    """Lista os exercícios e encerra o mais antigo ainda aberto (arquivo compactado e imutável)."""
+    st.subheader("🔒 Encerrar Exercício")
+    st.caption(
+        "O exercício encerrado é arquivado com seus resumos mensais e por categoria e não pode mais "
+        "receber lançamentos, edições ou exclusões. Os relatórios continuam usando os resumos dele."
+    )
+    anos = [a for a in livro_caixa.anos() if a != livro_caixa.ANO_SEM_DATA]
+    if not anos:
+        st.info("Nenhuma movimentação registrada ainda.")
+        return
+
+    linhas = []
+    for ano in anos:
+        dados = livro_caixa.encerramento(ano)
+        linhas.append({
+            "Exercício": ano,
+            "Situação": "🔒 Encerrado" if dados else "🟢 Aberto",
+            "Saldo de Abertura": f"R$ {livro_caixa.saldo_abertura(ano):,.2f}",
+            "Saldo de Fechamento": f"R$ {dados['saldo_fechamento']:,.2f}" if dados else "-",
+            "Encerrado em": datetime.fromisoformat(dados["em"]).strftime("%d/%m/%Y %H:%M") if dados else "-",
+        })
+    st.dataframe(pd.DataFrame(linhas), hide_index=True, use_container_width=True)
+
+    ano_atual = str(date.today().year)
+    candidato = next((a for a in anos if not livro_caixa.encerrado(a)), None)
+    if candidato is None or candidato >= ano_atual:
+        st.info("Não há exercícios anteriores ao ano atual para encerrar.")
+        return
+
+    confirmado = st.checkbox(f"Confirmo que os lançamentos de {candidato} estão conferidos e podem ser arquivados.")
+    if st.button(f"🔒 Encerrar exercício {candidato}", type="primary", disabled=not confirmado):
+        try:
+            fechamento = livro_caixa.encerrar_exercicio(candidato)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        st.success(f"Exercício {candidato} encerrado. Saldo de fechamento: R$ {fechamento:,.2f}")
+        st.rerun()
+
 # --- Função Principal ---
 
 def exibir():
     st.title("💰 Gestão Financeira da Igreja")
     
     # Carrega dados
-    dados = carregar_json(CAMINHO_FINANCEIRO)
-    membros = carregar_json(CAMINHO_MEMBROS)
-    nomes_membros = [m["nome"] for m in membros]
+    membros = repositorio.carregar(CAMINHO_MEMBROS)
+    ids_membros = [m["id"] for m in membros]
 
     # Abas
-    aba = st.radio("Selecione:", ["➕ Registrar Movimento", "📊 Balanço e Análise"], horizontal=True)
+    aba = st.radio("Selecione:", ["➕ Registrar Movimento", "📥 Importar Extrato", "📊 Balanço e Análise", "🔒 Encerrar Exercício"], horizontal=True)
 
     st.markdown("---")
 
     # Controla a exibição do formulário de edição
     if st.session_state.get("edicao_financeira_id"):
-        exibir_form_edicao_historico(dados)
+        exibir_form_edicao_historico()
     elif aba == "➕ Registrar Movimento":
-        exibir_registro_movimento(dados, nomes_membros)
+        exibir_registro_movimento(ids_membros)
+    elif aba == "📥 Importar Extrato":
+        exibir_importacao_extrato()
     elif aba == "📊 Balanço e Análise":
-        exibir_historico_e_balanco(dados, nomes_membros)
+        exibir_historico_e_balanco()
+    elif aba == "🔒 Encerrar Exercício":
+        exibir_encerramento_exercicio()
 
 if __name__ == '__main__':
     exibir()
\ No newline at end of file
@@ -1,41 +1,21 @@
 import streamlit as st
-import json
 import os
 import uuid
 from datetime import datetime, date
 from pathlib import Path
+from utils import definicoes_formularios, respostas_formularios
 
 # Caminhos
 CAMINHO_BASE = Path("data")
-CAMINHO_FORMULARIOS = CAMINHO_BASE / "formularios.json"
-CAMINHO_RESPOSTAS = CAMINHO_BASE / "respostas_formularios.json"
 
 # Garante que o diretório 'data' exista
 CAMINHO_BASE.mkdir(exist_ok=True)
 
 # --- Funções de Leitura/Escrita ---
 
-def carregar_json(caminho):
-    """Carrega a lista de dados do arquivo JSON de forma segura."""
-    if caminho.exists():
-        try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                # Retorna a lista se o arquivo não estiver vazio, caso contrário, retorna []
-                conteudo = f.read()
-                return json.loads(conteudo) if conteudo else []
-        except json.JSONDecodeError:
-            return []
-    return []
-
 def salvar_resposta(resposta):
-    """Salva uma nova resposta no arquivo JSON."""
-    dados = carregar_json(CAMINHO_RESPOSTAS)
-    
-    # Adiciona nova resposta
-    dados.append(resposta)
-    
-    with open(CAMINHO_RESPOSTAS, "w", encoding="utf-8") as f:
-        json.dump(dados, f, indent=4, ensure_ascii=False)
+    """Salva uma nova resposta. Retorna False se o token de envio já tinha sido usado."""
+    return respostas_formularios.registrar_resposta(resposta)
 
 # --- Função Principal de Exibição ---
 
@@ -53,25 +33,35 @@ def exibir():
         st.info("Exemplo de URL: `?id=SEU_ID_UNICO`")
         return
 
-    formularios = carregar_json(CAMINHO_FORMULARIOS)
-    formulario = next((f for f in formularios if f.get("id") == form_id), None)
+    # Plano de renderização em cache (campos, rótulos, chaves e obrigatórios já prontos)
+    formulario = definicoes_formularios.obter_plano(form_id)
 
     if not formulario:
         st.error(f"❌ Erro: Formulário com ID '{form_id}' não encontrado.")
         return
 
     # 2. Renderização do Título e Descrição
-    st.header(formulario.get("titulo", "Formulário sem Título"))
-    st.markdown(f"*{formulario.get('descricao', 'Preencha os campos abaixo.')}*")
+    st.header(formulario["titulo"])
+    st.markdown(f"*{formulario['descricao']}*")
     st.markdown("---")
 
     # Verifica se o estado de sucesso já foi definido e exibe a mensagem, impedindo reenvio
-    if st.session_state.get(f"form_submitted_{form_id}", False):
+    situacao_envio = st.session_state.get(f"form_submitted_{form_id}", False)
+    if situacao_envio == "duplicada":
+        st.info("ℹ️ **Esta resposta já tinha sido registrada.** Nada foi gravado de novo.")
+        st.info("Você pode fechar esta página.")
+        return
+    if situacao_envio:
         st.balloons()
         st.success("✅ **Obrigado! Sua resposta foi registrada com sucesso!**")
         st.info("Você pode fechar esta página.")
         return
     
+    # Token de envio desta instância do formulário, guardado na sessão (não na URL: um
+    # link copiado da barra de endereços faria todos os respondentes usarem o mesmo).
+    # Reenvios com o mesmo token são descartados sem gravar; após um envio, outro é gerado.
+    token_envio = st.session_state.setdefault(f"token_envio_{form_id}", str(uuid.uuid4()))
+
     # 3. Geração e Submissão do Formulário
     respostas = {}
     campos_faltando = False
@@ -80,13 +70,13 @@ def exibir():
     with st.form("responder_formulario", clear_on_submit=False):
         
         # 3.1. Gera campos dinamicamente e coleta respostas
-        for campo in formulario.get("campos", []):
-            tipo = campo.get("tipo")
-            pergunta = campo.get("pergunta")
-            obrigatorio = campo.get("obrigatorio", False)
-            
-            label = pergunta + (" *" if obrigatorio else "")
-            key = f"input_{campo.get('id') or pergunta.replace(' ', '_')}"
+        for campo in formulario["campos"]:
+            tipo = campo["tipo"]
+            pergunta = campo["pergunta"]
+            coluna = campo["coluna"]
+            obrigatorio = campo["obrigatorio"]
+            label = campo["label"]
+            key = campo["key"]
 
             valor = None
             
@@ -99,7 +89,7 @@ def exibir():
                 # Usamos None como valor inicial, o que é seguro para validação
                 valor = st.number_input(label, key=key, value=None, format="%g")
             elif tipo == "opcoes":
-                opcs = campo.get("opcoes", [])
+                opcs = list(campo["opcoes"])
                 # Adiciona uma opção de "Selecione..." se for obrigatório e não tiver padrão
                 opcs_com_placeholder = (["Selecione..."] + opcs) if obrigatorio else opcs
                 valor = st.selectbox(label, opcs_com_placeholder, key=key)
@@ -108,9 +98,10 @@ def exibir():
             elif tipo == "checkbox":
                 valor = st.checkbox(pergunta, key=key) # Checkbox não tem label de "obrigatorio" na UI padrão
             elif tipo == "data":
-                valor = st.date_input(label, key=key, value=date.today())
+                valor = st.date_input(label, key=key, value=date.today()).isoformat()
                 
-            respostas[pergunta] = valor
+            # Respostas gravadas pelo id do campo (renomear a pergunta não quebra a coluna)
+            respostas[coluna] = valor
 
         st.markdown("---")
         enviado = st.form_submit_button("✅ Enviar Resposta", type="primary", use_container_width=True)
@@ -118,12 +109,13 @@ def exibir():
         if enviado:
             # 3.2. Validação dos Campos Obrigatórios
             campos_faltando = False
-            for campo in formulario.get("campos", []):
-                pergunta = campo.get("pergunta")
-                obrigatorio = campo.get("obrigatorio", False)
+            for campo in formulario["campos"]:
+                coluna = campo["coluna"]
+                if coluna not in formulario["obrigatorios"]:
+                    continue
                 
                 # Checkbox False é um valor válido. Valida apenas se for True ou se não for Checkbox
-                if obrigatorio and (respostas.get(pergunta) in [None, "", "Selecione..."] or (campo.get("tipo") == "checkbox" and respostas.get(pergunta) is False)):
+                if respostas.get(coluna) in [None, "", "Selecione..."] or (campo["tipo"] == "checkbox" and respostas.get(coluna) is False):
                     campos_faltando = True
                     # O streamlit não permite interromper a execução do formulário facilmente. 
                     # Usaremos o erro final.
@@ -135,15 +127,21 @@ def exibir():
             
             # 3.3. Salvamento e Confirmação
             resposta_salvar = {
-                "id_resposta": str(uuid.uuid4()),
+                "id_resposta": token_envio,
                 "id_formulario": form_id,
                 "respostas": respostas,
                 "enviado_em": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
             }
-            salvar_resposta(resposta_salvar)
+            try:
+                # Um reenvio com o mesmo token cai aqui também, mas não grava nada (retorna False)
+                gravada = salvar_resposta(resposta_salvar)
+            except Exception as e:
+                st.error(f"❌ Não foi possível registrar sua resposta agora. Tente novamente. ({e})")
+                return
             
-            # Define o estado de sucesso e reruns para mostrar a mensagem final e desativar o formulário
-            st.session_state[f"form_submitted_{form_id}"] = True
+            # Define o estado final e reruns para mostrar a mensagem e desativar o formulário
+            st.session_state.pop(f"token_envio_{form_id}", None)
+            st.session_state[f"form_submitted_{form_id}"] = True if gravada else "duplicada"
             st.rerun()
 
 # --- Estrutura de Exemplo para Teste ---
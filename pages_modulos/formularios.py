@@ -1,41 +1,24 @@
 import streamlit as st
-import json
 import uuid
 import os
 from datetime import datetime
 import pandas as pd
 from pathlib import Path
-from io import BytesIO
+from utils import definicoes_formularios, exportacao_respostas, repositorio, respostas_formularios
 
 # --- Configuração de Caminhos ---
 CAMINHO_BASE = Path("data")
 CAMINHO_FORMULARIOS = CAMINHO_BASE / "formularios.json"
-CAMINHO_RESPOSTAS = CAMINHO_BASE / "respostas_formularios.json"
 
 # Garante que o diretório 'data' exista
 CAMINHO_BASE.mkdir(exist_ok=True)
 
 # --- Funções de Leitura/Escrita ---
 
-def carregar_json(caminho):
-    """Carrega a lista de dados do arquivo JSON de forma segura."""
-    if caminho.exists():
-        try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                conteudo = f.read()
-                return json.loads(conteudo) if conteudo else []
-        except json.JSONDecodeError:
-            return []
-    return []
-
 def salvar_formularios(formularios):
-    """Salva a lista de formulários."""
-    with open(CAMINHO_FORMULARIOS, "w", encoding="utf-8") as f:
-        json.dump(formularios, f, indent=4, ensure_ascii=False)
-
-def carregar_respostas():
-    """Carrega a lista de respostas de forma segura."""
-    return carregar_json(CAMINHO_RESPOSTAS)
+    """Salva a lista de formulários (e descarta o índice usado pelo formulário público)."""
+    repositorio.salvar(CAMINHO_FORMULARIOS, formularios)
+    definicoes_formularios.invalidar()
 
 # --- Módulo de Criação de Formulário (Melhorado) ---
 
@@ -110,7 +93,7 @@ def criar_formulario():
             if not titulo or not campos_para_salvar:
                 st.warning("Preencha o título e adicione ao menos um campo.")
             else:
-                formularios = carregar_json(CAMINHO_FORMULARIOS)
+                formularios = list(repositorio.carregar(CAMINHO_FORMULARIOS))
                 novo_formulario = {
                     "id": str(uuid.uuid4()),
                     "titulo": titulo,
@@ -130,22 +113,23 @@ def criar_formulario():
 
 def listar_formularios():
     st.subheader("📋 Meus Formulários Ativos")
-    formularios = carregar_json(CAMINHO_FORMULARIOS)
+    formularios = repositorio.carregar(CAMINHO_FORMULARIOS)
 
     if not formularios:
         st.info("Nenhum formulário criado ainda. Vá em '➕ Criar Formulário' para começar.")
         return
     
-    # Dicionário para armazenar respostas por ID
-    respostas_map = {r['id_formulario']: r for r in carregar_respostas()}
+    # Contadores mantidos a cada envio (manifesto das partições, sem ler respostas)
+    resumo = respostas_formularios.resumo_respostas()
     
     for f in formularios:
-        # Conta respostas
-        num_respostas = len([r for r in respostas_map if r == f['id']])
+        info = resumo.get(f['id'], {})
+        num_respostas = info.get("respostas", 0)
         
         with st.expander(f"**{f['titulo']}** ({num_respostas} Resposta{'s' if num_respostas != 1 else ''})"):
             st.markdown(f"**Descrição:** {f.get('descricao', '-')}")
             st.markdown(f"**Criado em:** {f.get('criado_em', '-')}")
+            st.markdown(f"**Última resposta:** {info.get('ultima_resposta') or '-'}")
             
             # Mostra o ID/Link Público
             st.markdown("**Link Público:**")
@@ -173,7 +157,7 @@ def listar_formularios():
                 # Botão de Excluir
                 if st.button("🗑️ Excluir", key=f"del_{f['id']}", use_container_width=True):
                     if st.warning("Tem certeza? Esta ação é irreversível e apagará o formulário (mas não as respostas).", icon="⚠️"):
-                         formularios_restantes = [x for x in carregar_json(CAMINHO_FORMULARIOS) if x["id"] != f["id"]]
+                         formularios_restantes = [x for x in repositorio.carregar(CAMINHO_FORMULARIOS) if x["id"] != f["id"]]
                          salvar_formularios(formularios_restantes)
                          st.success("Formulário excluído com sucesso.")
                          st.rerun()
@@ -183,8 +167,7 @@ def listar_formularios():
 def ver_respostas_formularios(form_id=None):
     st.subheader("📬 Análise de Respostas")
     
-    formularios = carregar_json(CAMINHO_FORMULARIOS)
-    respostas = carregar_respostas()
+    formularios = repositorio.carregar(CAMINHO_FORMULARIOS)
 
     if not formularios:
         st.warning("Nenhum formulário encontrado.")
@@ -203,36 +186,33 @@ def ver_respostas_formularios(form_id=None):
                                     index=list(opcoes_formularios.keys()).index(default_form_title) if default_form_title else 0)
 
     id_escolhido = opcoes_formularios[titulo_escolhido]
-    respostas_filtradas = [r for r in respostas if r["id_formulario"] == id_escolhido]
 
-    if not respostas_filtradas:
+    # 1. Montar o DataFrame direto das colunas do formulário (metadados primeiro)
+    df_respostas = pd.DataFrame(respostas_formularios.tabela_respostas(id_escolhido))
+
+    if df_respostas.empty:
         st.info("Nenhuma resposta registrada ainda para este formulário.")
         return
-
-    # 1. Transformar as respostas em um DataFrame
-    dados_plana = []
-    for r in respostas_filtradas:
-        linha = r["respostas"]
-        linha["ID Resposta"] = r["id_resposta"]
-        linha["Enviado em"] = r["enviado_em"]
-        dados_plana.append(linha)
     
-    df_respostas = pd.DataFrame(dados_plana)
-    
-    # Reordenar colunas (colunas de metadados primeiro)
-    cols = ["Enviado em", "ID Resposta"] + [col for col in df_respostas.columns if col not in ["Enviado em", "ID Resposta", "id_formulario"]]
-    df_respostas = df_respostas[cols].sort_values(by="Enviado em", ascending=False)
+    df_respostas = df_respostas.sort_values(by="Enviado em", ascending=False)
     
     st.markdown(f"**Total de Respostas:** `{len(df_respostas)}`")
     st.dataframe(df_respostas, use_container_width=True, hide_index=True)
 
-    # 2. Exportação
-    buffer = BytesIO()
-    df_respostas.to_csv(buffer, index=False, encoding='utf-8')
-    buffer.seek(0)
+    # Exclusão (gravada como lápide; a compactação limpa o arquivo depois)
+    with st.expander("🗑️ Excluir uma resposta"):
+        id_excluir = st.selectbox("ID da resposta", df_respostas["ID Resposta"].tolist(), key=f"excluir_resposta_{id_escolhido}")
+        if st.button("Excluir resposta", key=f"btn_excluir_resposta_{id_escolhido}"):
+            if respostas_formularios.remover_resposta(id_escolhido, id_excluir):
+                st.success("Resposta excluída.")
+                st.rerun()
+            else:
+                st.warning("Esta resposta já tinha sido excluída.")
+
+    # 2. Exportação (gerada só no clique, lendo a partição em fluxo)
     st.download_button(
         "📥 Baixar Respostas (CSV)",
-        data=buffer,
+        data=lambda: exportacao_respostas.arquivo_csv(id_escolhido),
         file_name=f"respostas_{id_escolhido}_{datetime.now().strftime('%Y%m%d')}.csv",
         mime="text/csv"
     )
@@ -1,57 +1,33 @@
 import streamlit as st
 import os
-import json
 import uuid
 from datetime import datetime
 from PIL import Image
 import pandas as pd # Importar Pandas para visualização tabular
+from utils import imagens, referencias_membros, repositorio
 
 CAMINHO_MINISTERIOS = "data/ministerios.json"
-CAMINHO_LOGOS = "data/logos_ministerios"
 CAMINHO_MEMBROS = "data/membros.json"
+LARGURA_LOGO = 100  # largura de exibição (e da miniatura) do logo na lista
 
 os.makedirs(os.path.dirname(CAMINHO_MINISTERIOS) or '.', exist_ok=True)
-os.makedirs(CAMINHO_LOGOS, exist_ok=True)
 
 def carregar_ministerios():
-    """Carrega a lista de ministérios."""
-    if os.path.exists(CAMINHO_MINISTERIOS):
-        with open(CAMINHO_MINISTERIOS, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f) or []
-            except json.JSONDecodeError:
-                return []
-    return []
-
-def salvar_ministerios(lista):
-    """Salva a lista de ministérios."""
-    with open(CAMINHO_MINISTERIOS, "w", encoding="utf-8") as f:
-        json.dump(lista, f, indent=4, ensure_ascii=False)
+    """Carrega a lista de ministérios (visão somente leitura do repositório compartilhado)."""
+    return repositorio.carregar(CAMINHO_MINISTERIOS)
 
 def carregar_membros():
     """Carrega a lista de membros."""
-    if os.path.exists(CAMINHO_MEMBROS):
-        with open(CAMINHO_MEMBROS, "r", encoding="utf-8") as f:
-            try:
-                # Carrega os membros e cria um DataFrame para busca eficiente
-                membros_data = json.load(f) or []
-                return membros_data, pd.DataFrame(membros_data)
-            except json.JSONDecodeError:
-                return [], pd.DataFrame()
-    return [], pd.DataFrame()
+    return repositorio.carregar(CAMINHO_MEMBROS)
 
 # --- Funções Auxiliares ---
 
-def obter_contato_responsavel(nome_responsavel, df_membros):
-    """Busca o telefone do responsável no DataFrame de membros."""
-    if nome_responsavel and not df_membros.empty:
-        # Usa loc para buscar o membro pelo nome e obter o telefone
-        resp_info = df_membros.loc[df_membros['nome'] == nome_responsavel]
-        if not resp_info.empty:
-            return resp_info['telefone'].iloc[0]
-    return ""
+def obter_contato_responsavel(id_responsavel):
+    """Telefone do responsável (responsavel guarda o id do membro)."""
+    membro = referencias_membros.membro(id_responsavel)
+    return membro.get("telefone", "") if membro else ""
 
-def exibir_form_cadastro_ministerio(ministerios, nomes_membros, df_membros):
+def exibir_form_cadastro_ministerio(ids_membros):
     """Formulário de cadastro com layout em colunas e validação."""
     st.subheader("➕ Novo Ministério")
 
@@ -66,18 +42,18 @@ def exibir_form_cadastro_ministerio(ministerios, nomes_membros, df_membros):
 
         # Responsável e Contato
         st.markdown("---")
-        responsavel_nome = st.selectbox("Responsável pelo Ministério *", nomes_membros)
+        responsavel_id = st.selectbox("Responsável pelo Ministério *", ids_membros, format_func=referencias_membros.rotulo)
         
         # O contato deve ser recalculado toda vez que o selectbox muda
-        contato_responsavel = obter_contato_responsavel(responsavel_nome, df_membros)
+        contato_responsavel = obter_contato_responsavel(responsavel_id)
         st.info(f"📞 **Contato do Líder Selecionado:** `{contato_responsavel}`")
 
         st.markdown("---")
-        membros_participantes = st.multiselect("Membros Participantes", nomes_membros)
+        membros_participantes = st.multiselect("Membros Participantes", ids_membros, format_func=referencias_membros.rotulo)
         enviado = st.form_submit_button("💾 Salvar Ministério", type="primary", use_container_width=True)
 
         if enviado:
-            if not nome or not responsavel_nome:
+            if not nome or not responsavel_id:
                 st.error("Por favor, preencha o Nome do Ministério e o Responsável.")
                 return
 
@@ -87,11 +63,7 @@ def exibir_form_cadastro_ministerio(ministerios, nomes_membros, df_membros):
             # Lógica de upload de logo
             if logo:
                 try:
-                    ext = logo.name.split(".")[-1]
-                    nome_arquivo = f"{id_min}.{ext}"
-                    caminho_logo = os.path.join(CAMINHO_LOGOS, nome_arquivo)
-                    with open(caminho_logo, "wb") as f:
-                        f.write(logo.read())
+                    caminho_logo = imagens.salvar_imagem(logo, larguras=[LARGURA_LOGO])
                 except Exception as e:
                     st.warning(f"Erro ao salvar logo: {e}")
                     caminho_logo = ""
@@ -100,14 +72,13 @@ def exibir_form_cadastro_ministerio(ministerios, nomes_membros, df_membros):
                 "id": id_min,
                 "nome": nome,
                 "descricao": descricao,
-                "responsavel": responsavel_nome,
+                "responsavel": responsavel_id,
                 "contato_responsavel": contato_responsavel,
                 "membros": membros_participantes,
                 "logo": caminho_logo,
                 "criado_em": datetime.now().strftime("%d/%m/%Y %H:%M")
             }
-            ministerios.append(novo)
-            salvar_ministerios(ministerios)
+            repositorio.inserir(CAMINHO_MINISTERIOS, novo)
             st.session_state["ministerio_sucesso"] = True
             st.rerun()
 
@@ -117,7 +88,7 @@ def exibir_form_cadastro_ministerio(ministerios, nomes_membros, df_membros):
 
 # --- Listagem e Edição ---
 
-def exibir_listagem_ministerios(ministerios, nomes_membros, df_membros):
+def exibir_listagem_ministerios(ministerios, ids_membros):
     """Exibe a lista de ministérios com expanders, exclusão e edição integrada."""
     st.subheader("📋 Ministérios Ativos")
 
@@ -130,7 +101,7 @@ def exibir_listagem_ministerios(ministerios, nomes_membros, df_membros):
     
     # Se houver um item em edição, o formulário é exibido no topo da lista
     if ministerio_em_edicao:
-        exibir_form_edicao(ministerio_em_edicao, ministerios, nomes_membros, df_membros)
+        exibir_form_edicao(ministerio_em_edicao, ids_membros)
         st.markdown("---") # Separa o formulário de edição da lista
 
     for m in ministerios:
@@ -139,21 +110,22 @@ def exibir_listagem_ministerios(ministerios, nomes_membros, df_membros):
             continue
             
         # O expander só aparece para os que não estão em edição
-        with st.expander(f"**{m['nome']}** — Líder: {m['responsavel']} ({len(m.get('membros', []))} Membros)", expanded=False):
+        with st.expander(f"**{m['nome']}** — Líder: {referencias_membros.nome(m['responsavel'])} ({len(m.get('membros', []))} Membros)", expanded=False):
             
             # Layout das informações
             col_logo, col_info, col_botoes = st.columns([1, 2, 1])
             
             # Coluna 1: Logo
-            if m.get("logo") and os.path.exists(m["logo"]):
-                col_logo.image(m["logo"], width=100)
+            miniatura = imagens.miniatura(m.get("logo"), LARGURA_LOGO)
+            if miniatura:
+                col_logo.image(miniatura, width=LARGURA_LOGO)
             else:
                 col_logo.markdown("🖼️ **Sem logo**")
 
             # Coluna 2: Informações
             with col_info:
                 st.markdown(f"📄 **Descrição:** {m['descricao']}")
-                st.markdown(f"📞 **Contato do Líder:** {m['contato_responsavel']}")
+                st.markdown(f"📞 **Contato do Líder:** {obter_contato_responsavel(m['responsavel']) or m.get('contato_responsavel', '')}")
                 st.caption(f"Criado em: {m.get('criado_em', 'N/D')}")
                 
             # Coluna 3: Botões
@@ -163,18 +135,18 @@ def exibir_listagem_ministerios(ministerios, nomes_membros, df_membros):
                     st.rerun()
                 
                  if col_botoes.button("🗑️ Excluir", key=f"del_{m['id']}", use_container_width=True, type="secondary"):
-                    excluir_ministerio(m, ministerios)
+                    excluir_ministerio(m)
                     
             st.markdown("---")
             
             # Membros do Ministério (abaixo das informações)
-            membros_df = pd.DataFrame({"Membro": m.get("membros", [])})
+            membros_df = pd.DataFrame({"Membro": referencias_membros.nomes(m.get("membros", []))})
             if not membros_df.empty:
                  st.markdown("👥 **Membros Participantes:**")
                  st.dataframe(membros_df, hide_index=True, use_container_width=True)
 
 
-def exibir_form_edicao(ministerio, ministerios, nomes_membros, df_membros):
+def exibir_form_edicao(ministerio, ids_membros):
     """Formulário de edição que substitui o expander."""
     st.header(f"✏️ Editando: {ministerio['nome']}")
     
@@ -189,17 +161,23 @@ def exibir_form_edicao(ministerio, ministerios, nomes_membros, df_membros):
             
         descricao_edit = st.text_area("Descrição", value=ministerio["descricao"])
 
-        # Responsável e Contato
+        # Responsável e Contato. Referências sem membro (nomes antigos, homônimos ou membros
+        # removidos) continuam como opção selecionada, para não serem trocadas ou perdidas ao salvar
+        opcoes_responsavel = list(ids_membros)
+        if ministerio["responsavel"] and ministerio["responsavel"] not in ids_membros:
+             opcoes_responsavel.insert(0, ministerio["responsavel"])
+        opcoes_membros = list(dict.fromkeys([*ids_membros, *ministerio.get("membros", [])]))
         try:
-             indice_responsavel = nomes_membros.index(ministerio["responsavel"])
+             indice_responsavel = opcoes_responsavel.index(ministerio["responsavel"])
         except ValueError:
-             indice_responsavel = 0 # Define o primeiro se o líder anterior não for encontrado
+             indice_responsavel = 0 # Sem responsável registrado
              
-        responsavel_nome_edit = st.selectbox("Responsável *", nomes_membros, index=indice_responsavel)
-        contato_responsavel_edit = obter_contato_responsavel(responsavel_nome_edit, df_membros)
+        responsavel_id_edit = st.selectbox("Responsável *", opcoes_responsavel, index=indice_responsavel, format_func=referencias_membros.rotulo)
+        contato_responsavel_edit = obter_contato_responsavel(responsavel_id_edit)
         st.info(f"📞 **Contato do Líder:** `{contato_responsavel_edit}`")
 
-        membros_participantes_edit = st.multiselect("Membros Participantes", nomes_membros, default=ministerio.get("membros", []))
+        membros_participantes_edit = st.multiselect("Membros Participantes", opcoes_membros, format_func=referencias_membros.rotulo,
+                                                    default=list(dict.fromkeys(ministerio.get("membros", []))))
         
         st.markdown("---")
         col_salvar, col_cancelar = st.columns(2)
@@ -207,32 +185,31 @@ def exibir_form_edicao(ministerio, ministerios, nomes_membros, df_membros):
         cancelar = col_cancelar.form_submit_button("❌ Cancelar Edição", use_container_width=True)
 
         if salvar:
-             if not nome_edit or not responsavel_nome_edit:
+             if not nome_edit or not responsavel_id_edit:
                 st.error("Por favor, preencha o Nome do Ministério e o Responsável.")
                 return
                 
              # Lógica de atualização de logo
              caminho_logo_edit = ministerio.get("logo", "")
              if logo_upload:
-                 # Remove a logo antiga, se existir
-                 if caminho_logo_edit and os.path.exists(caminho_logo_edit):
-                     os.remove(caminho_logo_edit)
-                 # Salva a nova logo
-                 ext = logo_upload.name.split(".")[-1]
-                 nome_arquivo = f"{ministerio['id']}.{ext}"
-                 caminho_logo_edit = os.path.join(CAMINHO_LOGOS, nome_arquivo)
-                 with open(caminho_logo_edit, "wb") as f:
-                     f.write(logo_upload.read())
+                 # Salva a nova logo; a antiga é apagada pela coleta depois que o registro é gravado
+                 try:
+                     caminho_logo_edit = imagens.salvar_imagem(logo_upload, larguras=[LARGURA_LOGO])
+                 except ValueError as e:
+                     st.error(f"❌ {e}")
+                     return
             
              # Atualiza os dados
-             ministerio["nome"] = nome_edit
-             ministerio["descricao"] = descricao_edit
-             ministerio["responsavel"] = responsavel_nome_edit
-             ministerio["contato_responsavel"] = contato_responsavel_edit
-             ministerio["membros"] = membros_participantes_edit
-             ministerio["logo"] = caminho_logo_edit
-
-             salvar_ministerios(ministerios)
+             repositorio.atualizar(CAMINHO_MINISTERIOS, ministerio["id"], {
+                 "nome": nome_edit,
+                 "descricao": descricao_edit,
+                 "responsavel": responsavel_id_edit,
+                 "contato_responsavel": contato_responsavel_edit,
+                 "membros": membros_participantes_edit,
+                 "logo": caminho_logo_edit,
+             })
+             if caminho_logo_edit != ministerio.get("logo", ""):
+                 imagens.coletar_lixo()
              st.success("✅ Ministério atualizado com sucesso!")
              st.session_state["editando_id"] = None
              st.rerun()
@@ -241,12 +218,10 @@ def exibir_form_edicao(ministerio, ministerios, nomes_membros, df_membros):
             st.session_state["editando_id"] = None
             st.rerun()
 
-def excluir_ministerio(ministerio, ministerios):
+def excluir_ministerio(ministerio):
     """Função para excluir ministério e sua logo."""
-    if ministerio.get("logo") and os.path.exists(ministerio["logo"]):
-        os.remove(ministerio["logo"])
-    ministerios[:] = [x for x in ministerios if x["id"] != ministerio["id"]]
-    salvar_ministerios(ministerios)
+    repositorio.remover(CAMINHO_MINISTERIOS, ministerio["id"])
+    imagens.coletar_lixo()  # a logo sai se nenhum outro registro a usa
     st.success(f"Ministério '{ministerio['nome']}' excluído.")
     st.rerun()
 
@@ -256,12 +231,10 @@ def excluir_ministerio(ministerio, ministerios):
 def exibir():
     st.title("💒 Gerenciamento de Ministérios")
 
-    # Carrega dados e prepara a lista de nomes e DataFrame de membros
-    membros_list, df_membros = carregar_membros()
-    nomes_membros = [m["nome"] for m in membros_list]
-    if not nomes_membros:
+    # Carrega os ids dos membros (os formulários exibem os nomes pelo índice de referências)
+    ids_membros = [m["id"] for m in carregar_membros()]
+    if not ids_membros:
         st.warning("⚠️ **Alerta:** Nenhum membro encontrado. Cadastre membros primeiro para atribuir responsáveis.")
-        nomes_membros = ["Nenhum Membro Cadastrado"]
         
     ministerios = carregar_ministerios()
 
@@ -270,13 +243,13 @@ def exibir():
     st.markdown("---")
 
     if aba == "➕ Novo Ministério":
-        exibir_form_cadastro_ministerio(ministerios, nomes_membros, df_membros)
+        exibir_form_cadastro_ministerio(ids_membros)
 
     elif aba == "📋 Lista de Ministérios":
         if not ministerios:
             st.info("Nenhum ministério cadastrado. Use a aba '➕ Novo Ministério' para começar.")
             return
-        exibir_listagem_ministerios(ministerios, nomes_membros, df_membros)
+        exibir_listagem_ministerios(ministerios, ids_membros)
 
 if __name__ == '__main__':
     exibir()
\ No newline at end of file
@@ -1,7 +1,9 @@
 import streamlit as st
 import os
-import json
+import re
 import pandas as pd
+from utils import contribuicoes, fila_relatorios, livro_caixa, referencias_membros, repositorio
+from pages_modulos.financeiro import gerar_pdf_contribuicoes, gerar_pdf_contribuicoes_lote
 from io import BytesIO
 from datetime import datetime
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage
@@ -22,22 +24,66 @@ except Exception:
 
 # Constantes
 CAMINHO_MEMBROS = "data/membros.json"
-CAMINHO_FINANCEIRO = "data/financeiro.json"
 CAMINHO_LOGO = "data/logo.png"
 NOME_IGREJA = "Comunidade Batista Vida Efatá"
 
-# --- Funções Auxiliares ---
+# --- Geração em Segundo Plano (utils/fila_relatorios.py) ---
 
-def carregar_json(caminho):
-    """Carrega a lista de dados do arquivo JSON."""
-    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
-    if os.path.exists(caminho):
-        try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                return json.load(f) or []
-        except json.JSONDecodeError:
-            return []
-    return []
+def gerar_excel(df, aba):
+    """Gera a planilha Excel de um DataFrame (executada no pool de processos)."""
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name=aba, index=False)
+    buffer.seek(0)
+    return buffer
+
+def exibir_exportacao(coluna, rotulo, nome_relatorio, nome_arquivo, mime, funcao, *args):
+    """Botão de exportação: pede a geração à fila e oferece o download quando o arquivo fica pronto."""
+    id_trabalho = fila_relatorios.identificador(nome_relatorio, funcao, *args)
+    situacao = fila_relatorios.situacao(id_trabalho)
+
+    if situacao["estado"] == fila_relatorios.PRONTO:
+        coluna.download_button(rotulo, data=lambda: fila_relatorios.resultado(id_trabalho),
+                               file_name=nome_arquivo, mime=mime, use_container_width=True)
+    elif situacao["estado"] in (fila_relatorios.NA_FILA, fila_relatorios.GERANDO):
+        coluna.progress(situacao["progresso"], text="⏳ Gerando...")
+        if coluna.button("🔄 Atualizar", key=f"atualizar_{nome_relatorio}", use_container_width=True):
+            st.rerun()
+    else:
+        if situacao["estado"] == fila_relatorios.ERRO:
+            coluna.error(f"Falha ao gerar: {situacao['erro']}")
+        if coluna.button(rotulo.replace("Baixar", "Gerar"), key=f"gerar_{nome_relatorio}", use_container_width=True):
+            fila_relatorios.solicitar(nome_relatorio, funcao, *args)
+            st.rerun()
+
+def exibir_exportacao_sob_demanda(coluna, rotulo, nome_relatorio, nome_arquivo, mime, versao, montar):
+    """Como exibir_exportacao, para pedidos caros de montar ou em lote: montar() -> (nomes_arquivos, funcao, lista_args)
+    só é chamada quando o usuário pede a geração. Cada item de lista_args é um pedido à fila (distribuídos no pool);
+    com nomes_arquivos, o download é um ZIP com um arquivo por pedido, senão o documento do único pedido.
+    Os ids ficam na sessão enquanto versao (dos dados de origem) não mudar."""
+    chave = f"pedido_{nome_relatorio}"
+    pedido = st.session_state.get(chave)
+    situacao = fila_relatorios.situacao_lote(pedido["ids"]) if pedido and pedido["versao"] == versao else None
+
+    if situacao and situacao["estado"] == fila_relatorios.PRONTO:
+        ids, nomes_arquivos = pedido["ids"], pedido["nomes_arquivos"]
+        if nomes_arquivos is None:
+            dados = lambda: fila_relatorios.resultado(ids[0])
+        else:
+            dados = lambda: fila_relatorios.resultado_zip(ids, nomes_arquivos)
+        coluna.download_button(rotulo, data=dados, file_name=nome_arquivo, mime=mime, use_container_width=True)
+    elif situacao and situacao["estado"] in (fila_relatorios.NA_FILA, fila_relatorios.GERANDO):
+        coluna.progress(situacao["progresso"], text=f"⏳ Gerando... {situacao['prontos']}/{situacao['total']}")
+        if coluna.button("🔄 Atualizar", key=f"atualizar_{nome_relatorio}", use_container_width=True):
+            st.rerun()
+    else:
+        if situacao and situacao["estado"] == fila_relatorios.ERRO:
+            coluna.error(f"Falha ao gerar: {situacao['erro']}")
+        if coluna.button(rotulo.replace("Baixar", "Gerar"), key=f"gerar_{nome_relatorio}", use_container_width=True):
+            nomes_arquivos, funcao, lista_args = montar()
+            ids = fila_relatorios.solicitar_lote(nome_relatorio, funcao, lista_args)
+            st.session_state[chave] = {"versao": versao, "ids": ids, "nomes_arquivos": nomes_arquivos}
+            st.rerun()
 
 # --- Módulo de Relatórios de Membros ---
 
@@ -102,7 +148,7 @@ def gerar_pdf_membros(membros, df_analise):
     return buffer
 
 def exibir_membros():
-    membros = carregar_json(CAMINHO_MEMBROS)
+    membros = repositorio.carregar(CAMINHO_MEMBROS)
     membros_validos = [m for m in membros if "nome" in m and "funcao" in m and "status" in m]
 
     st.header("👥 Relatório de Membros")
@@ -156,19 +202,17 @@ def exibir_membros():
     st.subheader(f"Lista Detalhada ({len(df_visual)} Registros)")
     st.dataframe(df_visual, use_container_width=True, hide_index=True)
 
-    # 4. Exportações
+    # 4. Exportações (geradas em segundo plano, sob demanda)
     col_d1, col_d2, col_d3 = st.columns(3)
     
     # Excel
-    buffer_excel = BytesIO()
-    with pd.ExcelWriter(buffer_excel, engine="openpyxl") as writer:
-        df_visual.to_excel(writer, sheet_name="Membros", index=False)
-    buffer_excel.seek(0)
-    col_d1.download_button("📥 Baixar Excel", data=buffer_excel, file_name="relatorio_membros_filtrado.xlsx", use_container_width=True)
+    exibir_exportacao(col_d1, "📥 Baixar Excel", "membros_excel", "relatorio_membros_filtrado.xlsx",
+                      "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                      gerar_excel, df_visual, "Membros")
 
     # PDF
-    col_d2.download_button("📄 Baixar PDF", data=gerar_pdf_membros(membros_filtrados, df_analise_pdf), 
-                           file_name="relatorio_membros_completo.pdf", mime="application/pdf", use_container_width=True)
+    exibir_exportacao(col_d2, "📄 Baixar PDF", "membros_pdf", "relatorio_membros_completo.pdf", "application/pdf",
+                      gerar_pdf_membros, membros_filtrados, df_analise_pdf)
 
 # --- Módulo de Relatórios Financeiros ---
 
@@ -265,61 +309,56 @@ def gerar_pdf_financeiro(df_fin, totais):
     return buffer
 
 def exibir_financeiro():
-    financeiro = carregar_json(CAMINHO_FINANCEIRO)
-    if not financeiro:
+    if not livro_caixa.meses():
         st.info("Nenhum lançamento encontrado.")
         return
 
     st.header("💰 Relatório Financeiro")
     
-    # Conversão e limpeza inicial
-    df_fin_full = pd.DataFrame(financeiro)
-    df_fin_full['valor'] = pd.to_numeric(df_fin_full['valor'], errors='coerce').fillna(0)
-    
     # 1. Filtros (AJUSTADO AQUI)
     
-    # Lista de todas as categorias únicas presentes no JSON
+    # O ano escolhido define a única partição do livro-caixa lida para a tabela
+    anos_disponiveis = livro_caixa.anos()
+    ano_filtro = st.selectbox(
+        "Filtrar por ano:", ["Todos"] + anos_disponiveis[::-1],
+        format_func=lambda a: "Sem data" if a == livro_caixa.ANO_SEM_DATA else a,
+    )
+    ano = None if ano_filtro == "Todos" else ano_filtro
+
+    # Lista de todas as categorias únicas presentes no livro-caixa (vem do manifesto)
     # Garante que mesmo categorias novas/não padrão sejam incluídas
-    tipos_disponiveis = sorted(df_fin_full['categoria'].unique().tolist())
+    tipos_disponiveis = livro_caixa.categorias(ano)
     
-    meses_disponiveis = sorted(set(f.get("mes_referencia", "") for f in financeiro if f.get("mes_referencia")))
+    meses_disponiveis = livro_caixa.meses_referencia(ano)
 
     col1, col2, col3 = st.columns(3)
-    # Agora usa a lista completa de categorias do DataFrame
+    # Agora usa a lista completa de categorias do livro-caixa
     tipo_filtro = col1.selectbox("Filtrar por categoria:", ["Todos"] + tipos_disponiveis) 
     mes_filtro = col2.selectbox("Filtrar por mês de referência:", ["Todos"] + meses_disponiveis)
     mov_filtro = col3.selectbox("Filtrar por Tipo:", ["Ambos", "Entrada", "Saída"])
 
-    # Aplicar filtros
-    df_fin = df_fin_full.copy()
-    if tipo_filtro != "Todos":
-        df_fin = df_fin[df_fin["categoria"] == tipo_filtro]
-    if mes_filtro != "Todos":
-        df_fin = df_fin[df_fin["mes_referencia"] == mes_filtro]
-    if mov_filtro != "Ambos":
-        df_fin = df_fin[df_fin["tipo"] == mov_filtro]
+    filtros = {
+        "categoria": None if tipo_filtro == "Todos" else tipo_filtro,
+        "mes_referencia": None if mes_filtro == "Todos" else mes_filtro,
+        "tipo": None if mov_filtro == "Ambos" else mov_filtro,
+    }
     
-    # 2. Cálculos e Métricas
-    total_entradas = df_fin[df_fin['tipo'] == 'Entrada']['valor'].sum()
-    total_saidas = df_fin[df_fin['tipo'] == 'Saída']['valor'].sum()
+    # 2. Cálculos e Métricas (a partir do manifesto, sem percorrer os lançamentos)
+    totais = livro_caixa.totais(ano=ano, **filtros)
+    total_entradas = totais['Entrada']
+    total_saidas = totais['Saída']
     saldo = total_entradas - total_saidas
     
     # Cálculo de Dizimistas do Mês (do filtro atual)
     numero_dizimistas = 0
     if mes_filtro != "Todos":
-        df_dizimo_mes = df_fin[(df_fin['categoria'] == 'Dízimo') & (df_fin['dizimista'] != '')]
-        numero_dizimistas = df_dizimo_mes['dizimista'].nunique()
+        numero_dizimistas = len(totais['dizimistas'])
 
     # Cálculo da Projeção Anual
-    total_entradas_ano = df_fin_full[df_fin_full['tipo'] == 'Entrada']['valor'].sum()
-    
-    df_entradas_ano = df_fin_full[df_fin_full['tipo'] == 'Entrada'].copy()
-    df_entradas_ano['data'] = pd.to_datetime(df_entradas_ano['data'], errors='coerce')
-    df_entradas_ano['AnoMes'] = df_entradas_ano['data'].dt.to_period('M')
-    
-    meses_registrados_count = df_entradas_ano['AnoMes'].nunique()
+    totais_gerais = livro_caixa.totais(tipo="Entrada")
+    meses_registrados_count = totais_gerais['meses_com_entrada']
     
-    media_mensal = total_entradas_ano / meses_registrados_count if meses_registrados_count else 0
+    media_mensal = totais_gerais['Entrada'] / meses_registrados_count if meses_registrados_count else 0
     projecao_anual = media_mensal * 12
 
     # 3. Exibição das Métricas
@@ -344,10 +383,28 @@ def exibir_financeiro():
     col_a2.metric("🔮 Projeção Anual (Entradas)", f"R$ {projecao_anual:,.2f}")
     
     st.markdown("---")
-    
-    # 4. Tabela de Visualização (Com formatação)
+
+    # Exercício encerrado: resumo vem do arquivo (via manifesto); lançamentos só sob demanda
+    encerramento = livro_caixa.encerramento(ano) if ano else None
+    if encerramento:
+        st.markdown(f"### 🔒 Exercício {ano} encerrado")
+        col_e1, col_e2 = st.columns(2)
+        col_e1.metric("Saldo de Abertura", f"R$ {encerramento['saldo_abertura']:,.2f}")
+        col_e2.metric("Saldo de Fechamento", f"R$ {encerramento['saldo_fechamento']:,.2f}")
+        resumo_mensal = pd.DataFrame(encerramento["por_mes"]).T.sort_index()
+        st.dataframe(resumo_mensal.style.format("R$ {:,.2f}"), use_container_width=True)
+        if not st.checkbox("📂 Ver lançamentos do exercício (abre o arquivo compactado)"):
+            return
+    
+    # 4. Tabela de Visualização (Com formatação) - só aqui os lançamentos (do ano filtrado) são lidos,
+    # filtrados por códigos inteiros na tabela colunar do livro-caixa
+    colunas_fin = ["data", "tipo", "categoria", "valor", "descricao", "mes_referencia", "dizimista"]
+    df_fin = pd.DataFrame(livro_caixa.quadro(colunas_fin, ano=ano, **filtros), columns=colunas_fin)
+    df_fin['valor'] = pd.to_numeric(df_fin['valor'], errors='coerce').fillna(0)
+
     colunas = ["data", "tipo", "categoria", "valor", "descricao", "mes_referencia"]
-    if "dizimista" in df_fin.columns:
+    if (df_fin["dizimista"].fillna("") != "").any():
+        df_fin["dizimista"] = df_fin["dizimista"].map(referencias_membros.mapa_nomes(df_fin["dizimista"]))
         colunas.append("dizimista")
         
     df_visual = df_fin[colunas].copy()
@@ -360,7 +417,7 @@ def exibir_financeiro():
         color = 'green' if 'Entrada' in val else 'red'
         return f'color: {color}'
 
-    df_visual_formatado = df_visual.style.applymap(color_movimento, subset=pd.IndexSlice[:, ['Tipo']])
+    df_visual_formatado = df_visual.style.map(color_movimento, subset=pd.IndexSlice[:, ['Tipo']])
     df_visual_formatado = df_visual_formatado.format({'Valor (R$)': 'R$ {:,.2f}'})
 
     st.subheader(f"Movimentações Filtradas ({len(df_visual)} Registros)")
@@ -375,23 +432,82 @@ def exibir_financeiro():
         'Projecao': projecao_anual
     }
 
-    # 5. Exportações
+    # 5. Exportações (geradas em segundo plano, sob demanda)
     col_d1, col_d2, col_d3 = st.columns(3)
 
     # Excel (Exporta o DataFrame não formatado para dados brutos)
-    buffer_excel_fin = BytesIO()
-    with pd.ExcelWriter(buffer_excel_fin, engine="openpyxl") as writer:
-        df_export = df_fin[colunas].copy()
-        df_export.columns = [c.capitalize().replace("_", " ") for c in df_export.columns]
-        df_export.rename(columns={'Valor': 'Valor (R$)'}, inplace=True)
-        
-        df_export.to_excel(writer, sheet_name="Financeiro", index=False)
-    buffer_excel_fin.seek(0)
-    col_d1.download_button("📥 Baixar Excel", data=buffer_excel_fin, file_name="relatorio_financeiro_filtrado.xlsx", use_container_width=True)
+    exibir_exportacao(col_d1, "📥 Baixar Excel", "financeiro_excel", "relatorio_financeiro_filtrado.xlsx",
+                      "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                      gerar_excel, df_visual, "Financeiro")
 
     # PDF
-    col_d2.download_button("📄 Baixar PDF", data=gerar_pdf_financeiro(df_visual, totais_pdf), 
-                           file_name="relatorio_financeiro_completo.pdf", mime="application/pdf", use_container_width=True)
+    exibir_exportacao(col_d2, "📄 Baixar PDF", "financeiro_pdf", "relatorio_financeiro_completo.pdf", "application/pdf",
+                      gerar_pdf_financeiro, df_visual, totais_pdf)
+
+
+# --- Módulo de Contribuições (comprovantes anuais de dízimo) ---
+
+def _nome_arquivo_comprovante(extrato):
+    nome = re.sub(r"\W+", "_", extrato["membro"]["nome"]).strip("_") or "membro"
+    return f"comprovante_{extrato['ano']}_{nome}_{str(extrato['membro']['id'])[:8]}.pdf"
+
+def exibir_contribuicoes():
+    anos_disponiveis = [a for a in livro_caixa.anos() if a != livro_caixa.ANO_SEM_DATA]
+    if not anos_disponiveis:
+        st.info("Nenhum lançamento encontrado.")
+        return
+
+    st.header("🙏 Contribuições por Membro")
+    ano = st.selectbox("Ano:", anos_disponiveis[::-1])
+
+    # Totais pelo índice de contribuições (sem ler os lançamentos)
+    do_ano = contribuicoes.do_ano(ano)
+    sem_cadastro = contribuicoes.sem_cadastro(ano)
+    if sem_cadastro:
+        st.warning(
+            f"⚠️ {len(sem_cadastro)} dizimista(s) sem cadastro de membro neste ano (R$ {sum(sem_cadastro.values()):,.2f}): "
+            + ", ".join(sorted(sem_cadastro))
+        )
+    if not do_ano:
+        st.info("Nenhum dízimo identificado por membro neste ano.")
+        return
+
+    nomes_membros = referencias_membros.mapa_nomes(do_ano)
+    ids_ordenados = sorted(do_ano, key=nomes_membros.get)
+    col_m1, col_m2 = st.columns(2)
+    col_m1.metric("Membros Contribuintes", len(do_ano))
+    col_m2.metric("Total Identificado", f"R$ {sum(d['total'] for d in do_ano.values()):,.2f}")
+    st.dataframe(pd.DataFrame([
+        {"Membro": nomes_membros[i], "Lançamentos": do_ano[i]["quantidade"], "Total (R$)": do_ano[i]["total"]}
+        for i in ids_ordenados
+    ]), use_container_width=True, hide_index=True)
+
+    st.markdown("---")
+    st.subheader("📄 Comprovante Individual")
+    id_membro = st.selectbox("Membro:", ids_ordenados, format_func=referencias_membros.rotulo)
+    por_mes = do_ano[id_membro]["por_mes"]
+    st.bar_chart(pd.Series(por_mes, name="Total (R$)").sort_index())
+    extrato = {**contribuicoes.extratos(ano, [id_membro])[0], "igreja": NOME_IGREJA}
+    exibir_exportacao(st, "📄 Baixar Comprovante", f"contribuicao_{ano}_{id_membro}", _nome_arquivo_comprovante(extrato),
+                      "application/pdf", gerar_pdf_contribuicoes, extrato)
+
+    st.markdown("---")
+    st.subheader("📦 Comprovantes de Todos os Membros")
+    formato = st.radio("Formato:", ["Um PDF por membro (ZIP)", "PDF único"], horizontal=True)
+    # Os extratos de todos os membros só são montados quando a geração é pedida
+    def _extratos():
+        return [{**e, "igreja": NOME_IGREJA} for e in contribuicoes.extratos(ano)]
+
+    if formato == "PDF único":
+        exibir_exportacao_sob_demanda(st, "📄 Baixar PDF Único", f"contribuicoes_{ano}", f"comprovantes_{ano}.pdf",
+                                      "application/pdf", contribuicoes.versao(),
+                                      lambda: (None, gerar_pdf_contribuicoes_lote, [(_extratos(),)]))
+    else:
+        def _lote():
+            extratos = _extratos()
+            return [_nome_arquivo_comprovante(e) for e in extratos], gerar_pdf_contribuicoes, [(e,) for e in extratos]
+        exibir_exportacao_sob_demanda(st, "📦 Baixar ZIP", f"contribuicoes_lote_{ano}", f"comprovantes_{ano}.zip",
+                                      "application/zip", contribuicoes.versao(), _lote)
 
 
 # --- Função Principal ---
@@ -405,7 +521,7 @@ def exibir():
     if "edicao_financeira_id" not in st.session_state:
         st.session_state["edicao_financeira_id"] = None
         
-    opcao = st.selectbox("Escolha o módulo do relatório:", ["👥 Membros", "💰 Financeiro"])
+    opcao = st.selectbox("Escolha o módulo do relatório:", ["👥 Membros", "💰 Financeiro", "🙏 Contribuições"])
 
     st.markdown("---")
 
@@ -413,6 +529,8 @@ def exibir():
         exibir_membros()
     elif opcao == "💰 Financeiro":
         exibir_financeiro()
+    elif opcao == "🙏 Contribuições":
+        exibir_contribuicoes()
 
 if __name__ == '__main__':
     exibir()
\ No newline at end of file
@@ -1,7 +1,7 @@
 import streamlit as st
-import json
 import uuid
 from datetime import datetime
+from utils import repositorio
 
 CAMINHO_DADOS = "data/usuarios.json"
 
@@ -18,15 +18,7 @@ PAGINAS_DISPONIVEIS = [
 ]
 
 def carregar_usuarios():
-    try:
-        with open(CAMINHO_DADOS, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return []
-
-def salvar_usuarios(usuarios):
-    with open(CAMINHO_DADOS, "w", encoding="utf-8") as f:
-        json.dump(usuarios, f, indent=4, ensure_ascii=False)
+    return repositorio.carregar(CAMINHO_DADOS)
 
 def exibir():
     st.title("👤 Gerenciar Usuários")
@@ -45,7 +37,6 @@ def exibir():
             enviado = st.form_submit_button("💾 Salvar")
 
             if enviado:
-                usuarios = carregar_usuarios()
                 novo_usuario = {
                     "id": str(uuid.uuid4()),
                     "nome": nome,
@@ -56,8 +47,7 @@ def exibir():
                     "permissoes": permissoes,  # 👈 Aqui é o nome correto
                     "criado_em": str(datetime.now())
                 }
-                usuarios.append(novo_usuario)
-                salvar_usuarios(usuarios)
+                repositorio.inserir(CAMINHO_DADOS, novo_usuario)
                 st.success("✅ Usuário cadastrado com sucesso!")
 
     else:
@@ -76,7 +66,6 @@ def exibir():
 
                 col1, col2 = st.columns(2)
                 if col1.button("🗑️ Excluir", key=f"excluir_{u['id']}"):
-                    usuarios = [usr for usr in usuarios if usr["id"] != u["id"]]
-                    salvar_usuarios(usuarios)
+                    repositorio.remover(CAMINHO_DADOS, u["id"])
                     st.success("Usuário excluído com sucesso!")
                     st.rerun()
@@ -1,38 +1,60 @@
 import streamlit as st
-import json
 import os
 import pandas as pd
 from pathlib import Path
-from io import BytesIO
 from datetime import datetime
+from utils import agregados_respostas, definicoes_formularios, exportacao_respostas, repositorio, respostas_formularios
 
 # --- Configuração de Caminhos ---
 CAMINHO_BASE = Path("data")
 CAMINHO_FORMULARIOS = CAMINHO_BASE / "formularios.json"
-CAMINHO_RESPOSTAS = CAMINHO_BASE / "respostas_formularios.json"
 
 # Garante que o diretório 'data' exista
 CAMINHO_BASE.mkdir(exist_ok=True)
 
 # --- Funções de Leitura Segura ---
 
-def carregar_json_seguro(caminho):
-    """Carrega a lista de dados do arquivo JSON de forma segura."""
-    if caminho.exists():
-        try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                conteudo = f.read()
-                # Retorna a lista se o arquivo não estiver vazio
-                return json.loads(conteudo) if conteudo else []
-        except json.JSONDecodeError:
-            return []
-    return []
-
 def carregar_formularios():
-    return carregar_json_seguro(CAMINHO_FORMULARIOS)
+    return repositorio.carregar(CAMINHO_FORMULARIOS)
+
+# --- Resumo por Campo (agregados mantidos a cada envio) ---
 
-def carregar_respostas():
-    return carregar_json_seguro(CAMINHO_RESPOSTAS)
+def exibir_resumo(id_formulario):
+    agregados = respostas_formularios.agregados(id_formulario)
+    if not agregados or not agregados["respostas"]:
+        st.info("ℹ️ Nenhuma resposta para resumir ainda.")
+        return
+
+    # Os agregados são indexados pelo id do campo; o título vem da pergunta atual
+    plano = definicoes_formularios.obter_plano(id_formulario)
+    perguntas = {c["coluna"]: c["pergunta"] for c in plano["campos"]}
+
+    st.markdown(f"**Total de Respostas:** `{agregados['respostas']}`")
+    for coluna, campo in agregados["campos"].items():
+        st.markdown(f"#### {perguntas.get(coluna, coluna)}")
+        tipo = campo["tipo"]
+        if tipo == "opcoes":
+            if campo["contagens"]:
+                df = pd.DataFrame(list(campo["contagens"].items()), columns=["Opção", "Respostas"])
+                st.bar_chart(df.set_index("Opção"))
+        elif tipo == "checkbox":
+            col1, col2 = st.columns(2)
+            col1.metric("✅ Marcados", campo["marcados"])
+            col2.metric("⬜ Não marcados", campo["desmarcados"])
+        elif tipo == "numero":
+            numeros = agregados_respostas.estatisticas_numero(campo)
+            if numeros:
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Mínimo", f"{numeros['minimo']:g}")
+                col2.metric("Máximo", f"{numeros['maximo']:g}")
+                col3.metric("Média", f"{numeros['media']:.2f}")
+                df = pd.DataFrame(agregados_respostas.histograma(campo), columns=["Faixa", "Respostas"])
+                st.bar_chart(df.set_index("Faixa"))
+        elif tipo == "data":
+            if campo["por_dia"]:
+                df = pd.DataFrame(sorted(campo["por_dia"].items()), columns=["Dia", "Respostas"])
+                st.bar_chart(df.set_index("Dia"))
+        st.caption(f"Preenchido em {campo['preenchidas']} de {agregados['respostas']} resposta(s).")
 
 # --- Módulo Principal de Visualização ---
 
@@ -40,13 +62,12 @@ def exibir_respostas_formularios():
     st.title("📬 Análise de Respostas dos Formulários")
     
     formularios = carregar_formularios()
-    respostas = carregar_respostas()
 
     if not formularios:
         st.warning("⚠️ Nenhum formulário criado ainda. Crie um no módulo de Gerenciamento de Formulários.")
         return
 
-    if not respostas:
+    if not respostas_formularios.existem_respostas():
         st.info("ℹ️ Nenhuma resposta registrada ainda.")
         return
 
@@ -55,28 +76,23 @@ def exibir_respostas_formularios():
     titulo_escolhido = st.selectbox("Escolha o formulário para análise:", list(opcoes_formularios.keys()))
 
     id_escolhido = opcoes_formularios[titulo_escolhido]
-    respostas_filtradas = [r for r in respostas if r["id_formulario"] == id_escolhido]
 
-    if not respostas_filtradas:
+    # Só a visualização escolhida é carregada: o resumo não lê as respostas
+    visualizacao = st.radio("Visualização", ["📊 Resumo", "📋 Respostas"], horizontal=True)
+    if visualizacao == "📊 Resumo":
+        st.markdown("---")
+        exibir_resumo(id_escolhido)
+        return
+
+    # 2. Montar o DataFrame direto das colunas do formulário escolhido (metadados primeiro)
+    df_respostas = pd.DataFrame(respostas_formularios.tabela_respostas(id_escolhido))
+
+    if df_respostas.empty:
         st.info(f"ℹ️ Nenhuma resposta para o formulário **{titulo_escolhido}** ainda.")
         return
 
     st.markdown("---")
     
-    # 2. Transformar as respostas em um DataFrame
-    dados_plana = []
-    for r in respostas_filtradas:
-        linha = r.get("respostas", {}) # Pega o dicionário de respostas
-        linha["ID Resposta"] = r["id_resposta"]
-        linha["Enviado em"] = r["enviado_em"]
-        dados_plana.append(linha)
-    
-    df_respostas = pd.DataFrame(dados_plana)
-    
-    # Reordenar colunas (colunas de metadados primeiro)
-    cols = ["Enviado em", "ID Resposta"] + [col for col in df_respostas.columns if col not in ["Enviado em", "ID Resposta", "id_formulario"]]
-    df_respostas = df_respostas[cols]
-    
     # 3. Exibição da Tabela e Métricas
     st.subheader(f"Respostas para '{titulo_escolhido}'")
     st.markdown(f"**Total de Respostas:** `{len(df_respostas)}`")
@@ -90,26 +106,20 @@ def exibir_respostas_formularios():
     
     col_csv, col_excel = st.columns(2)
 
+    # Os arquivos só são gerados no clique, lendo a partição em fluxo
     # CSV
-    buffer_csv = BytesIO()
-    df_respostas.to_csv(buffer_csv, index=False, encoding='utf-8')
-    buffer_csv.seek(0)
     col_csv.download_button(
         "📥 Baixar CSV",
-        data=buffer_csv,
+        data=lambda: exportacao_respostas.arquivo_csv(id_escolhido),
         file_name=f"respostas_{id_escolhido}_{datetime.now().strftime('%Y%m%d')}.csv",
         mime="text/csv",
         use_container_width=True
     )
     
     # Excel
-    buffer_excel = BytesIO()
-    with pd.ExcelWriter(buffer_excel, engine='openpyxl') as writer:
-        df_respostas.to_excel(writer, index=False, sheet_name='Respostas')
-    buffer_excel.seek(0)
     col_excel.download_button(
         "📥 Baixar Excel",
-        data=buffer_excel,
+        data=lambda: exportacao_respostas.arquivo_excel(id_escolhido),
         file_name=f"respostas_{id_escolhido}_{datetime.now().strftime('%Y%m%d')}.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         use_container_width=True
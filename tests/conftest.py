@@ -0,0 +1,27 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import (  # noqa: E402
+    contribuicoes, definicoes_formularios, livro_caixa, referencias_membros, repositorio, respostas_formularios,
+)
+
+
+@pytest.fixture
+def dados(tmp_path, monkeypatch):
+    """Pasta data/ vazia num diretório temporário, com os caches dos módulos zerados."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    repositorio._cache.clear()
+    livro_caixa._particoes.clear()
+    livro_caixa._encerrados.clear()
+    livro_caixa._doacoes.update(origem=None, por_dizimista={})
+    definicoes_formularios.invalidar()
+    respostas_formularios._colunares.clear()
+    respostas_formularios._tokens_recentes.clear()
+    referencias_membros._indices["origem"] = None
+    referencias_membros._migracao["feita"] = False
+    contribuicoes._indice["origem"] = (None, None, None)
+    return tmp_path
@@ -0,0 +1,69 @@
+import os
+import uuid
+from datetime import date
+import pytest
+from utils import livro_caixa
+
+
+def _movimento(data, tipo, valor, categoria=None, dizimista=""):
+    return {
+        "id": str(uuid.uuid4()), "data": data, "tipo": tipo, "valor": valor,
+        "categoria": categoria or ("Oferta" if tipo == "Entrada" else "Manutenção"),
+        "descricao": "", "mes_referencia": data[:7], "dizimista": dizimista,
+    }
+
+
+@pytest.fixture
+def livro(dados):
+    livro_caixa.inserir_lote([
+        _movimento("2023-05-10", "Entrada", 100.10),
+        _movimento("2023-11-30", "Saída", 40.05),
+        _movimento("2024-01-15", "Entrada", 200.00, "Dízimo", "Ana"),
+        _movimento("2024-06-01", "Saída", 0.10),
+        _movimento("2025-02-20", "Entrada", 0.20),
+        _movimento("2025-02-20", "Saída", 50.00),
+    ])
+    return dados
+
+
+def test_particoes_e_totais_por_ano(livro):
+    assert livro_caixa.anos() == ["2023", "2024", "2025"]
+    assert sorted(os.listdir("data/financeiro")) == ["2023.json", "2024.json", "2025.json", "manifesto.json"]
+    totais = livro_caixa.totais()
+    assert (totais["Entrada"], totais["Saída"]) == (300.30, 90.15)
+    assert livro_caixa.totais(ano="2024")["Entrada"] == 200.00
+    assert livro_caixa.totais(categoria="Dízimo")["dizimistas"] == {"Ana": 1}
+
+
+def test_saldo_em_atravessa_as_particoes(livro):
+    assert livro_caixa.saldo_em("2023-05-09") == 0
+    assert livro_caixa.saldo_em("2023-12-31") == 60.05
+    assert livro_caixa.saldo_em("2024-01-15") == 260.05
+    assert livro_caixa.saldo_em("2025-02-20") == 210.15
+    assert livro_caixa.entradas_saidas_periodo("2024-01-01", "2025-12-31") == (200.20, 50.10)
+
+
+def test_exercicios_encerrados_mantem_totais_e_saldos(livro):
+    antes = {data: livro_caixa.saldo_em(data) for data in ("2023-12-31", "2024-03-01", "2025-12-31")}
+    assert livro_caixa.encerrar_exercicio("2023") == 60.05
+    assert livro_caixa.encerrar_exercicio("2024") == 259.95
+    assert livro_caixa.encerrado("2023") and livro_caixa.encerrado("2024")
+    assert os.path.exists("data/financeiro/encerrados/2023.json.gz")
+
+    assert {data: livro_caixa.saldo_em(data) for data in antes} == antes
+    assert livro_caixa.saldo_abertura("2025") == 259.95
+    assert livro_caixa.totais()["Entrada"] == 300.30
+    assert [m["valor"] for m in livro_caixa.movimentos("2023")] == [100.10, 40.05]
+
+    with pytest.raises(ValueError):
+        livro_caixa.inserir(_movimento("2024-07-01", "Entrada", 1.00))
+    with pytest.raises(ValueError):
+        livro_caixa.encerrar_exercicio(str(date.today().year))
+
+
+def test_manifesto_perdido_e_reconstruido(livro):
+    esperado = livro_caixa.totais()
+    os.remove(livro_caixa.CAMINHO_MANIFESTO)
+    livro_caixa.reconstruir_manifesto()
+    assert livro_caixa.totais() == esperado
+    assert livro_caixa.saldo_em("2025-12-31") == 210.15
@@ -0,0 +1,93 @@
+import os
+import uuid
+from PIL import Image
+from utils import contribuicoes, imagens, livro_caixa, referencias_membros, repositorio
+
+ANA, BIA, BIA_2 = (str(uuid.uuid4()) for _ in range(3))
+
+
+def _membros():
+    repositorio.salvar("data/membros.json", [
+        {"id": ANA, "nome": "Ana"}, {"id": BIA, "nome": "Bia"}, {"id": BIA_2, "nome": "Bia"},
+    ])
+
+
+def _dizimo(data, dizimista, valor):
+    return {
+        "id": str(uuid.uuid4()), "data": data, "tipo": "Entrada", "categoria": "Dízimo", "valor": valor,
+        "descricao": "", "mes_referencia": data[:7], "dizimista": dizimista,
+    }
+
+
+# --- Referências a membros ---
+
+def test_migracao_troca_nomes_por_ids_e_mantem_homonimos(dados):
+    _membros()
+    repositorio.salvar("data/ministerios.json", [{"id": "m1", "nome": "Louvor", "responsavel": "Ana", "membros": ["Ana", "Bia", "Zé"]}])
+    livro_caixa.inserir(_dizimo("2025-03-01", "Ana", 10.0))
+
+    alterados = referencias_membros.migrar()
+    assert alterados[referencias_membros.CAMINHO_MINISTERIOS] == 1
+    ministerio = repositorio.carregar("data/ministerios.json")[0]
+    assert ministerio["responsavel"] == ANA
+    assert list(ministerio["membros"]) == [ANA, "Bia", "Zé"]  # homônimos e nomes sem cadastro ficam como texto
+    assert [m["dizimista"] for m in livro_caixa.movimentos("2025")] == [ANA]
+    assert referencias_membros.rotulo("Bia") == "Bia (sem cadastro)"
+    assert referencias_membros.rotulo(BIA) != referencias_membros.rotulo(BIA_2)
+
+    assert referencias_membros.migrar()[referencias_membros.CAMINHO_MINISTERIOS] == 0  # idempotente
+
+
+def test_nomes_de_exercicios_encerrados_so_contam_pelo_registro_da_migracao(dados):
+    _membros()
+    livro_caixa.inserir(_dizimo("2024-03-01", "Ana", 10.0))
+    livro_caixa.inserir(_dizimo("2024-04-01", "Carla", 5.0))
+    livro_caixa.encerrar_exercicio("2024")
+    livro_caixa.inserir(_dizimo("2025-03-01", "Ana", 20.0))
+    referencias_membros.migrar()
+    assert repositorio.carregar(referencias_membros.CAMINHO_DIZIMISTAS_MIGRADOS) == {"Ana": ANA}
+
+    # Uma Carla cadastrada depois da migração não herda a doação arquivada
+    carla = str(uuid.uuid4())
+    repositorio.salvar("data/membros.json", [*repositorio.carregar("data/membros.json"), {"id": carla, "nome": "Carla"}])
+    assert contribuicoes.do_membro(ANA)["total"] == 30.0
+    assert contribuicoes.do_membro(carla)["total"] == 0.0
+    assert contribuicoes.sem_cadastro() == {"Carla": 5.0}
+    assert [(e["membro"]["id"], e["total"]) for e in contribuicoes.extratos(2024)] == [(ANA, 10.0)]
+
+
+# --- Imagens ---
+
+def _foto_legada(nome="foto.png"):
+    os.makedirs("data/fotos", exist_ok=True)
+    Image.new("RGB", (40, 30), "red").save(f"data/fotos/{nome}")
+    return f"data\\fotos\\{nome}"  # gravado no Windows
+
+
+def test_leitura_de_imagem_legada_nao_altera_dados(dados):
+    caminho = _foto_legada()
+    repositorio.salvar("data/membros.json", [{"id": ANA, "nome": "Ana", "foto": caminho}])
+    antes = os.stat("data/membros.json").st_mtime_ns
+
+    assert imagens.miniatura(caminho, 20) is not None
+    assert imagens.coletar_lixo(carencia=0)[0] == 0
+    assert os.stat("data/membros.json").st_mtime_ns == antes
+    assert os.path.exists("data/fotos/foto.png")
+    assert imagens.miniatura(caminho, 20) is not None  # a miniatura da imagem não migrada sobrevive à coleta
+
+
+def test_migracao_de_imagens_copia_para_o_armazenamento_e_mantem_originais(dados):
+    caminho = _foto_legada()
+    repositorio.salvar("data/membros.json", [{"id": ANA, "nome": "Ana", "foto": caminho}, {"id": BIA, "nome": "Bia", "foto": "data/fotos/sumiu.jpg"}])
+
+    assert imagens.migrar()["data/membros.json"] == 1
+    nova = repositorio.carregar("data/membros.json")[0]["foto"]
+    assert nova.startswith(imagens.PASTA_IMAGENS + "/") and os.path.exists(nova)
+    assert os.path.exists("data/fotos/foto.png")
+    assert repositorio.carregar("data/membros.json")[1]["foto"] == "data/fotos/sumiu.jpg"
+    assert imagens.migrar()["data/membros.json"] == 0
+
+    repositorio.salvar("data/membros.json", [{"id": ANA, "nome": "Ana", "foto": ""}])
+    apagados, _ = imagens.coletar_lixo(carencia=0)
+    assert apagados >= 1 and not os.path.exists(nova)
+    assert os.path.exists("data/fotos/foto.png")  # fora do armazenamento: nunca apagado
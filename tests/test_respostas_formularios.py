@@ -0,0 +1,75 @@
+import json
+from utils import definicoes_formularios, repositorio, respostas_formularios
+
+FORMULARIO = {"id": "f1", "titulo": "Inscrição", "campos": [{"id": "c1", "tipo": "texto", "pergunta": "Nome"}]}
+
+
+def _preparar(campos=None):
+    repositorio.salvar("data/formularios.json", [{**FORMULARIO, "campos": campos or FORMULARIO["campos"]}])
+    definicoes_formularios.invalidar()
+
+
+def _responder(id_resposta, nome, enviado_em="2026-01-01 10:00"):
+    return respostas_formularios.registrar_resposta({
+        "id_formulario": "f1", "id_resposta": id_resposta, "enviado_em": enviado_em, "respostas": {"c1": nome},
+    })
+
+
+def _linhas_particao():
+    with open(respostas_formularios._caminho_particao("f1"), encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f]
+
+
+def test_acrescimo_lapide_e_compactacao(dados):
+    _preparar()
+    for id_resposta, nome in [("r1", "Ana"), ("r2", "Bia"), ("r3", "Cida")]:
+        assert _responder(id_resposta, nome)
+    assert respostas_formularios.remover_resposta("f1", "r2")
+    assert not respostas_formularios.remover_resposta("f1", "r2")  # já removida
+
+    assert [r["id_resposta"] for r in respostas_formularios.iterar_respostas("f1")] == ["r1", "r3"]
+    assert respostas_formularios.contagens() == {"f1": 2}
+    assert respostas_formularios.tabela_respostas("f1")["Nome"] == ["Ana", "Cida"]
+    assert len(_linhas_particao()) == 4  # três respostas e uma lápide
+
+    assert respostas_formularios.compactar("f1") == 2
+    assert [r["id_resposta"] for r in _linhas_particao()] == ["r1", "r3"]
+    assert respostas_formularios.contagens() == {"f1": 2}
+    assert respostas_formularios.tabela_respostas("f1")["Nome"] == ["Ana", "Cida"]
+    assert respostas_formularios.agregados("f1")["respostas"] == 2
+
+
+def test_reenvio_com_o_mesmo_token_nao_grava(dados):
+    _preparar()
+    assert _responder("r1", "Ana")
+    assert not _responder("r1", "Ana")
+    assert len(_linhas_particao()) == 1
+
+
+def test_tabela_e_agregados_refeitos_quando_a_particao_e_reescrita(dados):
+    _preparar()
+    _responder("r1", "Ana")
+    _responder("r2", "Bia")
+    assert respostas_formularios.tabela_respostas("f1")["Nome"] == ["Ana", "Bia"]
+    assert respostas_formularios.agregados("f1")["respostas"] == 2
+
+    # Edição no mesmo arquivo que não muda o tamanho
+    caminho = respostas_formularios._caminho_particao("f1")
+    with open(caminho, encoding="utf-8") as f:
+        conteudo = f.read()
+    with open(caminho, "r+", encoding="utf-8") as f:
+        f.write(conteudo.replace('"Ana"', '"Ema"'))
+    assert respostas_formularios.tabela_respostas("f1")["Nome"] == ["Ema", "Bia"]
+
+    _responder("r3", "Cida")  # acréscimo depois da reescrita continua incremental
+    assert respostas_formularios.tabela_respostas("f1")["Nome"] == ["Ema", "Bia", "Cida"]
+    assert respostas_formularios.agregados("f1")["respostas"] == 3
+
+
+def test_formulario_alterado_refaz_tabela_e_agregados(dados):
+    _preparar()
+    _responder("r1", "12")
+    assert respostas_formularios.agregados("f1")["campos"]["c1"]["tipo"] == "texto"
+    _preparar([{"id": "c1", "tipo": "numero", "pergunta": "Idade"}])
+    assert respostas_formularios.tabela_respostas("f1")["Idade"] == [12.0]
+    assert respostas_formularios.agregados("f1")["campos"]["c1"]["soma"] == 12.0
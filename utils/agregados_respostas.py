@@ -0,0 +1,106 @@
+from datetime import date, datetime
+from utils import definicoes_formularios
+
+# --- Agregados por campo das respostas de um formulário (persistidos em utils/respostas_formularios.py) ---
+
+FORMATO = 2  # muda quando a estrutura dos agregados muda (arquivos antigos são recalculados)
+
+
+def _novo_campo(tipo):
+    campo = {"tipo": tipo, "preenchidas": 0}
+    if tipo == "opcoes":
+        campo["contagens"] = {}
+    elif tipo == "checkbox":
+        campo["marcados"] = 0
+        campo["desmarcados"] = 0
+    elif tipo == "numero":
+        campo["soma"] = 0.0
+        campo["valores"] = {}
+    elif tipo == "data":
+        campo["por_dia"] = {}
+    return campo
+
+
+def novos_agregados(plano):
+    """Agregados zerados para os campos do formulário."""
+    return {"formato": FORMATO, "respostas": 0, "campos": {c["coluna"]: _novo_campo(c["tipo"]) for c in plano["campos"]}}
+
+
+def _dia(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.strftime("%Y-%m-%d")
+    texto = str(valor)
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto[:10], formato).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _somar(contador, chave, sinal):
+    contador[chave] = contador.get(chave, 0) + sinal
+    if contador[chave] <= 0:
+        del contador[chave]
+
+
+def acumular(agregados, plano, resposta, sinal=1):
+    """Aplica uma resposta aos agregados (sinal=-1 desconta uma resposta removida)."""
+    agregados["respostas"] += sinal
+    valores = definicoes_formularios.valores_por_coluna(plano, resposta.get("respostas", {}))
+    for definicao in plano["campos"]:
+        coluna = definicao["coluna"]
+        campo = agregados["campos"].setdefault(coluna, _novo_campo(definicao["tipo"]))
+        valor = valores.get(coluna)
+        tipo = campo["tipo"]
+
+        if tipo == "checkbox":
+            campo["marcados" if valor else "desmarcados"] += sinal
+            campo["preenchidas"] += sinal
+            continue
+        if valor in (None, ""):
+            continue
+
+        if tipo == "opcoes":
+            _somar(campo["contagens"], str(valor), sinal)
+        elif tipo == "numero":
+            try:
+                numero = float(valor)
+            except (TypeError, ValueError):
+                continue
+            campo["soma"] += sinal * numero
+            _somar(campo["valores"], repr(numero), sinal)
+        elif tipo == "data":
+            dia = _dia(valor)
+            if dia is None:
+                continue
+            _somar(campo["por_dia"], dia, sinal)
+        campo["preenchidas"] += sinal
+    return agregados
+
+
+def estatisticas_numero(campo):
+    """Mínimo, máximo e média de um campo numérico (None quando não há valores)."""
+    valores = {float(v): n for v, n in campo["valores"].items()}
+    quantidade = sum(valores.values())
+    if not quantidade:
+        return None
+    return {"minimo": min(valores), "maximo": max(valores), "media": campo["soma"] / quantidade}
+
+
+def histograma(campo, faixas=10):
+    """Agrupa os valores de um campo numérico em faixas de mesma largura: [(rótulo, quantidade)]."""
+    valores = {float(v): n for v, n in campo["valores"].items()}
+    if not valores:
+        return []
+    minimo, maximo = min(valores), max(valores)
+    if minimo == maximo:
+        return [(f"{minimo:g}", sum(valores.values()))]
+    largura = (maximo - minimo) / faixas
+    contagens = [0] * faixas
+    for valor, quantidade in valores.items():
+        contagens[min(int((valor - minimo) / largura), faixas - 1)] += quantidade
+    return [
+        (f"{minimo + i * largura:g} – {minimo + (i + 1) * largura:g}", quantidade)
+        for i, quantidade in enumerate(contagens)
+    ]
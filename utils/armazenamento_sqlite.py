@@ -0,0 +1,248 @@
+import json
+import os
+import sqlite3
+import threading
+
+# --- Backend SQLite das coleções (IGREJA_ARMAZENAMENTO=sqlite; migração: python -m utils.armazenamento_sqlite) ---
+
+CAMINHO_BANCO = os.path.join("data", "igreja.db")
+
+# As respostas dos formulários ficam no arquivo JSON Lines de utils/respostas_formularios.py
+COLECOES = [
+    "membros", "financeiro", "eventos", "ministerios", "avisos",
+    "formularios", "usuarios", "escola_biblica",
+]
+
+# Coleções divididas em data/<colecao>/<ano>.json; cada partição vira a tabela
+# <colecao>_<ano>, criada na primeira gravação
+COLECOES_PARTICIONADAS = ["financeiro"]
+
+# Campo usado como identificador de cada coleção (padrão: "id")
+CHAVES = {}
+
+COLUNAS_INDEXADAS = ["nome", "data", "categoria", "id_formulario"]
+
+# Uma conexão por processo, compartilhada pelas threads do Streamlit (cada rerun roda em
+# uma thread nova); todo uso dela acontece com _trava tomada.
+_trava = threading.RLock()
+_estado = {"conexao": None, "tabelas": set()}
+
+
+def _conexao():
+    """Conexão do processo (o esquema é criado na primeira chamada). Use com _trava tomada."""
+    conexao = _estado["conexao"]
+    if conexao is None:
+        os.makedirs(os.path.dirname(CAMINHO_BANCO) or ".", exist_ok=True)
+        conexao = sqlite3.connect(CAMINHO_BANCO, timeout=30, check_same_thread=False)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        conexao.execute("CREATE TABLE IF NOT EXISTS _versoes (colecao TEXT PRIMARY KEY, versao INTEGER NOT NULL)")
+        for colecao in COLECOES:
+            _criar_tabela(conexao, colecao)
+        conexao.commit()
+        _estado.update(conexao=conexao, tabelas=set(COLECOES))
+    return conexao
+
+
+def _tabela(colecao):
+    """Conexão com a tabela da coleção garantida (partições são criadas sob demanda). Use com _trava tomada."""
+    conexao = _conexao()
+    if colecao not in _estado["tabelas"]:
+        with conexao:
+            _criar_tabela(conexao, colecao)
+        _estado["tabelas"].add(colecao)
+    return conexao
+
+
+def _criar_tabela(conexao, colecao):
+    conexao.execute(
+        f'CREATE TABLE IF NOT EXISTS "{colecao}" ('
+        "pos INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE, "
+        "nome TEXT, data TEXT, categoria TEXT, id_formulario TEXT, doc TEXT NOT NULL)"
+    )
+    for coluna in COLUNAS_INDEXADAS:
+        conexao.execute(f'CREATE INDEX IF NOT EXISTS "idx_{colecao}_{coluna}" ON "{colecao}" ({coluna})')
+
+
+def _linha(colecao, registro):
+    """Extrai as colunas indexadas de um registro."""
+    chave = CHAVES.get(colecao, "id")
+    valores = [registro.get(chave)] + [registro.get(c) for c in COLUNAS_INDEXADAS]
+    valores = [None if v is None else str(v) for v in valores]
+    return valores + [json.dumps(registro, ensure_ascii=False)]
+
+
+def _incrementar_versao(conexao, colecao):
+    conexao.execute(
+        "INSERT INTO _versoes (colecao, versao) VALUES (?, 1) "
+        "ON CONFLICT(colecao) DO UPDATE SET versao = versao + 1",
+        (colecao,),
+    )
+
+
+# --- Leitura ---
+
+def versao(colecao):
+    """Versão atual da coleção (incrementada a cada escrita, inclusive por outros processos)."""
+    with _trava:
+        linha = _conexao().execute("SELECT versao FROM _versoes WHERE colecao = ?", (colecao,)).fetchone()
+        return linha[0] if linha else 0
+
+
+def particoes(colecao):
+    """Sufixos (anos) das tabelas <colecao>_<ano> já criadas para uma coleção particionada."""
+    with _trava:
+        cursor = _conexao().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ? ESCAPE '\\'",
+            (colecao.replace("_", "\\_") + "\\_%",),
+        )
+        sufixos = (nome[len(colecao) + 1:] for (nome,) in cursor)
+        return sorted(s for s in sufixos if s.isdigit())
+
+
+def carregar(colecao):
+    """Retorna todos os registros da coleção na ordem de inserção."""
+    with _trava:
+        cursor = _tabela(colecao).execute(f'SELECT doc FROM "{colecao}" ORDER BY pos')
+        return [json.loads(doc) for (doc,) in cursor]
+
+
+def consultar(colecao, **filtros):
+    """Retorna os registros cujas colunas indexadas (id, nome, data, categoria, id_formulario) batem com os filtros.
+
+    Um filtro None não encontra nada (em SQL, "= NULL" nunca é verdadeiro).
+    """
+    colunas = ["id"] + COLUNAS_INDEXADAS
+    invalidas = [c for c in filtros if c not in colunas]
+    if invalidas:
+        raise ValueError(f"Filtro sem índice: {', '.join(invalidas)}")
+    condicoes = " AND ".join(f"{c} = ?" for c in filtros) or "1 = 1"
+    with _trava:
+        cursor = _tabela(colecao).execute(
+            f'SELECT doc FROM "{colecao}" WHERE {condicoes} ORDER BY pos',
+            [None if v is None else str(v) for v in filtros.values()],
+        )
+        return [json.loads(doc) for (doc,) in cursor]
+
+
+# --- Escrita ---
+
+def inserir(colecao, registro):
+    with _trava:
+        conexao = _tabela(colecao)
+        with conexao:
+            conexao.execute(
+                f'INSERT INTO "{colecao}" (id, nome, data, categoria, id_formulario, doc) VALUES (?, ?, ?, ?, ?, ?)',
+                _linha(colecao, registro),
+            )
+            _incrementar_versao(conexao, colecao)
+
+
+def atualizar(colecao, id_registro, registro):
+    """Substitui o documento do registro. Retorna False se ele não existir."""
+    with _trava:
+        conexao = _tabela(colecao)
+        with conexao:
+            valores = _linha(colecao, registro)
+            cursor = conexao.execute(
+                f'UPDATE "{colecao}" SET id = ?, nome = ?, data = ?, categoria = ?, id_formulario = ?, doc = ? WHERE id = ?',
+                valores + [str(id_registro)],
+            )
+            if cursor.rowcount:
+                _incrementar_versao(conexao, colecao)
+            return cursor.rowcount > 0
+
+
+def remover(colecao, id_registro):
+    """Remove o registro. Retorna False se ele não existir."""
+    with _trava:
+        conexao = _tabela(colecao)
+        with conexao:
+            cursor = conexao.execute(f'DELETE FROM "{colecao}" WHERE id = ?', (str(id_registro),))
+            if cursor.rowcount:
+                _incrementar_versao(conexao, colecao)
+            return cursor.rowcount > 0
+
+
+def substituir(colecao, registros):
+    """Regrava a coleção inteira (equivalente ao antigo salvar do JSON)."""
+    with _trava:
+        conexao = _tabela(colecao)
+        with conexao:
+            conexao.execute(f'DELETE FROM "{colecao}"')
+            conexao.executemany(
+                f'INSERT INTO "{colecao}" (id, nome, data, categoria, id_formulario, doc) VALUES (?, ?, ?, ?, ?, ?)',
+                [_linha(colecao, r) for r in registros],
+            )
+            _incrementar_versao(conexao, colecao)
+
+
+# --- Migração ---
+
+def _arquivos_json(diretorio):
+    """(coleção, caminho) de cada arquivo a migrar, incluindo as partições por ano."""
+    for colecao in COLECOES:
+        yield colecao, os.path.join(diretorio, f"{colecao}.json")
+    for colecao in COLECOES_PARTICIONADAS:
+        pasta = os.path.join(diretorio, colecao)
+        if os.path.isdir(pasta):
+            for arquivo in sorted(os.listdir(pasta)):
+                nome, extensao = os.path.splitext(arquivo)
+                if extensao == ".json" and nome.isdigit():
+                    yield f"{colecao}_{nome}", os.path.join(pasta, arquivo)
+
+
+def _ids_repetidos(colecao, registros):
+    """Ids que aparecem em mais de um registro (a coluna id é UNIQUE)."""
+    chave = CHAVES.get(colecao, "id")
+    vistos, repetidos = set(), set()
+    for registro in registros:
+        id_registro = registro.get(chave)
+        if id_registro is None:
+            continue
+        (repetidos if str(id_registro) in vistos else vistos).add(str(id_registro))
+    return sorted(repetidos)
+
+
+def migrar_json(diretorio="data"):
+    """Importa os arquivos JSON atuais para o banco (só as coleções ainda não migradas). Retorna {colecao: registros}.
+
+    ValueError, sem importar nada, se alguma coleção tem ids repetidos: outros registros podem
+    apontar para eles, então precisam ser corrigidos no JSON antes da migração.
+    """
+    pendentes = []
+    for colecao, caminho in _arquivos_json(diretorio):
+        if not os.path.exists(caminho):
+            continue
+        if versao(colecao) > 0:
+            continue  # coleção já migrada (ou já em uso no banco)
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                conteudo = f.read()
+            registros = json.loads(conteudo) if conteudo.strip() else []
+        except json.JSONDecodeError as e:
+            print(f"[ERRO] {caminho} inválido, coleção ignorada: {e}")
+            continue
+        pendentes.append((colecao, caminho, registros))
+
+    repetidos = {caminho: _ids_repetidos(colecao, registros) for colecao, caminho, registros in pendentes}
+    repetidos = {caminho: ids for caminho, ids in repetidos.items() if ids}
+    if repetidos:
+        raise ValueError("Ids repetidos (corrija antes de migrar): " + "; ".join(
+            f"{caminho}: {', '.join(ids)}" for caminho, ids in repetidos.items()
+        ))
+
+    migrados = {}
+    for colecao, _, registros in pendentes:
+        substituir(colecao, registros)
+        migrados[colecao] = len(registros)
+    return migrados
+
+
+if __name__ == "__main__":
+    try:
+        migrados = migrar_json()
+    except ValueError as e:
+        raise SystemExit(f"[ERRO] {e}")
+    for colecao, total in migrados.items():
+        print(f"{colecao}: {total} registro(s) migrado(s)")
@@ -1,24 +1,21 @@
-import json
 import os
 import bcrypt
+from utils import repositorio
 
 CAMINHO_USUARIOS = os.path.join("data", "usuarios.json")
 
 def carregar_usuarios():
     """Carrega a lista de usuários a partir do JSON."""
-    if os.path.exists(CAMINHO_USUARIOS):
-        try:
-            with open(CAMINHO_USUARIOS, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"[ERRO] Falha ao carregar usuários: {e}")
+    try:
+        return repositorio.carregar(CAMINHO_USUARIOS)
+    except Exception as e:
+        print(f"[ERRO] Falha ao carregar usuários: {e}")
     return []
 
 def salvar_usuarios(usuarios):
     """Salva a lista de usuários no JSON."""
     try:
-        with open(CAMINHO_USUARIOS, "w", encoding="utf-8") as f:
-            json.dump(usuarios, f, ensure_ascii=False, indent=2)
+        repositorio.salvar(CAMINHO_USUARIOS, usuarios, indent=2)
     except Exception as e:
         print(f"[ERRO] Falha ao salvar usuários: {e}")
 
@@ -0,0 +1,157 @@
+import bisect
+import re
+import threading
+import unicodedata
+from utils import repositorio
+
+# --- Índice de busca de membros por nome, CPF e telefone ---
+
+CAMINHO_MEMBROS = "data/membros.json"
+
+PONTOS_IGUAL = 3
+PONTOS_PREFIXO = 2
+PONTOS_TRECHO = 1
+
+_trava = threading.Lock()
+
+
+def _vocabulario():
+    return {"ids_por_termo": {}, "ordenados": [], "trigramas": {}}
+
+
+_indice = {"origem": None, "registros": {}, "termos": {}, "nome": _vocabulario(), "digitos": _vocabulario()}
+
+
+def normalizar(texto):
+    """Texto em minúsculas (casefold), sem acentos e só com letras, dígitos e espaços simples."""
+    sem_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", str(texto or "")) if not unicodedata.combining(c)
+    )
+    return " ".join(re.sub(r"[^\w]+", " ", sem_acentos.casefold()).split())
+
+
+def _digitos(texto):
+    return re.sub(r"\D", "", str(texto or ""))
+
+
+def _trigramas(termo):
+    return {termo[i:i + 3] for i in range(len(termo) - 2)}
+
+
+# --- Manutenção ---
+
+def _acrescentar(vocabulario, termo, id_membro):
+    ids = vocabulario["ids_por_termo"].get(termo)
+    if ids is None:
+        ids = vocabulario["ids_por_termo"][termo] = set()
+        bisect.insort(vocabulario["ordenados"], termo)
+        for trigrama in _trigramas(termo):
+            vocabulario["trigramas"].setdefault(trigrama, set()).add(termo)
+    ids.add(id_membro)
+
+
+def _retirar(vocabulario, termo, id_membro):
+    ids = vocabulario["ids_por_termo"].get(termo)
+    if ids is None:
+        return
+    ids.discard(id_membro)
+    if ids:
+        return
+    del vocabulario["ids_por_termo"][termo]
+    del vocabulario["ordenados"][bisect.bisect_left(vocabulario["ordenados"], termo)]
+    for trigrama in _trigramas(termo):
+        termos = vocabulario["trigramas"][trigrama]
+        termos.discard(termo)
+        if not termos:
+            del vocabulario["trigramas"][trigrama]
+
+
+def _termos_do_membro(membro):
+    termos = [("nome", t) for t in dict.fromkeys(normalizar(membro.get("nome")).split())]
+    for campo in ("cpf", "telefone"):
+        digitos = _digitos(membro.get(campo))
+        if digitos:
+            termos.append(("digitos", digitos))
+    return termos
+
+
+def _indexar(id_membro, membro):
+    for vocabulario, termo in _indice["termos"].pop(id_membro, ()):
+        _retirar(_indice[vocabulario], termo, id_membro)
+    _indice["registros"].pop(id_membro, None)
+    if membro is None:
+        return
+    termos = _termos_do_membro(membro)
+    for vocabulario, termo in termos:
+        _acrescentar(_indice[vocabulario], termo, id_membro)
+    _indice["termos"][id_membro] = termos
+    _indice["registros"][id_membro] = membro
+
+
+def _atualizar():
+    """Reindexa só os membros que mudaram desde a última consulta (chamada com a trava tomada)."""
+    membros = repositorio.carregar(CAMINHO_MEMBROS)
+    if _indice["origem"] is membros:
+        return
+    atuais = {m.get("id"): m for m in membros}
+    for id_membro in [i for i in _indice["registros"] if i not in atuais]:
+        _indexar(id_membro, None)
+    for id_membro, membro in atuais.items():
+        if _indice["registros"].get(id_membro) is not membro:
+            _indexar(id_membro, membro)
+    _indice["origem"] = membros
+
+
+# --- Consulta ---
+
+def _pontuar(vocabulario, termo):
+    """{id: pontos} dos membros com algum termo igual, começando por ou contendo o termo da consulta."""
+    pontos = {}
+
+    def _marcar(termos, valor):
+        for encontrado in termos:
+            for id_membro in vocabulario["ids_por_termo"][encontrado]:
+                if pontos.get(id_membro, 0) < valor:
+                    pontos[id_membro] = valor
+
+    ordenados = vocabulario["ordenados"]
+    inicio = bisect.bisect_left(ordenados, termo)
+    fim = bisect.bisect_left(ordenados, termo + "\uffff")
+    _marcar(ordenados[inicio:fim], PONTOS_PREFIXO)
+    if termo in vocabulario["ids_por_termo"]:
+        _marcar([termo], PONTOS_IGUAL)
+    if len(termo) >= 3:
+        candidatos = None
+        for trigrama in _trigramas(termo):
+            termos = vocabulario["trigramas"].get(trigrama, set())
+            candidatos = set(termos) if candidatos is None else candidatos & termos
+            if not candidatos:
+                break
+        _marcar([t for t in candidatos or () if termo in t and not t.startswith(termo)], PONTOS_TRECHO)
+    return pontos
+
+
+def buscar(consulta):
+    """Membros que casam com todos os termos da consulta (nome, CPF ou telefone), do mais relevante ao menos."""
+    consulta = str(consulta or "")
+    digitos = _digitos(consulta)
+    if digitos and not re.sub(r"[\d\s.\-/()+]", "", consulta):
+        termos = [("digitos", digitos)]  # só números e pontuação: CPF ou telefone, digitado com ou sem máscara
+    else:
+        termos = [("nome", t) for t in normalizar(consulta).split()]
+    if not termos:
+        return []
+    with _trava:
+        _atualizar()
+        total = None
+        for vocabulario, termo in termos:
+            pontos = _pontuar(_indice[vocabulario], termo)
+            if total is None:
+                total = pontos
+            else:
+                total = {i: total[i] + p for i, p in pontos.items() if i in total}
+            if not total:
+                return []
+        registros = _indice["registros"]
+        ordem = sorted(total, key=lambda i: (-total[i], normalizar(registros[i].get("nome"))))
+        return [registros[i] for i in ordem]
@@ -0,0 +1,176 @@
+from datetime import date
+import numpy as np
+
+# --- Representação colunar (NumPy) de uma partição do livro-caixa ---
+
+CAMPOS_CODIFICADOS = ("tipo", "categoria", "mes_referencia", "dizimista")
+CAPACIDADE_INICIAL = 64
+
+# Código 0 é sempre o valor vazio
+_dicionarios = {campo: {"valores": [""], "codigos": {"": 0}, "array": None} for campo in CAMPOS_CODIFICADOS}
+
+
+def codigo(campo, valor):
+    """Código do valor no dicionário do campo (acrescentado se for novo)."""
+    dicionario = _dicionarios[campo]
+    valor = "" if valor is None else str(valor)
+    codigo_valor = dicionario["codigos"].get(valor)
+    if codigo_valor is None:
+        codigo_valor = dicionario["codigos"][valor] = len(dicionario["valores"])
+        dicionario["valores"].append(valor)
+        dicionario["array"] = None
+    return codigo_valor
+
+
+def _decodificador(campo):
+    """Array com os valores do dicionário (indexado pelo código)."""
+    dicionario = _dicionarios[campo]
+    if dicionario["array"] is None:
+        dicionario["array"] = np.array(dicionario["valores"], dtype=object)
+    return dicionario["array"]
+
+
+def centavos(valor):
+    try:
+        return int(round(float(valor or 0) * 100))
+    except (TypeError, ValueError):
+        return 0
+
+
+def ordinal(data):
+    """Data (date ou texto AAAA-MM-DD) como ordinal; 0 se inválida."""
+    if isinstance(data, date):
+        return data.toordinal()
+    try:
+        return date.fromisoformat(str(data)[:10]).toordinal()
+    except ValueError:
+        return 0
+
+
+# --- Construção e manutenção incremental ---
+
+def _alocar(capacidade):
+    tabela = {
+        "dia": np.zeros(capacidade, dtype=np.int32),
+        "centavos": np.zeros(capacidade, dtype=np.int64),
+        "ativo": np.zeros(capacidade, dtype=bool),
+    }
+    for campo in CAMPOS_CODIFICADOS:
+        tabela[campo] = np.zeros(capacidade, dtype=np.int32)
+    return tabela
+
+
+def montar(movimentos):
+    """Tabela colunar dos movimentos."""
+    movimentos = list(movimentos)
+    tabela = {"n": 0, "removidas": 0, "registros": [], "linha_por_id": {}, "colunas": _alocar(max(CAPACIDADE_INICIAL, 2 * len(movimentos)))}
+    for movimento in movimentos:
+        anexar(tabela, movimento)
+    return tabela
+
+
+def anexar(tabela, movimento):
+    colunas = tabela["colunas"]
+    linha = tabela["n"]
+    if linha == len(colunas["dia"]):
+        maiores = _alocar(2 * linha)
+        for nome, array in colunas.items():
+            maiores[nome][:linha] = array
+        colunas = tabela["colunas"] = maiores
+    colunas["dia"][linha] = ordinal(movimento.get("data"))
+    colunas["centavos"][linha] = centavos(movimento.get("valor"))
+    colunas["ativo"][linha] = True
+    for campo in CAMPOS_CODIFICADOS:
+        colunas[campo][linha] = codigo(campo, movimento.get(campo))
+    tabela["registros"].append(movimento)
+    tabela["linha_por_id"][movimento.get("id")] = linha
+    tabela["n"] = linha + 1
+
+
+def remover(tabela, id_movimento):
+    """Marca a linha do movimento como removida; compacta a tabela quando metade dela é lixo."""
+    linha = tabela["linha_por_id"].pop(id_movimento, None)
+    if linha is None:
+        return
+    tabela["colunas"]["ativo"][linha] = False
+    tabela["registros"][linha] = None
+    tabela["removidas"] += 1
+    if tabela["removidas"] > max(CAPACIDADE_INICIAL, tabela["n"] // 2):
+        tabela.update(montar(r for r in tabela["registros"] if r is not None))
+
+
+# --- Consultas ---
+
+def mascara(tabela, inicio=None, fim=None, **filtros):
+    """Linhas ativas com dia entre inicio e fim (inclusive) e campos codificados iguais aos filtros (None = todos)."""
+    n = tabela["n"]
+    colunas = tabela["colunas"]
+    selecao = colunas["ativo"][:n].copy()
+    if inicio is not None:
+        selecao &= colunas["dia"][:n] >= ordinal(inicio)
+    if fim is not None:
+        selecao &= colunas["dia"][:n] <= ordinal(fim)
+    for campo, valor in filtros.items():
+        if valor is None:
+            continue
+        codigo_valor = _dicionarios[campo]["codigos"].get(str(valor))
+        if codigo_valor is None:
+            return np.zeros(n, dtype=bool)
+        selecao &= colunas[campo][:n] == codigo_valor
+    return selecao
+
+
+def linhas(tabela, selecao):
+    """Índices das linhas selecionadas em ordem de data (empates na ordem de inserção)."""
+    indices = np.flatnonzero(selecao)
+    return indices[np.argsort(tabela["colunas"]["dia"][indices], kind="stable")]
+
+
+def somar_por(tabela, selecao, *campos):
+    """{(valores dos campos): (centavos, quantidade)} das linhas selecionadas."""
+    colunas = tabela["colunas"]
+    n = tabela["n"]
+    if not selecao.any():
+        return {}
+    codigos = np.stack([colunas[c][:n][selecao] for c in campos], axis=1)
+    grupos, posicao = np.unique(codigos, axis=0, return_inverse=True)
+    posicao = posicao.ravel()
+    somas = np.zeros(len(grupos), dtype=np.int64)
+    np.add.at(somas, posicao, colunas["centavos"][:n][selecao])
+    quantidades = np.bincount(posicao, minlength=len(grupos))
+    decodificadores = [_decodificador(c) for c in campos]
+    return {
+        tuple(d[g] for d, g in zip(decodificadores, grupo)): (int(soma), int(quantidade))
+        for grupo, soma, quantidade in zip(grupos, somas, quantidades)
+    }
+
+
+def somas_por_dia(tabela):
+    """Dias (ordinais, em ordem) com entradas e saídas em centavos acumuladas até cada um."""
+    colunas = tabela["colunas"]
+    n = tabela["n"]
+    entradas = mascara(tabela, tipo="Entrada")
+    saidas = mascara(tabela, tipo="Saída")
+    selecao = entradas | saidas
+    dias, posicao = np.unique(colunas["dia"][:n][selecao], return_inverse=True)
+    valores = colunas["centavos"][:n][selecao]
+    por_dia_entradas = np.zeros(len(dias), dtype=np.int64)
+    por_dia_saidas = np.zeros(len(dias), dtype=np.int64)
+    np.add.at(por_dia_entradas, posicao, np.where(entradas[selecao], valores, 0))
+    np.add.at(por_dia_saidas, posicao, np.where(saidas[selecao], valores, 0))
+    return {"dias": dias, "entradas": np.cumsum(por_dia_entradas), "saidas": np.cumsum(por_dia_saidas)}
+
+
+def colunas_quadro(tabela, indices, campos):
+    """Colunas (listas/arrays) das linhas indicadas para montar um DataFrame."""
+    colunas = tabela["colunas"]
+    quadro = {}
+    for campo in campos:
+        if campo in CAMPOS_CODIFICADOS:
+            quadro[campo] = _decodificador(campo)[colunas[campo][indices]]
+        elif campo == "valor":
+            quadro[campo] = colunas["centavos"][indices] / 100
+        else:
+            registros = tabela["registros"]
+            quadro[campo] = [registros[i].get(campo) for i in indices]
+    return quadro
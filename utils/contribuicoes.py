@@ -0,0 +1,117 @@
+import threading
+from utils import livro_caixa, referencias_membros, repositorio
+
+# --- Índice de contribuições (dízimos) por membro ---
+
+CAMINHO_MEMBROS = "data/membros.json"
+
+_trava = threading.Lock()
+_indice = {"origem": (None, None, None), "versao": 0, "ids": frozenset(), "migrados": {}, "por_membro": {}, "sem_cadastro": {}}
+
+
+def _id_membro(indice, dizimista):
+    """Id do membro de um dizimista (id, ou nome registrado na migração), ou None se não houver cadastro."""
+    id_membro = indice["migrados"].get(dizimista, dizimista)
+    return id_membro if id_membro in indice["ids"] else None
+
+
+def _atualizar():
+    doacoes = livro_caixa.doacoes()
+    membros = repositorio.carregar(CAMINHO_MEMBROS)
+    migrados = repositorio.carregar(referencias_membros.CAMINHO_DIZIMISTAS_MIGRADOS, padrao={})
+    with _trava:
+        origem = _indice["origem"]
+        if origem[0] is doacoes and origem[1] is membros and origem[2] is migrados:
+            return _indice
+        _indice.update(ids=frozenset(m.get("id") for m in membros), migrados=migrados)
+        por_membro, sem_cadastro = {}, {}
+        for dizimista, por_ano in doacoes.items():
+            id_membro = _id_membro(_indice, dizimista)
+            destino = sem_cadastro.setdefault(dizimista, {}) if id_membro is None else por_membro.setdefault(id_membro, {})
+            for ano, doacao in por_ano.items():
+                _acumular(destino, ano, doacao)
+        _indice.update(origem=(doacoes, membros, migrados), por_membro=por_membro, sem_cadastro=sem_cadastro)
+        _indice["versao"] += 1
+        return _indice
+
+
+def _acumular(por_ano, ano, doacao):
+    """Soma a doação do ano (o mesmo membro pode aparecer pelo id e pelo nome)."""
+    atual = por_ano.get(ano)
+    if atual is None:
+        por_ano[ano] = {"total": doacao["total"], "quantidade": doacao["quantidade"], "por_mes": dict(doacao["por_mes"])}
+        return
+    atual["total"] = round(atual["total"] + doacao["total"], 2)
+    atual["quantidade"] += doacao["quantidade"]
+    for ano_mes, total in doacao["por_mes"].items():
+        atual["por_mes"][ano_mes] = round(atual["por_mes"].get(ano_mes, 0) + total, 2)
+
+
+def versao():
+    """Muda sempre que as doações ou o cadastro de membros mudam (identifica os dados dos extratos)."""
+    return _atualizar()["versao"]
+
+
+def do_membro(id_membro, ano=None):
+    """{"total", "quantidade", "por_mes": {ano_mes: total}} das contribuições do membro (em um ano ou em todos)."""
+    por_ano = _atualizar()["por_membro"].get(id_membro, {})
+    anos_pedidos = [str(ano)] if ano is not None else sorted(por_ano)
+    resumo = {"total": 0.0, "quantidade": 0, "por_mes": {}}
+    for ano_doacao in anos_pedidos:
+        doacao = por_ano.get(ano_doacao)
+        if doacao:
+            resumo["total"] += doacao["total"]
+            resumo["quantidade"] += doacao["quantidade"]
+            resumo["por_mes"].update(doacao["por_mes"])  # as chaves (AAAA-MM) não se repetem entre anos
+    resumo["total"] = round(resumo["total"], 2)
+    return resumo
+
+
+def do_ano(ano):
+    """{id do membro: {"total", "quantidade", "por_mes"}} dos membros que contribuíram no ano."""
+    ano = str(ano)
+    return {
+        id_membro: por_ano[ano]
+        for id_membro, por_ano in _atualizar()["por_membro"].items()
+        if ano in por_ano
+    }
+
+
+def sem_cadastro(ano=None):
+    """{nome: total} das contribuições com dizimista que não corresponde a nenhum membro cadastrado."""
+    totais = {}
+    for nome, por_ano in _atualizar()["sem_cadastro"].items():
+        total = sum(d["total"] for a, d in por_ano.items() if ano is None or a == str(ano))
+        if total:
+            totais[nome] = round(total, 2)
+    return totais
+
+
+def extratos(ano, ids_membros=None):
+    """Dados dos comprovantes anuais: [{"membro", "ano", "total", "movimentos"}] dos membros
+    (todos os que contribuíram no ano, ou os ids pedidos), em ordem de nome.
+
+    Os lançamentos saem de uma única seleção colunar na partição do ano (categoria Dízimo).
+    """
+    ano = str(ano)
+    do_ano_pedido = do_ano(ano)
+    ids = set(do_ano_pedido) if ids_membros is None else set(ids_membros) & set(do_ano_pedido)
+    indice = _atualizar()
+    membros = [m for m in repositorio.carregar(CAMINHO_MEMBROS) if m.get("id") in ids]
+    colunas = livro_caixa.quadro(["data", "mes_referencia", "descricao", "valor", "dizimista"], ano=ano, categoria="Dízimo")
+    por_membro = {}
+    for data, mes_referencia, descricao, valor, dizimista in zip(*colunas.values()):
+        por_membro.setdefault(_id_membro(indice, dizimista), []).append({
+            "data": str(data or ""), "mes_referencia": str(mes_referencia or ""),
+            "descricao": str(descricao or ""), "valor": float(valor),
+        })
+    lista = []
+    for membro in sorted(membros, key=lambda m: m.get("nome", "")):
+        movimentos = sorted(por_membro.get(membro.get("id"), []), key=lambda m: m["data"])
+        lista.append({
+            "membro": {"id": membro.get("id"), "nome": membro.get("nome", ""), "cpf": membro.get("cpf", "")},
+            "ano": ano,
+            "total": round(sum(m["valor"] for m in movimentos), 2),
+            "movimentos": movimentos,
+        })
+    return lista
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+from utils import repositorio
+
+# --- Definições dos formulários indexadas por id ---
+
+CAMINHO_FORMULARIOS = os.path.join("data", "formularios.json")
+
+_trava = threading.Lock()
+_indice = {"origem": None, "planos": {}}
+
+
+def _normalizar_campo(campo):
+    """Formulários antigos guardam os campos só como texto; trata-os como texto opcional."""
+    if isinstance(campo, str):
+        return {"id": None, "tipo": "texto", "pergunta": campo, "obrigatorio": False}
+    return campo
+
+
+def _montar_plano(formulario):
+    campos = []
+    for campo in formulario.get("campos", []):
+        campo = _normalizar_campo(campo)
+        pergunta = campo.get("pergunta") or ""
+        obrigatorio = bool(campo.get("obrigatorio", False))
+        campos.append({
+            "id": campo.get("id"),
+            "coluna": campo.get("id") or pergunta,
+            "tipo": campo.get("tipo"),
+            "pergunta": pergunta,
+            "label": pergunta + (" *" if obrigatorio else ""),
+            "key": f"input_{campo.get('id') or pergunta.replace(' ', '_')}",
+            "obrigatorio": obrigatorio,
+            "opcoes": tuple(campo.get("opcoes", [])),
+        })
+    # Muda quando colunas, tipos, perguntas ou opções mudam (invalida tabelas e agregados das respostas)
+    versao = hashlib.sha1(json.dumps(
+        [[c["coluna"], c["tipo"], c["pergunta"], list(c["opcoes"])] for c in campos], ensure_ascii=False
+    ).encode("utf-8")).hexdigest()[:16]
+    return {
+        "id": formulario.get("id"),
+        "versao": versao,
+        "titulo": formulario.get("titulo", "Formulário sem Título"),
+        "descricao": formulario.get("descricao", "Preencha os campos abaixo."),
+        "campos": tuple(campos),
+        "obrigatorios": frozenset(c["coluna"] for c in campos if c["obrigatorio"]),
+    }
+
+
+def obter_plano(id_formulario):
+    """Retorna o plano de renderização do formulário (ou None se ele não existir)."""
+    formularios = repositorio.carregar(CAMINHO_FORMULARIOS)
+    with _trava:
+        if _indice["origem"] is not formularios:
+            _indice["planos"] = {f.get("id"): _montar_plano(f) for f in formularios}
+            _indice["origem"] = formularios
+        return _indice["planos"].get(id_formulario)
+
+
+def valores_por_coluna(plano, respostas):
+    """Reescreve as respostas de um envio por coluna (respostas antigas vêm indexadas pela pergunta)."""
+    por_pergunta = {c["pergunta"]: c["coluna"] for c in plano["campos"]} if plano else {}
+    colunas = {c["coluna"] for c in plano["campos"]} if plano else set()
+    return {
+        (chave if chave in colunas else por_pergunta.get(chave, chave)): valor
+        for chave, valor in respostas.items()
+    }
+
+
+def invalidar():
+    """Descarta o índice (chamado sempre que os formulários são gravados)."""
+    with _trava:
+        _indice["origem"] = None
+        _indice["planos"] = {}
@@ -0,0 +1,68 @@
+import csv
+import io
+import tempfile
+from utils import definicoes_formularios, respostas_formularios
+
+# --- Exportação das respostas de um formulário (CSV e Excel), em fluxo ---
+
+TAMANHO_BLOCO = 1000  # linhas do CSV acumuladas antes de cada escrita
+
+
+def _colunas(id_formulario, plano):
+    """Colunas da exportação: campos do formulário na ordem e, depois, chaves de perguntas que não existem mais."""
+    colunas = [c["coluna"] for c in plano["campos"]] if plano else []
+    conhecidas = set(colunas)
+    for resposta in respostas_formularios.iterar_respostas(id_formulario):
+        for chave in definicoes_formularios.valores_por_coluna(plano, resposta.get("respostas", {})):
+            if chave not in conhecidas:
+                conhecidas.add(chave)
+                colunas.append(chave)
+    return colunas
+
+
+def linhas(id_formulario):
+    """Gera o cabeçalho e depois uma lista de valores por resposta."""
+    plano = definicoes_formularios.obter_plano(id_formulario)
+    colunas = _colunas(id_formulario, plano)
+    rotulos = {c["coluna"]: c["pergunta"] for c in plano["campos"]} if plano else {}
+    yield ["Enviado em", "ID Resposta"] + [rotulos.get(c, c) for c in colunas]
+    for resposta in respostas_formularios.iterar_respostas(id_formulario):
+        valores = definicoes_formularios.valores_por_coluna(plano, resposta.get("respostas", {}))
+        yield [resposta.get("enviado_em"), resposta.get("id_resposta")] + [valores.get(c) for c in colunas]
+
+
+def gerar_csv(id_formulario):
+    """Gera o CSV em blocos de bytes (UTF-8)."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for numero, linha in enumerate(linhas(id_formulario), start=1):
+        escritor.writerow(linha)
+        if numero % TAMANHO_BLOCO == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def arquivo_csv(id_formulario):
+    """Arquivo temporário com o CSV, já posicionado no início."""
+    arquivo = tempfile.TemporaryFile()
+    for bloco in gerar_csv(id_formulario):
+        arquivo.write(bloco)
+    arquivo.seek(0)
+    return arquivo
+
+
+def arquivo_excel(id_formulario):
+    """Arquivo temporário com a planilha (openpyxl em modo write_only), já posicionado no início."""
+    from openpyxl import Workbook
+
+    planilha = Workbook(write_only=True)
+    aba = planilha.create_sheet("Respostas")
+    for linha in linhas(id_formulario):
+        aba.append(linha)
+    arquivo = tempfile.TemporaryFile()
+    planilha.save(arquivo)
+    arquivo.seek(0)
+    return arquivo
@@ -0,0 +1,215 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+# --- Fila de geração de relatórios (PDF/Excel) em um pool de processos ---
+
+DIRETORIO_RESULTADOS = os.path.join("data", "cache_relatorios")
+MAXIMO_PROCESSOS = 2
+LIMITE_RESULTADOS = 50  # arquivos mantidos no cache em disco (os mais antigos saem primeiro)
+PRAZO_LOTE = 3600  # segundos: resultados de lotes acompanhados há menos que isso não são apagados
+PRAZO_TRABALHOS = 3600  # segundos: pedidos concluídos há mais que isso saem da memória
+
+NA_FILA = "na_fila"
+GERANDO = "gerando"
+PRONTO = "pronto"
+ERRO = "erro"
+
+_trava = threading.Lock()
+_executor = {"pool": None}
+_trabalhos = {}
+_lotes = {}  # ids do lote (tupla) -> última vez que foi pedido ou consultado
+
+
+def _pool():
+    # "spawn" evita copiar (fork) as threads do servidor do Streamlit para os filhos
+    if _executor["pool"] is None:
+        _executor["pool"] = ProcessPoolExecutor(
+            max_workers=MAXIMO_PROCESSOS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor["pool"]
+
+
+def _descartar_pool(pool):
+    """Um processo filho morreu: o pool não aceita mais pedidos e o próximo _pool() cria outro."""
+    if _executor["pool"] is pool:
+        _executor["pool"] = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _enviar(funcao, args):
+    """Envia ao pool, recriando-o uma vez se ele estiver quebrado (chamada com a trava tomada)."""
+    pool = _pool()
+    try:
+        return pool.submit(_renderizar, funcao, args)
+    except BrokenProcessPool:
+        _descartar_pool(pool)
+        return _pool().submit(_renderizar, funcao, args)
+
+
+def _renderizar(funcao, args):
+    """Executado no processo filho."""
+    resultado = funcao(*args)
+    return resultado.getvalue() if hasattr(resultado, "getvalue") else resultado
+
+
+def _caminho_resultado(id_trabalho):
+    return os.path.join(DIRETORIO_RESULTADOS, id_trabalho)
+
+
+def _limpar_resultados_antigos():
+    agora = time.time()
+    with _trava:
+        for ids, visto_em in list(_lotes.items()):
+            if agora - visto_em > PRAZO_LOTE:
+                del _lotes[ids]
+        protegidos = {id_trabalho for ids in _lotes for id_trabalho in ids}
+    arquivos = [
+        os.path.join(DIRETORIO_RESULTADOS, a) for a in os.listdir(DIRETORIO_RESULTADOS)
+        if not a.endswith(".tmp") and a not in protegidos
+    ]
+    arquivos.sort(key=os.path.getmtime)
+    for caminho in arquivos[:-LIMITE_RESULTADOS]:
+        os.remove(caminho)
+
+
+def _podar_trabalhos():
+    """Tira da memória os pedidos concluídos há mais de PRAZO_TRABALHOS (chamada com a trava tomada)."""
+    limite = time.time() - PRAZO_TRABALHOS
+    for id_trabalho in [i for i, t in _trabalhos.items() if t["estado"] in (PRONTO, ERRO) and t["concluido_em"] < limite]:
+        del _trabalhos[id_trabalho]
+
+
+def _concluir(trabalho, futuro):
+    """Callback do pool: grava o resultado no cache em disco e atualiza a situação do pedido."""
+    id_trabalho = trabalho["id"]
+    try:
+        conteudo = futuro.result()
+        os.makedirs(DIRETORIO_RESULTADOS, exist_ok=True)
+        temporario = f"{_caminho_resultado(id_trabalho)}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(conteudo)
+        os.replace(temporario, _caminho_resultado(id_trabalho))
+        _limpar_resultados_antigos()
+        estado, erro = PRONTO, None
+    except Exception as e:
+        print(f"[ERRO] Falha ao gerar relatório {trabalho['nome']}: {e}")
+        estado, erro = ERRO, str(e)
+        if isinstance(e, BrokenProcessPool):
+            with _trava:
+                _descartar_pool(trabalho["pool"])
+    with _trava:
+        trabalho.update(estado=estado, erro=erro, concluido_em=time.time(), futuro=None, pool=None)
+
+
+def identificador(nome, funcao, *args):
+    """Id do pedido: mesmo relatório, mesmos dados e mesmo dia resultam no mesmo id."""
+    conteudo = pickle.dumps((funcao.__module__, funcao.__qualname__, args, date.today().isoformat()))
+    return f"{nome}-{hashlib.sha256(conteudo).hexdigest()[:32]}"
+
+
+def solicitar(nome, funcao, *args):
+    """Enfileira a geração (se ainda não existir pronta ou em andamento) e retorna o id do pedido."""
+    id_trabalho = identificador(nome, funcao, *args)
+    with _trava:
+        _podar_trabalhos()
+        trabalho = _trabalhos.get(id_trabalho)
+        if trabalho and trabalho["estado"] in (NA_FILA, GERANDO):
+            return id_trabalho  # outra sessão já pediu o mesmo relatório
+        if os.path.exists(_caminho_resultado(id_trabalho)):
+            return id_trabalho
+        trabalho = {"id": id_trabalho, "nome": nome, "estado": NA_FILA, "erro": None, "criado_em": time.time()}
+        try:
+            futuro = _enviar(funcao, args)
+        except Exception as e:  # pool quebrado de novo, argumentos que não podem ser enviados ao filho...
+            print(f"[ERRO] Falha ao enfileirar relatório {nome}: {e}")
+            trabalho.update(estado=ERRO, erro=str(e), concluido_em=time.time())
+            _trabalhos[id_trabalho] = trabalho
+            return id_trabalho
+        trabalho.update(futuro=futuro, pool=_executor["pool"])
+        _trabalhos[id_trabalho] = trabalho
+    futuro.add_done_callback(lambda f: _concluir(trabalho, f))
+    return id_trabalho
+
+
+def situacao(id_trabalho):
+    """Estado do pedido (na_fila, gerando, pronto, erro ou None se nunca foi pedido) e progresso de 0 a 1."""
+    if os.path.exists(_caminho_resultado(id_trabalho)):
+        return {"estado": PRONTO, "progresso": 1.0, "erro": None}
+    with _trava:
+        trabalho = _trabalhos.get(id_trabalho)
+        if trabalho is None:
+            return {"estado": None, "progresso": 0.0, "erro": None}
+        estado = trabalho["estado"]
+        if estado == PRONTO:
+            # O arquivo saiu do cache em disco depois de pronto: precisa ser pedido de novo
+            del _trabalhos[id_trabalho]
+            return {"estado": None, "progresso": 0.0, "erro": None}
+        futuro = trabalho.get("futuro")
+        if estado == NA_FILA and futuro is not None and futuro.running():
+            estado = trabalho["estado"] = GERANDO
+        progresso = {NA_FILA: 0.1, GERANDO: 0.5}.get(estado, 1.0)
+        return {"estado": estado, "progresso": progresso, "erro": trabalho["erro"]}
+
+
+def resultado(id_trabalho):
+    """Conteúdo do relatório pronto (ou None)."""
+    try:
+        with open(_caminho_resultado(id_trabalho), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+
+# --- Lotes ---
+
+def solicitar_lote(nome, funcao, lista_args):
+    """Enfileira um pedido por item de lista_args (tupla de argumentos) e retorna os ids, na mesma ordem."""
+    ids = [identificador(nome, funcao, *args) for args in lista_args]
+    with _trava:
+        _lotes[tuple(ids)] = time.time()  # protege os resultados já prontos antes de enfileirar o resto
+    return [solicitar(nome, funcao, *args) for args in lista_args]
+
+
+def situacao_lote(ids):
+    """Situação do lote: pronto só quando todos os pedidos estão prontos; erro se algum falhou."""
+    with _trava:
+        if tuple(ids) in _lotes:
+            _lotes[tuple(ids)] = time.time()  # ainda acompanhado: os resultados continuam protegidos
+    situacoes = [situacao(id_trabalho) for id_trabalho in ids]
+    estados = [s["estado"] for s in situacoes]
+    erros = [s["erro"] for s in situacoes if s["estado"] == ERRO]
+    prontos = estados.count(PRONTO)
+    if erros:
+        estado = ERRO
+    elif None in estados:
+        estado = None  # parte do lote nunca foi pedida
+    elif prontos == len(estados):
+        estado = PRONTO
+    elif GERANDO in estados:
+        estado = GERANDO
+    else:
+        estado = NA_FILA
+    progresso = sum(s["progresso"] for s in situacoes) / len(situacoes) if situacoes else 1.0
+    return {"estado": estado, "progresso": progresso, "erro": erros[0] if erros else None, "prontos": prontos, "total": len(situacoes)}
+
+
+def resultado_zip(ids, nomes_arquivos):
+    """ZIP com o resultado de cada pedido do lote sob o nome correspondente (ou None se algum não estiver pronto)."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for id_trabalho, nome_arquivo in zip(ids, nomes_arquivos):
+            conteudo = resultado(id_trabalho)
+            if conteudo is None:
+                return None
+            arquivo_zip.writestr(nome_arquivo, conteudo)
+    return buffer.getvalue()
@@ -0,0 +1,207 @@
+import hashlib
+import io
+import os
+import posixpath
+import threading
+import time
+from PIL import Image, ImageOps
+from utils import repositorio
+
+# --- Fotos de membros e logos de ministérios (migração: python -m utils.imagens) ---
+
+PASTA_IMAGENS = "data/imagens"
+PASTA_MINIATURAS = "miniaturas"
+LADO_MAXIMO = 1280
+QUALIDADE_JPEG = 85
+CARENCIA_COLETA = 3600  # segundos: imagens mais novas ficam para a próxima coleta (o registro pode estar sendo gravado)
+
+# Coleções e campos que guardam caminhos de imagens
+REFERENCIAS = {
+    "data/membros.json": "foto",
+    "data/ministerios.json": "logo",
+}
+
+_trava = threading.RLock()
+
+
+def normalizar_caminho(caminho):
+    """Caminho com separador "/" (os antigos foram gravados com "\\" no Windows)."""
+    if not caminho:
+        return ""
+    return posixpath.normpath(str(caminho).replace("\\", "/"))
+
+
+def _no_armazenamento(caminho):
+    return normalizar_caminho(caminho).startswith(PASTA_IMAGENS + "/")
+
+
+# --- Processamento ---
+
+def _preparar(imagem):
+    """Imagem com a orientação do EXIF aplicada, em RGB (ou RGBA se tiver transparência) e sem metadados."""
+    imagem = ImageOps.exif_transpose(imagem)
+    transparente = imagem.mode in ("RGBA", "LA", "PA") or "transparency" in imagem.info
+    perfil_cor = imagem.info.get("icc_profile")
+    imagem = imagem.convert("RGBA" if transparente else "RGB")
+    imagem.info = {"icc_profile": perfil_cor} if perfil_cor else {}  # o perfil de cor não é metadado pessoal
+    return imagem
+
+
+def _codificar(imagem, extensao):
+    """Bytes da imagem no formato da extensão, só com o perfil de cor."""
+    saida = io.BytesIO()
+    opcoes = {"icc_profile": imagem.info["icc_profile"]} if "icc_profile" in imagem.info else {}
+    if extensao == "png":
+        imagem.save(saida, "PNG", optimize=True, **opcoes)
+    else:
+        imagem.save(saida, "JPEG", quality=QUALIDADE_JPEG, optimize=True, progressive=True, **opcoes)
+    return saida.getvalue()
+
+
+def _gravar(conteudo, caminho):
+    """Grava de forma atômica."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{threading.get_ident()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def caminho_miniatura(caminho, largura):
+    """Miniaturas de PNG são PNG (podem ter transparência); as demais, JPEG."""
+    base, extensao = posixpath.splitext(posixpath.basename(normalizar_caminho(caminho)))
+    return f"{PASTA_IMAGENS}/{PASTA_MINIATURAS}/{base}_{largura}{'.png' if extensao.lower() == '.png' else '.jpg'}"
+
+
+def salvar_imagem(arquivo, larguras=()):
+    """Processa o arquivo enviado e o guarda no armazenamento (se ainda não estiver lá), com as
+    miniaturas das larguras pedidas.
+
+    Retorna o caminho da imagem (data/imagens/<hh>/<hash>.jpg ou .png). ValueError se o arquivo não for uma imagem.
+    """
+    try:
+        imagem = Image.open(arquivo)
+        imagem.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError("O arquivo enviado não é uma imagem válida.") from e
+    imagem = _preparar(imagem)
+    imagem.thumbnail((LADO_MAXIMO, LADO_MAXIMO), Image.LANCZOS)
+    extensao = "png" if imagem.mode == "RGBA" else "jpg"
+    conteudo = _codificar(imagem, extensao)
+    resumo = hashlib.sha256(conteudo).hexdigest()
+    caminho = f"{PASTA_IMAGENS}/{resumo[:2]}/{resumo}.{extensao}"
+    with _trava:
+        if os.path.exists(caminho):
+            os.utime(caminho)  # já existia: renova a data para a coleta não levá-la antes de o registro ser gravado
+        else:
+            _gravar(conteudo, caminho)
+    for largura in larguras:
+        miniatura(caminho, largura)
+    return caminho
+
+
+def miniatura(caminho, largura):
+    """Caminho da miniatura com a largura de exibição (gerada se faltar).
+
+    Retorna None se a imagem não existir ou não puder ser lida.
+    """
+    caminho = normalizar_caminho(caminho)
+    if not caminho or not os.path.exists(caminho):
+        return None
+    destino = caminho_miniatura(caminho, largura)
+    if os.path.exists(destino):  # a imagem não muda depois de gravada
+        return destino
+    try:
+        with Image.open(caminho) as original:
+            imagem = _preparar(original)
+    except (OSError, Image.DecompressionBombError) as e:
+        print(f"[ERRO] Não foi possível gerar a miniatura de {caminho}: {e}")
+        return None
+    imagem.thumbnail((largura, largura * 3), Image.LANCZOS)
+    if destino.endswith(".jpg") and imagem.mode == "RGBA":
+        imagem = imagem.convert("RGB")
+    _gravar(_codificar(imagem, destino.rsplit(".", 1)[1]), destino)
+    return destino
+
+
+# --- Migração e coleta ---
+
+def _caminhos_referenciados():
+    return {
+        normalizar_caminho(registro.get(campo))
+        for caminho, campo in REFERENCIAS.items()
+        for registro in repositorio.carregar(caminho)
+        if registro.get(campo)
+    }
+
+
+def migrar():
+    """Copia para o armazenamento as imagens gravadas fora dele e normaliza os caminhos;
+    retorna {coleção: registros alterados}. Os arquivos originais não são alterados nem apagados.
+    """
+    with _trava:
+        alterados = {}
+        for caminho_colecao, campo in REFERENCIAS.items():
+            registros = repositorio.copia_editavel(repositorio.carregar(caminho_colecao))
+            quantidade = 0
+            for registro in registros:
+                atual = registro.get(campo)
+                if not atual or _no_armazenamento(atual):
+                    continue
+                novo = normalizar_caminho(atual)
+                if os.path.exists(novo):
+                    try:
+                        with open(novo, "rb") as f:
+                            novo = salvar_imagem(f)
+                    except ValueError:
+                        print(f"[AVISO] {atual} não é uma imagem válida; mantida fora do armazenamento.")
+                if novo != atual:
+                    registro[campo] = novo
+                    quantidade += 1
+            if quantidade:
+                repositorio.salvar(caminho_colecao, registros)
+            alterados[caminho_colecao] = quantidade
+        return alterados
+
+
+def coletar_lixo(carencia=CARENCIA_COLETA):
+    """Apaga as imagens de data/imagens (e as miniaturas) que nenhum registro usa e que têm mais
+    de `carencia` segundos; retorna (arquivos apagados, bytes liberados). Não migra nem toca em
+    arquivos fora do armazenamento."""
+    with _trava:
+        if not os.path.isdir(PASTA_IMAGENS):
+            return 0, 0
+        usados = _caminhos_referenciados()
+        limite = time.time() - carencia
+        # Miniaturas de imagens ainda fora do armazenamento (não migradas) também ficam
+        mantidas = {posixpath.splitext(posixpath.basename(c))[0] for c in usados if not _no_armazenamento(c)}
+        apagados, liberados = 0, 0
+        for pasta in sorted(os.listdir(PASTA_IMAGENS)):
+            caminho_pasta = f"{PASTA_IMAGENS}/{pasta}"
+            if pasta == PASTA_MINIATURAS or not os.path.isdir(caminho_pasta):
+                continue
+            for arquivo in os.listdir(caminho_pasta):
+                caminho = f"{caminho_pasta}/{arquivo}"
+                info = os.stat(caminho)
+                if caminho in usados or info.st_mtime > limite:
+                    mantidas.add(posixpath.splitext(arquivo)[0])
+                    continue
+                os.remove(caminho)
+                apagados += 1
+                liberados += info.st_size
+        pasta_miniaturas = f"{PASTA_IMAGENS}/{PASTA_MINIATURAS}"
+        if os.path.isdir(pasta_miniaturas):
+            for arquivo in os.listdir(pasta_miniaturas):
+                if posixpath.splitext(arquivo)[0].rsplit("_", 1)[0] not in mantidas:
+                    caminho = f"{pasta_miniaturas}/{arquivo}"
+                    liberados += os.path.getsize(caminho)
+                    os.remove(caminho)
+                    apagados += 1
+        return apagados, liberados
+
+
+if __name__ == "__main__":
+    for caminho, quantidade in migrar().items():
+        print(f"{caminho}: {quantidade} registro(s) convertido(s)")
+    apagados, liberados = coletar_lixo()
+    print(f"{apagados} arquivo(s) sem uso apagado(s), {liberados / 1024:.1f} KB liberados")
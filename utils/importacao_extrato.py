@@ -0,0 +1,237 @@
+import csv
+import io
+import unicodedata
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# --- Importação de extratos bancários (OFX e CSV) ---
+
+TAMANHO_BLOCO = 64 * 1024
+
+COLUNAS_DATA = ("data", "data lancamento", "data do lancamento", "data movimento", "dt", "date")
+COLUNAS_VALOR = ("valor", "valor (r$)", "valor r$", "quantia", "montante", "amount")
+COLUNAS_DESCRICAO = ("descricao", "historico", "lancamento", "detalhes", "memo", "description")
+COLUNAS_CREDITO = ("credito", "entrada", "credito (r$)")
+COLUNAS_DEBITO = ("debito", "saida", "debito (r$)")
+
+FORMATOS_DATA = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y", "%d.%m.%Y")
+
+
+def _sem_acentos(texto):
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+
+def _normalizar_cabecalho(nome):
+    return " ".join(_sem_acentos(str(nome)).lower().split())
+
+
+def _data(texto):
+    texto = str(texto).strip()
+    if len(texto) >= 8 and texto[:8].isdigit():  # OFX: AAAAMMDD[HHMMSS[.XXX][fuso]]
+        texto = f"{texto[:4]}-{texto[4:6]}-{texto[6:8]}"
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto[:10], formato).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _valor(texto):
+    """Número de um extrato: aceita "1.234,56", "1,234.56", "-1234.56", "R$ 1.234,56" e sufixo C/D.
+
+    O último separador ("," ou ".") é o decimal e o outro, o de milhar; um separador único seguido
+    de exatamente três dígitos ("1.234") é de milhar. Retorna None se o texto não for um número
+    e ValueError se ele for ambíguo ("0,123", "1234.567", "1.23.4").
+    """
+    original = texto
+    texto = str(texto or "").strip().upper().replace("R$", "").replace(" ", "")
+    sinal = 1
+    if texto.endswith("D"):
+        sinal, texto = -1, texto[:-1]
+    elif texto.endswith("C"):
+        texto = texto[:-1]
+    if texto.startswith("(") and texto.endswith(")"):
+        sinal, texto = -sinal, texto[1:-1]
+    if texto[:1] in ("-", "+"):
+        sinal, texto = (-sinal if texto[0] == "-" else sinal), texto[1:]
+
+    posicao = max(texto.rfind(","), texto.rfind("."))
+    inteiro, decimais, milhar = texto, "", None
+    if posicao >= 0:
+        separador = texto[posicao]
+        unico = texto.count(",") + texto.count(".") == 1
+        if texto.count(separador) > 1 or (unico and len(texto) - posicao - 1 == 3):
+            milhar = separador  # "1.234.567" ou "1.234"
+        else:
+            inteiro, decimais = texto[:posicao], texto[posicao + 1:]
+            milhar = "." if separador == "," else ","
+    grupos = inteiro.split(milhar) if milhar else [inteiro]
+    if not all(g.isdigit() for g in grupos) or not (decimais.isdigit() or decimais == ""):
+        return None
+    if len(grupos) > 1 and (not 1 <= len(grupos[0]) <= 3 or grupos[0].startswith("0") or any(len(g) != 3 for g in grupos[1:])):
+        raise ValueError(f"Valor ambíguo no extrato: {original!r} (não dá para saber qual é o separador decimal).")
+    return sinal * float("".join(grupos) + "." + (decimais or "0"))
+
+
+def _texto(arquivo, amostra):
+    """Envolve o arquivo binário em um leitor de texto com a codificação detectada na amostra
+    (o leitor deve ser desligado com detach() ao final para não fechar o arquivo enviado)."""
+    arquivo.seek(0)
+    codificacao = "utf-8-sig"
+    try:
+        amostra.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start < len(amostra) - 4:  # erro no meio da amostra, não só um caractere cortado no fim
+            codificacao = "cp1252"
+    return io.TextIOWrapper(arquivo, encoding=codificacao, errors="replace", newline="")
+
+
+# --- CSV ---
+
+def _coluna(cabecalho, nomes):
+    return next((i for i, nome in enumerate(cabecalho) if nome in nomes), None)
+
+
+def ler_csv(arquivo):
+    """Gera {"data", "valor", "descricao"} para cada linha válida de um extrato CSV."""
+    amostra = arquivo.read(TAMANHO_BLOCO)
+    texto = _texto(arquivo, amostra)
+    # Extratos brasileiros usam ";" (a vírgula é o separador decimal); csv.Sniffer falha com as linhas de título
+    delimitador = next((d for d in ";\t|" if d.encode() in amostra), ",")
+    try:
+        yield from _linhas_csv(csv.reader(texto, delimiter=delimitador))
+    finally:
+        texto.detach()
+
+
+def _linhas_csv(leitor):
+    # O cabeçalho é a primeira linha que tem coluna de data e de descrição (bancos costumam pôr linhas de título antes)
+    for linha in leitor:
+        cabecalho = [_normalizar_cabecalho(c) for c in linha]
+        data, descricao = _coluna(cabecalho, COLUNAS_DATA), _coluna(cabecalho, COLUNAS_DESCRICAO)
+        if data is not None and descricao is not None:
+            break
+    else:
+        raise ValueError("Não foi possível identificar as colunas de data e descrição do CSV.")
+    valor = _coluna(cabecalho, COLUNAS_VALOR)
+    credito, debito = _coluna(cabecalho, COLUNAS_CREDITO), _coluna(cabecalho, COLUNAS_DEBITO)
+    if valor is None and credito is None and debito is None:
+        raise ValueError("Não foi possível identificar a coluna de valor do CSV.")
+
+    def _campo(linha, indice):
+        return linha[indice] if indice is not None and indice < len(linha) else ""
+
+    for linha in leitor:
+        dia = _data(_campo(linha, data))
+        if valor is not None:
+            quantia = _valor(_campo(linha, valor))
+        else:
+            quantia = abs(_valor(_campo(linha, credito)) or 0) - abs(_valor(_campo(linha, debito)) or 0)
+        if dia is None or not quantia:
+            continue  # linhas de saldo, totais e rodapé
+        yield {"data": dia, "valor": quantia, "descricao": " ".join(_campo(linha, descricao).split())}
+
+
+# --- OFX ---
+
+def _tags_ofx(texto):
+    """Gera (TAG, conteúdo até a próxima tag) lendo o OFX em blocos (funciona em SGML e XML)."""
+    resto = ""
+    while True:
+        bloco = texto.read(TAMANHO_BLOCO)
+        if not bloco:
+            break
+        partes = (resto + bloco).split("<")
+        resto = partes.pop()
+        for parte in partes:
+            tag, _, conteudo = parte.partition(">")
+            if tag:
+                yield tag.strip().upper(), conteudo
+    tag, _, conteudo = resto.partition(">")
+    if tag:
+        yield tag.strip().upper(), conteudo
+
+
+def ler_ofx(arquivo):
+    """Gera {"data", "valor", "descricao"} para cada transação (<STMTTRN>) de um extrato OFX."""
+    amostra = arquivo.read(TAMANHO_BLOCO)
+    texto = _texto(arquivo, amostra)
+    try:
+        yield from _transacoes_ofx(_tags_ofx(texto))
+    finally:
+        texto.detach()
+
+
+def _transacoes_ofx(tags):
+    transacao = None
+    for tag, conteudo in tags:
+        if tag == "STMTTRN":
+            transacao = {}
+        elif tag == "/STMTTRN" and transacao is not None:
+            dia, quantia = _data(transacao.get("DTPOSTED", "")), _valor(transacao.get("TRNAMT"))
+            nome, memo = transacao.get("NAME", ""), transacao.get("MEMO", "")
+            descricao = memo if not nome or nome in memo else f"{nome} {memo}".strip()
+            if dia and quantia:
+                yield {"data": dia, "valor": quantia, "descricao": " ".join(descricao.split())}
+            transacao = None
+        elif transacao is not None and not tag.startswith("/"):
+            transacao[tag] = conteudo.strip()
+
+
+def ler_extrato(arquivo, nome_arquivo):
+    """DataFrame (data, valor, descricao) do extrato, pelo tipo do arquivo (.ofx ou .csv)."""
+    leitor = ler_ofx if nome_arquivo.lower().endswith(".ofx") else ler_csv
+    return pd.DataFrame.from_records(leitor(arquivo), columns=["data", "valor", "descricao"])
+
+
+# --- Categorização e duplicados (vetorizados) ---
+
+def _descricoes_normalizadas(descricoes):
+    return (
+        descricoes.fillna("").astype(str)
+        .str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+        .str.lower().str.split().str.join(" ")
+    )
+
+
+def categorizar(quadro, regras_entrada, regras_saida, padrao_entrada, padrao_saida):
+    """Acrescenta "tipo" (pelo sinal do valor) e "categoria" (primeira regra que casar com a descrição).
+
+    As regras são {categoria: expressão regular}, comparadas sem acentos e em minúsculas.
+    """
+    quadro = quadro.copy()
+    entrada = (quadro["valor"] >= 0).to_numpy()
+    descricoes = _descricoes_normalizadas(quadro["descricao"])
+    condicoes, categorias = [], []
+    for regras, do_tipo in ((regras_entrada, entrada), (regras_saida, ~entrada)):
+        for categoria, padrao in regras.items():
+            condicoes.append(do_tipo & descricoes.str.contains(padrao, regex=True).to_numpy())
+            categorias.append(categoria)
+    quadro["tipo"] = np.where(entrada, "Entrada", "Saída")
+    quadro["categoria"] = np.select(condicoes, categorias, default=np.where(entrada, padrao_entrada, padrao_saida))
+    return quadro
+
+
+def _chaves(datas, tipos, valores, descricoes):
+    centavos = (pd.to_numeric(valores, errors="coerce").fillna(0).abs() * 100).round().astype("int64")
+    return (
+        datas.astype(str).str[:10] + "|" + tipos.astype(str) + "|"
+        + centavos.astype(str) + "|" + _descricoes_normalizadas(descricoes)
+    )
+
+
+def duplicados(quadro, existentes):
+    """Máscara das linhas do extrato que já estão no livro-caixa.
+
+    quadro tem data, tipo, valor (com sinal) e descricao; existentes tem data, tipo, valor e
+    descricao dos lançamentos do mesmo período. A n-ésima ocorrência de uma chave no extrato
+    é duplicada se o livro-caixa tiver pelo menos n lançamentos com essa chave.
+    """
+    if quadro.empty or existentes.empty:
+        return pd.Series(False, index=quadro.index)
+    indice = _chaves(existentes["data"], existentes["tipo"], existentes["valor"], existentes["descricao"]).value_counts()
+    chaves = _chaves(quadro["data"], quadro["tipo"], quadro["valor"], quadro["descricao"])
+    ocorrencia = chaves.groupby(chaves).cumcount()
+    return ocorrencia < chaves.map(indice).fillna(0).astype("int64")
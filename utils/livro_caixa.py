@@ -0,0 +1,726 @@
+import gzip
+import json
+import os
+import threading
+import numpy as np
+from datetime import date, datetime, timedelta
+from utils import colunas_livro_caixa, repositorio
+
+# --- Livro-caixa particionado por ano ---
+
+DIRETORIO_FINANCEIRO = os.path.join("data", "financeiro")
+CAMINHO_MANIFESTO = os.path.join(DIRETORIO_FINANCEIRO, "manifesto.json")
+CAMINHO_FINANCEIRO_LEGADO = os.path.join("data", "financeiro.json")
+DIRETORIO_ENCERRADOS = os.path.join(DIRETORIO_FINANCEIRO, "encerrados")
+
+FORMATO_MANIFESTO = 3  # muda quando a estrutura das entradas muda (o manifesto é refeito)
+ANO_SEM_DATA = "0000"  # partição dos movimentos sem data válida (fica fora dos saldos)
+
+_trava = threading.RLock()
+_particoes = {}
+_encerrados = {}
+
+
+def _ano(movimento):
+    ano = str(movimento.get("data", ""))[:4]
+    return ano if len(ano) == 4 and ano.isdigit() else ANO_SEM_DATA
+
+
+def _ano_mes(movimento):
+    return str(movimento.get("data", ""))[:7]
+
+
+def _celula(movimento):
+    return (_ano_mes(movimento), movimento.get("mes_referencia", ""), movimento.get("tipo", ""), movimento.get("categoria", ""))
+
+
+def _caminho_particao(ano):
+    return os.path.join(DIRETORIO_FINANCEIRO, f"{ano}.json")
+
+
+def _caminho_encerrado(ano):
+    return os.path.join(DIRETORIO_ENCERRADOS, f"{ano}.json.gz")
+
+
+def _reais(centavos):
+    return int(centavos) / 100
+
+
+# --- Resumo de uma partição ---
+
+def _aplicar(estado, movimento, sinal):
+    """Soma (sinal=1) ou desconta (sinal=-1) um movimento do resumo e da tabela da partição."""
+    estado["saldos"] = None
+    chave = _celula(movimento)
+    celula = estado["celulas"].setdefault(chave, {"centavos": 0, "quantidade": 0, "dizimistas": {}})
+    celula["centavos"] += sinal * colunas_livro_caixa.centavos(movimento.get("valor"))
+    celula["quantidade"] += sinal
+    dizimista = movimento.get("dizimista") or ""
+    if dizimista:
+        celula["dizimistas"][dizimista] = celula["dizimistas"].get(dizimista, 0) + sinal
+        if celula["dizimistas"][dizimista] <= 0:
+            del celula["dizimistas"][dizimista]
+    if celula["quantidade"] <= 0:
+        del estado["celulas"][chave]
+    if dizimista and movimento.get("categoria") == "Dízimo":
+        por_mes = estado["doacoes"].setdefault(dizimista, {})
+        doacao = por_mes.setdefault(_ano_mes(movimento), [0, 0])
+        doacao[0] += sinal * colunas_livro_caixa.centavos(movimento.get("valor"))
+        doacao[1] += sinal
+        if doacao[1] <= 0:
+            del por_mes[_ano_mes(movimento)]
+            if not por_mes:
+                del estado["doacoes"][dizimista]
+
+    if sinal > 0:
+        colunas_livro_caixa.anexar(estado["tabela"], movimento)
+    else:
+        colunas_livro_caixa.remover(estado["tabela"], movimento.get("id"))
+
+
+def _resumir(ano, movimentos=None):
+    """Lê a partição (ou usa os movimentos do arquivo de um exercício encerrado) e monta o resumo e a tabela colunar."""
+    if movimentos is None:
+        movimentos = repositorio.carregar(_caminho_particao(ano))
+    estado = {"origem": movimentos, "celulas": {}, "doacoes": {}, "tabela": colunas_livro_caixa.montar(()), "saldos": None}
+    for movimento in movimentos:
+        _aplicar(estado, movimento, 1)
+    _particoes[ano] = estado
+    return estado
+
+
+def _buscar_na_particao(estado, id_movimento):
+    tabela = estado["tabela"]
+    linha = tabela["linha_por_id"].get(id_movimento)
+    return None if linha is None else tabela["registros"][linha]
+
+
+def _entrada_manifesto(estado):
+    """Resumo da partição no formato gravado no manifesto (valores em centavos)."""
+    datas = [str(r.get("data", "")) for r in estado["tabela"]["registros"] if r is not None]
+    totais = {"Entrada": 0, "Saída": 0}
+    celulas = []
+    for (ano_mes, mes_referencia, tipo, categoria), celula in sorted(estado["celulas"].items()):
+        if tipo in totais:
+            totais[tipo] += celula["centavos"]
+        celulas.append({
+            "ano_mes": ano_mes, "mes_referencia": mes_referencia, "tipo": tipo, "categoria": categoria,
+            "centavos": celula["centavos"], "quantidade": celula["quantidade"], "dizimistas": dict(celula["dizimistas"]),
+        })
+    return {
+        "formato": FORMATO_MANIFESTO, "min": min(datas), "max": max(datas), "quantidade": len(datas),
+        "Entrada": totais["Entrada"], "Saída": totais["Saída"], "celulas": celulas,
+        "doacoes": {
+            nome: {ano_mes: list(doacao) for ano_mes, doacao in sorted(por_mes.items())}
+            for nome, por_mes in sorted(estado["doacoes"].items())
+        },
+    }
+
+
+def _gravar_entrada(ano, estado):
+    """Regrava a entrada do ano no manifesto (ou a remove, se a partição ficou vazia)."""
+    manifesto = dict(repositorio.carregar(CAMINHO_MANIFESTO, padrao={}))
+    if estado["tabela"]["linha_por_id"]:
+        manifesto[ano] = _entrada_manifesto(estado)
+    else:
+        manifesto.pop(ano, None)
+    repositorio.salvar(CAMINHO_MANIFESTO, manifesto)
+
+
+def _manifesto():
+    with _trava:
+        _migrar_legado()
+        manifesto = repositorio.carregar(CAMINHO_MANIFESTO, padrao={})
+        if any(info.get("formato") != FORMATO_MANIFESTO for info in manifesto.values()):
+            manifesto = reconstruir_manifesto()
+        return manifesto
+
+
+def _particao(ano):
+    """Resumo e tabela da partição do ano, refeitos se a coleção mudou por fora (chamada com a trava tomada).
+
+    Para um exercício encerrado, descompacta o arquivo dele (uma vez por processo: o arquivo não muda).
+    """
+    estado = _particoes.get(ano)
+    if encerrado(ano):
+        if estado is None or not estado.get("encerrado"):
+            estado = _resumir(ano, _ler_encerrado(ano)["movimentos"])
+            estado["encerrado"] = True
+        return estado
+    if estado is not None and estado["origem"] is repositorio.carregar(_caminho_particao(ano)):
+        return estado
+    estado = _resumir(ano)
+    registrada = repositorio.carregar(CAMINHO_MANIFESTO, padrao={}).get(ano)
+    esperada = _entrada_manifesto(estado) if estado["tabela"]["linha_por_id"] else None
+    campos = ("formato", "min", "max", "quantidade", "Entrada", "Saída")
+    if (registrada is None) != (esperada is None) or (
+        esperada and any(registrada.get(c) != esperada[c] for c in campos)
+    ):
+        _gravar_entrada(ano, estado)
+    return estado
+
+
+def _concluir_escrita(ano, estado, anterior, variacao, aplicar):
+    """Ajusta o resumo e o manifesto após gravar na partição (ou os refaz, se ela mudou mais do que o esperado)."""
+    atual = repositorio.carregar(_caminho_particao(ano))
+    if len(atual) != len(anterior) + variacao:
+        estado = _resumir(ano)
+    else:
+        aplicar()
+        estado["origem"] = atual
+    _gravar_entrada(ano, estado)
+
+
+def _anos_no_periodo(inicio, fim):
+    """Anos cujas datas (min/max do manifesto) se sobrepõem ao período: as demais partições nem são abertas."""
+    de, ate = str(inicio), str(fim)
+    return sorted(ano for ano, info in _manifesto().items() if info["min"] <= ate and info["max"] >= de)
+
+
+def _localizar(id_movimento):
+    """(ano, resumo) da partição que contém o movimento, procurando dos anos mais recentes para os antigos
+    (os exercícios encerrados só são descompactados se o movimento não estiver nos anos abertos)."""
+    manifesto = _manifesto()
+    for ano in sorted(manifesto, key=lambda a: ("encerramento" not in manifesto[a], a), reverse=True):
+        estado = _particao(ano)
+        if id_movimento in estado["tabela"]["linha_por_id"]:
+            return ano, estado
+    return None, None
+
+
+def _exigir_aberto(ano):
+    if encerrado(ano):
+        raise ValueError(f"O exercício {ano} está encerrado: seus movimentos não podem ser alterados.")
+
+
+# --- Migração e manutenção ---
+
+def _migrar_legado():
+    """Distribui os movimentos do arquivo único antigo nas partições por ano (uma única vez).
+
+    Se já existem partições e só o manifesto sumiu, ele é refeito a partir delas.
+    """
+    if os.path.exists(CAMINHO_MANIFESTO):
+        return
+    if repositorio.particoes(DIRETORIO_FINANCEIRO) or (os.path.isdir(DIRETORIO_ENCERRADOS) and os.listdir(DIRETORIO_ENCERRADOS)):
+        reconstruir_manifesto()
+        return
+    por_ano = {}
+    for movimento in repositorio.carregar(CAMINHO_FINANCEIRO_LEGADO):
+        por_ano.setdefault(_ano(movimento), []).append(movimento)
+    manifesto = {}
+    for ano, movimentos in sorted(por_ano.items()):
+        repositorio.salvar(_caminho_particao(ano), movimentos)
+        manifesto[ano] = _entrada_manifesto(_resumir(ano))
+    repositorio.salvar(CAMINHO_MANIFESTO, manifesto)
+
+
+def reconstruir_manifesto():
+    """Refaz o manifesto lendo todas as partições (as do diretório e as já registradas) e os arquivos dos exercícios encerrados."""
+    with _trava:
+        _particoes.clear()
+        anos_particoes = set(repositorio.carregar(CAMINHO_MANIFESTO, padrao={}))
+        anos_particoes.update(ano for ano in repositorio.particoes(DIRETORIO_FINANCEIRO) if len(ano) == 4)
+        manifesto = {}
+        if os.path.isdir(DIRETORIO_ENCERRADOS):
+            for arquivo in os.listdir(DIRETORIO_ENCERRADOS):
+                if arquivo.endswith(".json.gz"):
+                    ano = arquivo[:-len(".json.gz")]
+                    conteudo = _ler_encerrado(ano)
+                    # Resumo refeito dos movimentos do arquivo: a entrada gravada nele pode ser de um formato antigo
+                    estado = _resumir(ano, conteudo["movimentos"])
+                    estado["encerrado"] = True
+                    manifesto[ano] = {**_entrada_manifesto(estado), "encerramento": conteudo["encerramento"]}
+        for ano in sorted(anos_particoes - set(manifesto)):
+            estado = _resumir(ano)
+            if estado["tabela"]["linha_por_id"]:
+                manifesto[ano] = _entrada_manifesto(estado)
+        repositorio.salvar(CAMINHO_MANIFESTO, manifesto)
+        return repositorio.carregar(CAMINHO_MANIFESTO, padrao={})
+
+
+# --- Escrita ---
+
+def inserir(movimento):
+    """Inclui o movimento na partição do ano dele (ValueError se o exercício estiver encerrado)."""
+    with _trava:
+        _migrar_legado()
+        ano = _ano(movimento)
+        _exigir_aberto(ano)
+        estado = _particao(ano)
+        anterior = estado["origem"]
+        repositorio.inserir(_caminho_particao(ano), movimento)
+        _concluir_escrita(ano, estado, anterior, 1, lambda: _aplicar(estado, dict(movimento), 1))
+
+
+def inserir_lote(movimentos):
+    """Inclui vários movimentos com uma única gravação por partição (importação de extratos).
+
+    ValueError, sem gravar nada, se algum deles for de um exercício encerrado.
+    """
+    with _trava:
+        _migrar_legado()
+        por_ano = {}
+        for movimento in movimentos:
+            por_ano.setdefault(_ano(movimento), []).append(movimento)
+        for ano in por_ano:
+            _exigir_aberto(ano)
+        for ano, novos in sorted(por_ano.items()):
+            estado = _particao(ano)
+            anterior = estado["origem"]
+            repositorio.salvar(_caminho_particao(ano), list(anterior) + novos)
+
+            def _aplicar_novos(estado=estado, novos=novos):
+                for movimento in novos:
+                    _aplicar(estado, dict(movimento), 1)
+            _concluir_escrita(ano, estado, anterior, len(novos), _aplicar_novos)
+        return sum(len(novos) for novos in por_ano.values())
+
+
+def atualizar(id_movimento, alteracoes):
+    """Aplica as alterações ao movimento (mudando-o de partição se o ano mudar). Retorna False se ele não existir.
+
+    ValueError se o movimento ou a nova data forem de um exercício encerrado.
+    """
+    with _trava:
+        ano, estado = _localizar(id_movimento)
+        if ano is None:
+            return False
+        _exigir_aberto(ano)
+        original = _buscar_na_particao(estado, id_movimento)
+        novo = {**original, **alteracoes}
+        _exigir_aberto(_ano(novo))
+        if _ano(novo) != ano:
+            remover(id_movimento)
+            inserir(novo)
+            return True
+
+        anterior = estado["origem"]
+        if not repositorio.atualizar(_caminho_particao(ano), id_movimento, alteracoes):
+            return False
+
+        def _trocar():
+            _aplicar(estado, original, -1)
+            _aplicar(estado, novo, 1)
+        _concluir_escrita(ano, estado, anterior, 0, _trocar)
+        return True
+
+
+def remover(id_movimento):
+    """Remove o movimento. Retorna False se ele não existir (ValueError se o exercício estiver encerrado)."""
+    with _trava:
+        ano, estado = _localizar(id_movimento)
+        if ano is None:
+            return False
+        _exigir_aberto(ano)
+        original = _buscar_na_particao(estado, id_movimento)
+        anterior = estado["origem"]
+        if not repositorio.remover(_caminho_particao(ano), id_movimento):
+            return False
+        _concluir_escrita(ano, estado, anterior, -1, lambda: _aplicar(estado, original, -1))
+        return True
+
+
+def substituir_dizimistas(substituicoes):
+    """Troca o campo dizimista ({valor antigo: novo}) nos exercícios abertos; retorna quantos movimentos mudaram.
+
+    Só as partições cujo resumo no manifesto tem algum dos valores antigos são reescritas
+    (uma gravação por ano). Os arquivos dos exercícios encerrados não são alterados.
+    """
+    alterados = 0
+    with _trava:
+        for ano, info in list(_manifesto().items()):
+            if "encerramento" in info:
+                continue
+            presentes = {nome for c in info["celulas"] for nome in c["dizimistas"]}
+            if not presentes & set(substituicoes):
+                continue
+            movimentos = repositorio.copia_editavel(repositorio.carregar(_caminho_particao(ano)))
+            for movimento in movimentos:
+                if movimento.get("dizimista") in substituicoes:
+                    movimento["dizimista"] = substituicoes[movimento["dizimista"]]
+                    alterados += 1
+            repositorio.salvar(_caminho_particao(ano), movimentos)
+            _gravar_entrada(ano, _resumir(ano))
+    return alterados
+
+
+# --- Encerramento de exercício ---
+
+def encerrado(ano):
+    return "encerramento" in _manifesto().get(str(ano), {})
+
+
+def _ler_encerrado(ano):
+    """Conteúdo do arquivo do exercício encerrado (descompactado uma vez por processo)."""
+    with _trava:
+        if ano not in _encerrados:
+            with gzip.open(_caminho_encerrado(ano), "rt", encoding="utf-8") as f:
+                conteudo = json.load(f, object_hook=repositorio.RegistroSomenteLeitura)
+            _encerrados[ano] = {**conteudo, "movimentos": tuple(conteudo["movimentos"])}
+        return _encerrados[ano]
+
+
+def encerramento(ano):
+    """Dados do encerramento do exercício (em reais), lidos do manifesto, ou None se ele estiver aberto.
+
+    {"em", "saldo_abertura", "saldo_fechamento", "por_mes": {AAAA-MM: {tipo: soma}},
+    "por_categoria": {tipo: {categoria: soma}}}
+    """
+    dados = _manifesto().get(str(ano), {}).get("encerramento")
+    if dados is None:
+        return None
+    return {
+        "em": dados["em"],
+        "saldo_abertura": _reais(dados["saldo_abertura"]),
+        "saldo_fechamento": _reais(dados["saldo_fechamento"]),
+        "por_mes": {mes: {tipo: _reais(v) for tipo, v in tipos.items()} for mes, tipos in dados["por_mes"].items()},
+        "por_categoria": {tipo: {cat: _reais(v) for cat, v in cats.items()} for tipo, cats in dados["por_categoria"].items()},
+    }
+
+
+def _saldo_abertura(ano):
+    """Saldo de abertura do exercício em centavos: fechamento do último exercício encerrado
+    mais o resultado dos anos abertos entre ele e o ano pedido."""
+    saldo = 0
+    for ano_anterior, info in sorted(_manifesto().items()):
+        if ano_anterior >= str(ano) or ano_anterior == ANO_SEM_DATA:
+            continue
+        if "encerramento" in info:
+            saldo = info["encerramento"]["saldo_fechamento"]
+        else:
+            saldo += info["Entrada"] - info["Saída"]
+    return saldo
+
+
+def saldo_abertura(ano):
+    return _reais(_saldo_abertura(ano))
+
+
+def encerrar_exercicio(ano):
+    """Encerra o exercício: grava o arquivo compactado e imutável do ano, marca a entrada dele no
+    manifesto e esvazia a partição viva. Retorna o saldo de fechamento.
+
+    Só anos anteriores ao atual podem ser encerrados, em ordem (ValueError caso contrário).
+    """
+    ano = str(ano)
+    with _trava:
+        manifesto = _manifesto()
+        if ano not in manifesto or ano == ANO_SEM_DATA:
+            raise ValueError(f"Não há movimentos no exercício {ano}.")
+        _exigir_aberto(ano)
+        if ano >= str(date.today().year):
+            raise ValueError("Só exercícios anteriores ao ano atual podem ser encerrados.")
+        pendentes = [a for a in sorted(manifesto) if a < ano and a != ANO_SEM_DATA and "encerramento" not in manifesto[a]]
+        if pendentes:
+            raise ValueError(f"Encerre antes o(s) exercício(s) {', '.join(pendentes)}.")
+
+        estado = _particao(ano)
+        entrada = _entrada_manifesto(estado)
+        por_mes, por_categoria = {}, {}
+        for c in entrada["celulas"]:
+            if c["tipo"] not in ("Entrada", "Saída"):
+                continue
+            mes = por_mes.setdefault(c["ano_mes"], {"Entrada": 0, "Saída": 0})
+            mes[c["tipo"]] += c["centavos"]
+            categorias_tipo = por_categoria.setdefault(c["tipo"], {})
+            categorias_tipo[c["categoria"]] = categorias_tipo.get(c["categoria"], 0) + c["centavos"]
+        abertura = _saldo_abertura(ano)
+        dados_encerramento = {
+            "em": datetime.now().isoformat(timespec="seconds"),
+            "saldo_abertura": abertura,
+            "saldo_fechamento": abertura + entrada["Entrada"] - entrada["Saída"],
+            "por_mes": por_mes,
+            "por_categoria": por_categoria,
+        }
+
+        os.makedirs(DIRETORIO_ENCERRADOS, exist_ok=True)
+        caminho = _caminho_encerrado(ano)
+        temporario = f"{caminho}.tmp"
+        with gzip.open(temporario, "wt", encoding="utf-8") as f:
+            json.dump({
+                "ano": ano, "entrada": entrada, "encerramento": dados_encerramento,
+                "movimentos": repositorio.copia_editavel(estado["origem"]),
+            }, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+        os.chmod(caminho, 0o444)
+
+        manifesto = dict(manifesto)
+        manifesto[ano] = {**entrada, "encerramento": dados_encerramento}
+        repositorio.salvar(CAMINHO_MANIFESTO, manifesto)
+        repositorio.salvar(_caminho_particao(ano), [])
+        _particoes.pop(ano, None)
+        return _reais(dados_encerramento["saldo_fechamento"])
+
+
+# --- Leitura pelo manifesto (sem abrir partições) ---
+
+def anos():
+    """Anos com movimentos, em ordem."""
+    return sorted(_manifesto())
+
+
+def _celulas(ano=None):
+    manifesto = _manifesto()
+    for ano_particao in ([ano] if ano is not None else sorted(manifesto)):
+        yield from manifesto.get(ano_particao, {}).get("celulas", ())
+
+
+def meses():
+    """Anos-meses (AAAA-MM) com movimentos, em ordem."""
+    return sorted({c["ano_mes"] for c in _celulas()})
+
+
+def categorias(ano=None):
+    """Categorias presentes no livro-caixa (ou em um ano), em ordem alfabética."""
+    return sorted({c["categoria"] for c in _celulas(ano)})
+
+
+def meses_referencia(ano=None):
+    """Meses de referência usados nos movimentos (ou nos de um ano), em ordem alfabética."""
+    return sorted({c["mes_referencia"] for c in _celulas(ano) if c["mes_referencia"]})
+
+
+def limites_datas():
+    """(primeira, última) data do livro-caixa como date, ou None se não houver movimentos."""
+    limites = [(info["min"], info["max"]) for ano, info in _manifesto().items() if ano != ANO_SEM_DATA]
+    if not limites:
+        return None
+    return date.fromisoformat(min(l[0] for l in limites)[:10]), date.fromisoformat(max(l[1] for l in limites)[:10])
+
+
+def _novo_total():
+    return {"Entrada": 0, "Saída": 0, "quantidade": 0, "por_categoria": {"Entrada": {}, "Saída": {}}, "dizimistas": {}}
+
+
+def _somar_celula(total, tipo, categoria, centavos, quantidade, dizimistas):
+    total[tipo] = total.get(tipo, 0) + centavos
+    total["quantidade"] += quantidade
+    por_tipo = total["por_categoria"].setdefault(tipo, {})
+    por_tipo[categoria] = por_tipo.get(categoria, 0) + centavos
+    if categoria == "Dízimo":
+        for nome, vezes in dizimistas.items():
+            total["dizimistas"][nome] = total["dizimistas"].get(nome, 0) + vezes
+
+
+def _em_reais(total):
+    """Converte os centavos acumulados em _somar_celula para reais."""
+    for tipo, por_categoria in total["por_categoria"].items():
+        total[tipo] = _reais(total.get(tipo, 0))
+        for categoria, centavos in por_categoria.items():
+            por_categoria[categoria] = _reais(centavos)
+    return total
+
+
+def totais(categoria=None, mes_referencia=None, tipo=None, ano=None):
+    """Totais do livro-caixa (ou de um ano) a partir do manifesto, com os filtros da tela de relatórios.
+
+    Retorna {"Entrada", "Saída", "quantidade", "por_categoria": {tipo: {categoria: soma}},
+    "dizimistas": {nome: lançamentos de dízimo}, "meses_com_entrada"}.
+    """
+    total = _novo_total()
+    meses_com_entrada = set()
+    for c in _celulas(ano):
+        if c["tipo"] == "Entrada":
+            meses_com_entrada.add(c["ano_mes"])
+        if categoria is not None and c["categoria"] != categoria:
+            continue
+        if mes_referencia is not None and c["mes_referencia"] != mes_referencia:
+            continue
+        if tipo is not None and c["tipo"] != tipo:
+            continue
+        _somar_celula(total, c["tipo"], c["categoria"], c["centavos"], c["quantidade"], c["dizimistas"])
+    total["meses_com_entrada"] = len(meses_com_entrada)
+    return _em_reais(total)
+
+
+def totais_periodo(inicio, fim):
+    """Totais entre duas datas: meses cobertos vêm do manifesto, só as partições dos meses das pontas são lidas.
+
+    Um mês conta como coberto se o período inclui todos os dias dele que podem ter movimentos
+    (limitados pela primeira e última data do ano), então o período padrão das telas, da
+    primeira à última data do livro-caixa, não abre nenhuma partição.
+    """
+    de, ate = str(inicio), str(fim)
+    manifesto = _manifesto()
+    total = _novo_total()
+    meses_das_pontas = set()
+    for c in _celulas():
+        ano_mes = c["ano_mes"]
+        if not (de[:7] <= ano_mes <= ate[:7]):
+            continue
+        info = manifesto.get(ano_mes[:4], {})
+        primeiro_dia = max(f"{ano_mes}-01", info.get("min", "")[:10])
+        ultimo_dia = min(_ultimo_dia(ano_mes) or "9999", info.get("max", "9999")[:10])
+        if de <= primeiro_dia and ultimo_dia <= ate:
+            _somar_celula(total, c["tipo"], c["categoria"], c["centavos"], c["quantidade"], c["dizimistas"])
+        else:
+            meses_das_pontas.add(ano_mes)
+    with _trava:
+        for ano_mes in sorted(meses_das_pontas):
+            tabela = _particao(ano_mes[:4])["tabela"]
+            selecao = colunas_livro_caixa.mascara(
+                tabela, max(de, f"{ano_mes}-01"), min(ate, _ultimo_dia(ano_mes) or ate)
+            )
+            for (tipo, categoria), (centavos, quantidade) in colunas_livro_caixa.somar_por(tabela, selecao, "tipo", "categoria").items():
+                _somar_celula(total, tipo, categoria, centavos, quantidade, {})
+            dizimos = selecao & colunas_livro_caixa.mascara(tabela, categoria="Dízimo")
+            for (nome,), (_, vezes) in colunas_livro_caixa.somar_por(tabela, dizimos, "dizimista").items():
+                if nome:
+                    total["dizimistas"][nome] = total["dizimistas"].get(nome, 0) + vezes
+    return _em_reais(total)
+
+
+def _ultimo_dia(ano_mes):
+    """Último dia do mês (AAAA-MM-DD), ou None se ano_mes não for válido."""
+    try:
+        ano, mes = int(ano_mes[:4]), int(ano_mes[5:7])
+        proximo = date(ano + mes // 12, mes % 12 + 1, 1)
+    except ValueError:
+        return None
+    return str(proximo - timedelta(days=1))
+
+
+def saldo_acumulado():
+    """[(último dia do mês, saldo ao fim do mês)] de todo o histórico, para o gráfico de evolução."""
+    por_mes = {}
+    for c in _celulas():
+        if c["tipo"] in ("Entrada", "Saída") and _ultimo_dia(c["ano_mes"]):
+            sinal = 1 if c["tipo"] == "Entrada" else -1
+            por_mes[c["ano_mes"]] = por_mes.get(c["ano_mes"], 0) + sinal * c["centavos"]
+    evolucao = []
+    saldo = 0
+    for ano_mes in sorted(por_mes):
+        saldo += por_mes[ano_mes]
+        evolucao.append((_ultimo_dia(ano_mes), _reais(saldo)))
+    return evolucao
+
+
+# --- Doações por dizimista (pelo manifesto) ---
+
+_doacoes = {"origem": None, "por_dizimista": {}}
+
+
+def doacoes():
+    """{dizimista: {ano: {"total", "quantidade", "por_mes": {ano_mes: total}}}} dos dízimos de todos os anos.
+
+    Montado a partir das entradas do manifesto e refeito só quando ele muda.
+    """
+    manifesto = _manifesto()
+    with _trava:
+        if _doacoes["origem"] is not manifesto:
+            por_dizimista = {}
+            for ano, info in sorted(manifesto.items()):
+                for nome, por_mes in info.get("doacoes", {}).items():
+                    por_dizimista.setdefault(nome, {})[ano] = {
+                        "total": _reais(sum(d[0] for d in por_mes.values())),
+                        "quantidade": sum(d[1] for d in por_mes.values()),
+                        "por_mes": {ano_mes: _reais(d[0]) for ano_mes, d in por_mes.items()},
+                    }
+            _doacoes.update(origem=manifesto, por_dizimista=por_dizimista)
+        return _doacoes["por_dizimista"]
+
+
+# --- Leitura de movimentos (abre só as partições necessárias) ---
+
+def movimentos(ano=None):
+    """Movimentos de um ano ou, sem ano, de todas as partições (exercícios encerrados são descompactados)."""
+    with _trava:
+        if ano is not None:
+            if ano not in _manifesto():
+                return ()
+            if encerrado(ano):
+                return _ler_encerrado(ano)["movimentos"]
+            return repositorio.carregar(_caminho_particao(ano))
+        return tuple(m for ano_particao in anos() for m in movimentos(ano_particao))
+
+
+def buscar(id_movimento):
+    with _trava:
+        ano, estado = _localizar(id_movimento)
+        return _buscar_na_particao(estado, id_movimento) if estado else None
+
+
+def _selecionar(inicio, fim, ano, filtros):
+    """[(tabela, índices em ordem de data)] das partições que podem ter movimentos no recorte."""
+    if ano is not None:
+        anos_recorte = [ano] if ano in _manifesto() else []
+    elif inicio is not None or fim is not None:
+        anos_recorte = _anos_no_periodo(inicio or date.min, fim or date.max)
+    else:
+        anos_recorte = anos()
+    selecionadas = []
+    for ano_particao in anos_recorte:
+        tabela = _particao(ano_particao)["tabela"]
+        selecao = colunas_livro_caixa.mascara(tabela, inicio, fim, **filtros)
+        selecionadas.append((tabela, colunas_livro_caixa.linhas(tabela, selecao)))
+    return selecionadas
+
+
+def movimentos_do_periodo(inicio, fim):
+    """Movimentos com data entre inicio e fim (datas), em ordem de data, lendo só as partições do período."""
+    with _trava:
+        return [tabela["registros"][i] for tabela, indices in _selecionar(inicio, fim, None, {}) for i in indices]
+
+
+def quadro(campos, inicio=None, fim=None, ano=None, **filtros):
+    """Colunas {campo: valores} dos movimentos do recorte, prontas para pd.DataFrame.
+
+    Os filtros (tipo, categoria, mes_referencia, dizimista) são comparações de códigos
+    inteiros na tabela colunar; "valor" sai dos centavos e só os campos de texto livre
+    pedidos são lidos dos movimentos.
+    """
+    with _trava:
+        partes = [
+            colunas_livro_caixa.colunas_quadro(tabela, indices, campos)
+            for tabela, indices in _selecionar(inicio, fim, ano, filtros)
+        ]
+    return {campo: np.concatenate([np.asarray(p[campo]) for p in partes]) if partes else [] for campo in campos}
+
+
+# --- Saldos (somas acumuladas por dia) ---
+
+def _indice_saldos(estado):
+    """Dias (ordinais) da partição com entradas e saídas acumuladas até cada um (chamada com a trava tomada)."""
+    if estado["saldos"] is None:
+        estado["saldos"] = colunas_livro_caixa.somas_por_dia(estado["tabela"])
+    return estado["saldos"]
+
+
+def _acumulado(data, inclusive=True):
+    """(entradas, saídas) em centavos de todo o histórico até a data: anos anteriores pelo
+    manifesto e, no ano da data, busca binária no índice da partição."""
+    texto = str(data)
+    entradas = saidas = 0
+    for ano, info in _manifesto().items():
+        if ano == ANO_SEM_DATA or info["min"] > texto:
+            continue
+        if info["max"] < texto or (inclusive and info["max"][:10] <= texto):
+            entradas += info["Entrada"]
+            saidas += info["Saída"]
+            continue
+        with _trava:
+            indice = _indice_saldos(_particao(ano))
+        posicao = np.searchsorted(indice["dias"], colunas_livro_caixa.ordinal(data), side="right" if inclusive else "left")
+        if posicao:
+            entradas += int(indice["entradas"][posicao - 1])
+            saidas += int(indice["saidas"][posicao - 1])
+    return entradas, saidas
+
+
+def saldo_em(data):
+    """Saldo (entradas - saídas) de todo o histórico até a data, inclusive."""
+    entradas, saidas = _acumulado(data)
+    return _reais(entradas - saidas)
+
+
+def entradas_saidas_periodo(inicio, fim):
+    """(entradas, saídas) entre duas datas, inclusive."""
+    antes = _acumulado(inicio, inclusive=False)
+    ate_fim = _acumulado(fim)
+    return _reais(ate_fim[0] - antes[0]), _reais(ate_fim[1] - antes[1])
+
+
+if __name__ == "__main__":
+    for ano, info in reconstruir_manifesto().items():
+        print(f"{ano}: {info['quantidade']} movimento(s), de {info['min']} a {info['max']}")
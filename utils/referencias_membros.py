@@ -0,0 +1,190 @@
+import threading
+import uuid
+from utils import livro_caixa, repositorio
+
+# --- Referências a membros pelo id (migração: python -m utils.referencias_membros) ---
+
+CAMINHO_MEMBROS = "data/membros.json"
+CAMINHO_MINISTERIOS = "data/ministerios.json"
+CAMINHO_TURMAS = "data/escola_biblica.json"
+CAMINHO_AVISOS = "data/avisos.json"
+CAMINHO_DIZIMISTAS_MIGRADOS = "data/dizimistas_migrados.json"  # {nome: id do membro} na data da migração
+
+AVISO_PARA_MEMBROS = "Selecionar Membros"  # tipo_destinatario dos avisos enviados a membros escolhidos
+MEMBRO_REMOVIDO = "(membro removido)"
+
+_trava = threading.RLock()
+_indices = {"origem": None, "por_id": {}, "homonimos": set(), "ministerios": {}, "turmas": {}}
+_migracao = {"feita": False}
+
+
+def _parece_id(valor):
+    try:
+        uuid.UUID(str(valor))
+        return True
+    except ValueError:
+        return False
+
+
+# --- Migração (nomes -> ids) ---
+
+def _registrar_dizimistas(id_por_nome):
+    """Guarda o membro de cada nome de dizimista convertido (o primeiro registro de um nome vale para sempre)."""
+    registrados = repositorio.copia_editavel(repositorio.carregar(CAMINHO_DIZIMISTAS_MIGRADOS, padrao={}))
+    novos = {nome: id_membro for nome, id_membro in id_por_nome.items() if nome not in registrados}
+    if novos:
+        registrados.update(novos)
+        repositorio.salvar(CAMINHO_DIZIMISTAS_MIGRADOS, registrados)
+
+
+def _migrar_colecao(caminho, converter):
+    """Aplica converter(registro) -> bool (alterou?) a cada registro e grava a coleção se algo mudou."""
+    registros = repositorio.copia_editavel(repositorio.carregar(caminho))
+    alterados = sum(1 for registro in registros if converter(registro))
+    if alterados:
+        repositorio.salvar(caminho, registros)
+    return alterados
+
+
+def migrar():
+    """Troca os nomes de membros pelos ids em todas as referências; retorna {coleção: registros alterados}."""
+    with _trava:
+        membros = repositorio.carregar(CAMINHO_MEMBROS)
+        ids = {m.get("id") for m in membros}
+        ids_por_nome = {}
+        for membro in membros:
+            ids_por_nome.setdefault(membro.get("nome"), []).append(membro.get("id"))
+        id_por_nome = {nome: ids_nome[0] for nome, ids_nome in ids_por_nome.items() if len(ids_nome) == 1}
+        ambiguos, sem_membro = {}, set()
+
+        def _id(valor):
+            if valor in ids or not valor:
+                return valor
+            if valor in id_por_nome:
+                return id_por_nome[valor]
+            if valor in ids_por_nome:
+                ambiguos[valor] = ids_por_nome[valor]  # homônimos: não dá para saber qual é
+            elif not _parece_id(valor):
+                sem_membro.add(valor)
+            return valor
+
+        def _converter(registro, campo_unico, campo_lista):
+            antes = (registro.get(campo_unico), list(registro.get(campo_lista) or []))
+            if campo_unico in registro:
+                registro[campo_unico] = _id(registro[campo_unico])
+            if campo_lista in registro:
+                registro[campo_lista] = [_id(v) for v in registro[campo_lista] or []]
+            return antes != (registro.get(campo_unico), list(registro.get(campo_lista) or []))
+
+        def _converter_aviso(aviso):
+            if aviso.get("tipo_destinatario") != AVISO_PARA_MEMBROS:
+                return False
+            return _converter(aviso, None, "destinatarios")
+
+        _registrar_dizimistas({
+            dizimista: id_por_nome[dizimista]
+            for dizimista in livro_caixa.doacoes()
+            if dizimista in id_por_nome and dizimista not in ids
+        })
+        alterados = {
+            CAMINHO_MINISTERIOS: _migrar_colecao(CAMINHO_MINISTERIOS, lambda r: _converter(r, "responsavel", "membros")),
+            CAMINHO_TURMAS: _migrar_colecao(CAMINHO_TURMAS, lambda r: _converter(r, "professor", "alunos")),
+            CAMINHO_AVISOS: _migrar_colecao(CAMINHO_AVISOS, _converter_aviso),
+            livro_caixa.DIRETORIO_FINANCEIRO: livro_caixa.substituir_dizimistas(
+                {nome: id_membro for nome, id_membro in id_por_nome.items() if nome and nome not in ids}
+            ),
+        }
+        for dizimista in livro_caixa.doacoes():
+            _id(dizimista)  # só para avisar: nomes que sobraram no livro-caixa (inclusive exercícios encerrados)
+        for nome_membro, ids_nome in sorted(ambiguos.items()):
+            print(f"[AVISO] Referência '{nome_membro}' mantida como nome: {len(ids_nome)} membros com esse nome ({', '.join(ids_nome)}).")
+        if sem_membro:
+            print(f"[AVISO] Referências sem membro cadastrado, mantidas como nome: {', '.join(sorted(sem_membro))}.")
+        _migracao["feita"] = True
+        return alterados
+
+
+# --- Índices ---
+
+def _atualizar():
+    with _trava:
+        if not _migracao["feita"]:
+            migrar()
+        membros = repositorio.carregar(CAMINHO_MEMBROS)
+        ministerios = repositorio.carregar(CAMINHO_MINISTERIOS)
+        turmas = repositorio.carregar(CAMINHO_TURMAS)
+        origem = _indices["origem"]
+        if origem and origem[0] is membros and origem[1] is ministerios and origem[2] is turmas:
+            return _indices
+
+        por_id = {m.get("id"): m for m in membros}
+        vistos, homonimos = set(), set()
+        for m in membros:
+            (homonimos if m.get("nome") in vistos else vistos).add(m.get("nome"))
+        por_ministerio, por_turma = {}, {}
+        for ministerio in ministerios:
+            for id_membro in dict.fromkeys([ministerio.get("responsavel"), *ministerio.get("membros", ())]):
+                por_ministerio.setdefault(id_membro, []).append(ministerio)
+        for turma in turmas:
+            for id_membro in dict.fromkeys([turma.get("professor"), *turma.get("alunos", ())]):
+                por_turma.setdefault(id_membro, []).append(turma)
+        _indices.update(origem=(membros, ministerios, turmas), por_id=por_id, homonimos=homonimos, ministerios=por_ministerio, turmas=por_turma)
+        return _indices
+
+
+def membro(id_membro):
+    """Registro do membro (ou None)."""
+    return _atualizar()["por_id"].get(id_membro)
+
+
+def _nome(por_id, referencia):
+    if not referencia:
+        return ""
+    encontrado = por_id.get(referencia)
+    if encontrado is not None:
+        return encontrado.get("nome", "")
+    return MEMBRO_REMOVIDO if _parece_id(referencia) else referencia
+
+
+def nome(referencia):
+    """Nome para exibir: o do membro referenciado, o próprio texto (nomes antigos sem cadastro) ou MEMBRO_REMOVIDO."""
+    return _nome(_atualizar()["por_id"], referencia)
+
+
+def rotulo(referencia):
+    """Texto da opção em selectbox/multiselect (format_func): como nome(), mas sem repetir texto entre
+    opções diferentes, pois o Streamlit identifica a opção escolhida pelo texto exibido. Homônimos e
+    membros removidos levam o início do id; nomes antigos sem cadastro são marcados como tal."""
+    indices = _atualizar()
+    texto = _nome(indices["por_id"], referencia)
+    if not referencia or referencia in indices["por_id"] and texto not in indices["homonimos"]:
+        return texto
+    if referencia in indices["por_id"] or _parece_id(referencia):
+        return f"{texto} (#{str(referencia)[:8]})"
+    return f"{texto} (sem cadastro)"
+
+
+def nomes(referencias):
+    por_id = _atualizar()["por_id"]
+    return [_nome(por_id, r) for r in referencias or ()]
+
+
+def mapa_nomes(referencias):
+    """{referência: nome} das referências distintas, para exibir colunas inteiras (ex.: serie.map(mapa))."""
+    por_id = _atualizar()["por_id"]
+    return {r: _nome(por_id, r) for r in set(referencias)}
+
+
+def ministerios_do_membro(id_membro):
+    """Ministérios em que o membro é responsável ou participante."""
+    return list(_atualizar()["ministerios"].get(id_membro, ()))
+
+
+def turmas_do_membro(id_membro):
+    """Turmas da escola bíblica em que o membro é professor ou aluno."""
+    return list(_atualizar()["turmas"].get(id_membro, ()))
+
+
+if __name__ == "__main__":
+    for caminho, quantidade in migrar().items():
+        print(f"{caminho}: {quantidade} registro(s) convertido(s)")
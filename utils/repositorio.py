@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+
+# --- Repositório compartilhado das coleções em data/ ---
+
+ARMAZENAMENTO = os.environ.get("IGREJA_ARMAZENAMENTO", "json")
+
+_cache = {}
+_trava = threading.RLock()
+_estatisticas = {"acertos": 0, "falhas": 0, "escritas": 0}
+
+
+class RegistroSomenteLeitura(dict):
+    """Dicionário imutável entregue pelo repositório (use dict(registro) para obter uma cópia editável)."""
+
+    def _bloqueado(self, *args, **kwargs):
+        raise TypeError("Registro somente leitura: use as funções do repositório para alterar os dados.")
+
+    __setitem__ = __delitem__ = __ior__ = _bloqueado
+    clear = pop = popitem = setdefault = update = _bloqueado
+
+    def __reduce_ex__(self, protocolo):
+        # Cópias (copy/deepcopy/pickle) voltam como dict comum e editável
+        return (dict, (dict(self),))
+
+
+def _congelar(valor):
+    """Converte dicts/listas em estruturas somente leitura (recursivamente)."""
+    if isinstance(valor, RegistroSomenteLeitura):
+        return valor
+    if isinstance(valor, dict):
+        return RegistroSomenteLeitura((k, _congelar(v)) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def copia_editavel(valor):
+    """Retorna uma cópia comum (dicts e listas editáveis) de uma visão do repositório."""
+    if isinstance(valor, dict):
+        return {k: copia_editavel(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [copia_editavel(v) for v in valor]
+    return valor
+
+
+def _chave(caminho):
+    return os.path.normpath(os.fspath(caminho))
+
+
+def _assinatura(caminho):
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+
+def _colecao_sqlite(chave):
+    """Nome da tabela quando a coleção está no SQLite (None = arquivo JSON)."""
+    if ARMAZENAMENTO != "sqlite":
+        return None
+    from utils import armazenamento_sqlite
+    pasta, arquivo = os.path.split(chave)
+    nome, extensao = os.path.splitext(arquivo)
+    pasta_banco = os.path.dirname(armazenamento_sqlite.CAMINHO_BANCO)
+    if extensao == ".json" and pasta == os.path.normpath(pasta_banco) and nome in armazenamento_sqlite.COLECOES:
+        return nome
+    # Partições por ano (data/financeiro/2024.json -> tabela financeiro_2024)
+    pasta_colecao, colecao = os.path.split(pasta)
+    if (
+        extensao == ".json" and nome.isdigit() and pasta_colecao == os.path.normpath(pasta_banco)
+        and colecao in armazenamento_sqlite.COLECOES_PARTICIONADAS
+    ):
+        return f"{colecao}_{nome}"
+    return None
+
+
+def _sqlite():
+    from utils import armazenamento_sqlite
+    return armazenamento_sqlite
+
+
+def _colecao_sqlite_por_id(chave, campo_id):
+    """Coleção SQLite cujas linhas são identificadas por campo_id (senão usa o caminho genérico)."""
+    colecao = _colecao_sqlite(chave)
+    if colecao and campo_id == _sqlite().CHAVES.get(colecao, "id"):
+        return colecao
+    return None
+
+
+# --- Leitura ---
+
+def carregar(caminho, padrao=None):
+    """Retorna a coleção do arquivo JSON como visão somente leitura, relendo o arquivo só quando ele muda."""
+    chave = _chave(caminho)
+    if padrao is None:
+        padrao = []
+    with _trava:
+        colecao = _colecao_sqlite(chave)
+        assinatura = ("sqlite", _sqlite().versao(colecao)) if colecao else _assinatura(chave)
+        entrada = _cache.get(chave)
+        if entrada is not None and entrada[0] == assinatura:
+            _estatisticas["acertos"] += 1
+            return entrada[1]
+
+        _estatisticas["falhas"] += 1
+        dados = padrao
+        if colecao:
+            dados = _sqlite().carregar(colecao)
+        elif assinatura is not None:
+            try:
+                with open(chave, "r", encoding="utf-8") as f:
+                    conteudo = f.read()
+                dados = json.loads(conteudo) if conteudo.strip() else padrao
+            except json.JSONDecodeError:
+                dados = padrao
+        dados = _congelar(dados or padrao)
+        _cache[chave] = (assinatura, dados)
+        return dados
+
+
+def consultar(caminho, **filtros):
+    """Retorna os registros cujos campos batem com os filtros (no SQLite, via índices).
+
+    Como em SQL, campos ausentes ou None não batem com nenhum filtro, nem com um filtro None.
+    """
+    colecao = _colecao_sqlite(_chave(caminho))
+    if colecao:
+        return _congelar(_sqlite().consultar(colecao, **filtros))
+    return tuple(
+        r for r in carregar(caminho)
+        if all(r.get(c) is not None and v is not None and str(r.get(c)) == str(v) for c, v in filtros.items())
+    )
+
+
+def particoes(diretorio):
+    """Nomes das partições <diretorio>/<nome numérico>.json existentes (tabelas, no SQLite)."""
+    pasta = _chave(diretorio)
+    if _colecao_sqlite(os.path.join(pasta, "0000.json")):
+        return _sqlite().particoes(os.path.basename(pasta))
+    if not os.path.isdir(pasta):
+        return []
+    nomes = (os.path.splitext(arquivo) for arquivo in os.listdir(pasta))
+    return sorted(nome for nome, extensao in nomes if extensao == ".json" and nome.isdigit())
+
+
+def buscar(caminho, id_registro, chave="id"):
+    """Retorna o registro com o id informado (ou None)."""
+    if _colecao_sqlite_por_id(_chave(caminho), chave):
+        return next(iter(consultar(caminho, id=id_registro)), None)
+    return next((r for r in carregar(caminho) if r.get(chave) == id_registro), None)
+
+
+# --- Escrita ---
+
+def salvar(caminho, dados, indent=4):
+    """Grava a coleção inteira de forma atômica e já atualiza o cache."""
+    chave = _chave(caminho)
+    colecao = _colecao_sqlite(chave)
+    with _trava:
+        if colecao:
+            _sqlite().substituir(colecao, dados)
+            assinatura = ("sqlite", _sqlite().versao(colecao))
+        else:
+            os.makedirs(os.path.dirname(chave) or ".", exist_ok=True)
+            temporario = f"{chave}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(dados, f, indent=indent, ensure_ascii=False)
+            os.replace(temporario, chave)
+            assinatura = _assinatura(chave)
+        _estatisticas["escritas"] += 1
+        _cache[chave] = (assinatura, _congelar(dados))
+
+
+def _registrar_escrita_sqlite(chave, colecao, versao_anterior, aplicar):
+    """Atualiza o cache em memória após gravar uma linha, sem reler a tabela inteira."""
+    _estatisticas["escritas"] += 1
+    entrada = _cache.pop(chave, None)
+    versao_nova = _sqlite().versao(colecao)
+    # Só aproveita o cache se ninguém mais gravou na coleção entre as duas versões
+    if entrada is not None and entrada[0] == ("sqlite", versao_anterior) and versao_nova == versao_anterior + 1:
+        _cache[chave] = (("sqlite", versao_nova), aplicar(entrada[1]))
+
+
+def inserir(caminho, registro):
+    """Acrescenta um registro ao final da coleção."""
+    chave = _chave(caminho)
+    colecao = _colecao_sqlite(chave)
+    with _trava:
+        if colecao:
+            versao_anterior = _sqlite().versao(colecao)
+            _sqlite().inserir(colecao, registro)
+            _registrar_escrita_sqlite(chave, colecao, versao_anterior, lambda dados: dados + (_congelar(registro),))
+            return
+        salvar(caminho, carregar(caminho) + (registro,))
+
+
+def atualizar(caminho, id_registro, alteracoes, chave="id"):
+    """Aplica as alterações ao registro com o id informado. Retorna False se ele não existir."""
+    chave_cache = _chave(caminho)
+    colecao = _colecao_sqlite_por_id(chave_cache, chave)
+    with _trava:
+        if colecao:
+            atual = buscar(caminho, id_registro, chave)
+            if atual is None:
+                return False
+            novo = _congelar({**atual, **alteracoes})
+            versao_anterior = _sqlite().versao(colecao)
+            _sqlite().atualizar(colecao, id_registro, novo)
+            _registrar_escrita_sqlite(chave_cache, colecao, versao_anterior, lambda dados: tuple(
+                novo if r.get(chave) == id_registro else r for r in dados
+            ))
+            return True
+
+        dados = carregar(caminho)
+        posicao = next((i for i, r in enumerate(dados) if r.get(chave) == id_registro), None)
+        if posicao is None:
+            return False
+        novo = {**dados[posicao], **alteracoes}
+        salvar(caminho, dados[:posicao] + (novo,) + dados[posicao + 1:])
+        return True
+
+
+def remover(caminho, id_registro, chave="id"):
+    """Remove o registro com o id informado. Retorna False se ele não existir."""
+    chave_cache = _chave(caminho)
+    colecao = _colecao_sqlite_por_id(chave_cache, chave)
+    with _trava:
+        if colecao:
+            versao_anterior = _sqlite().versao(colecao)
+            if not _sqlite().remover(colecao, id_registro):
+                return False
+            _registrar_escrita_sqlite(chave_cache, colecao, versao_anterior, lambda dados: tuple(
+                r for r in dados if r.get(chave) != id_registro
+            ))
+            return True
+
+        dados = carregar(caminho)
+        restantes = tuple(r for r in dados if r.get(chave) != id_registro)
+        if len(restantes) == len(dados):
+            return False
+        salvar(caminho, restantes)
+        return True
+
+
+# --- Diagnóstico ---
+
+def estatisticas():
+    """Retorna os contadores de acertos/falhas do cache e o número de coleções em memória."""
+    with _trava:
+        total = _estatisticas["acertos"] + _estatisticas["falhas"]
+        return {
+            **_estatisticas,
+            "taxa_acerto": (_estatisticas["acertos"] / total) if total else 0.0,
+            "colecoes_em_cache": len(_cache),
+        }
+
+
+def limpar_cache():
+    """Descarta todas as coleções em memória (a próxima leitura relê os arquivos)."""
+    with _trava:
+        _cache.clear()
@@ -0,0 +1,601 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from utils import agregados_respostas, definicoes_formularios, repositorio
+
+# --- Respostas dos formulários (JSON Lines por formulário, só acréscimo) ---
+
+DIRETORIO_RESPOSTAS = os.path.join("data", "respostas")
+CAMINHO_MANIFESTO = os.path.join(DIRETORIO_RESPOSTAS, "manifesto.json")
+CAMINHO_RESPOSTAS_JSONL = os.path.join("data", "respostas_formularios.jsonl")
+CAMINHO_RESPOSTAS_LEGADO = os.path.join("data", "respostas_formularios.json")
+
+MARCADOR_REMOCAO = "_removida"
+LIMITE_LAPIDES = 100  # compacta em segundo plano a partir de quantas lápides por formulário
+INTERVALO_LOTE = 0.005  # segundos que o escritor espera juntando envios antes de gravar
+TAMANHO_MAXIMO_LOTE = 500
+TEMPO_LIMITE_CONFIRMACAO = 30  # segundos que um envio aguarda a gravação do seu lote
+LIMITE_TOKENS_RECENTES = 10000  # tokens de envio lembrados (os mais antigos saem primeiro)
+
+_trava = threading.RLock()
+_compactacao_ativa = threading.Lock()
+
+_fila = queue.Queue()
+_escritor = {"thread": None}
+_metricas = {"lotes": 0, "respostas": 0, "maior_lote": 0, "latencia_total": 0.0, "ultima_latencia": 0.0, "duplicadas": 0}
+
+_colunares = {}
+
+_tokens_recentes = OrderedDict()
+_trava_tokens = threading.Lock()
+
+
+def _caminho_particao(id_formulario):
+    """Arquivo das respostas de um formulário (o id é limpo para não escapar do diretório)."""
+    nome = re.sub(r"[^A-Za-z0-9_-]", "_", str(id_formulario))
+    return os.path.join(DIRETORIO_RESPOSTAS, f"{nome}.jsonl")
+
+
+def _caminho_agregados(id_formulario):
+    return f"{os.path.splitext(_caminho_particao(id_formulario))[0]}.agregados.json"
+
+
+def _caminho_colunas(id_formulario):
+    return f"{os.path.splitext(_caminho_particao(id_formulario))[0]}.colunas.json"
+
+
+# --- Manifesto (contadores por formulário) ---
+# Para cada formulário: número de respostas, data/hora da última e o tamanho da partição
+# logo após a última gravação registrada. Se o tamanho real divergir (queda entre o
+# acréscimo e a atualização do manifesto, ou edição manual), a partição é recontada.
+
+def _ler_manifesto():
+    return repositorio.copia_editavel(repositorio.carregar(CAMINHO_MANIFESTO, padrao={}))
+
+
+def _gravar_manifesto(manifesto):
+    repositorio.salvar(CAMINHO_MANIFESTO, manifesto)
+
+
+def _tamanho_particao(id_formulario):
+    caminho = _caminho_particao(id_formulario)
+    return os.path.getsize(caminho) if os.path.exists(caminho) else 0
+
+
+def _assinatura_particao(id_formulario):
+    """(inode, tamanho, mtime em ns) da partição, ou None se ela não existir.
+
+    Muda quando a partição recebe linhas e também quando é reescrita (compactação, edição
+    manual), mesmo que o tamanho final seja igual ou maior que o anterior.
+    """
+    try:
+        info = os.stat(_caminho_particao(id_formulario))
+    except FileNotFoundError:
+        return None
+    return (info.st_ino, info.st_size, info.st_mtime_ns)
+
+
+def _em_dia(agregados, plano, assinatura):
+    """Os agregados correspondem a esta versão da partição e do formulário?"""
+    return (
+        agregados.get("formato") == agregados_respostas.FORMATO
+        and agregados.get("plano") == plano["versao"]
+        and tuple(agregados.get("particao") or ()) == tuple(assinatura or ())
+    )
+
+
+def _recontar(id_formulario):
+    """Recalcula os contadores de uma partição lendo o arquivo."""
+    caminho = _caminho_particao(id_formulario)
+    removidas = {r[MARCADOR_REMOCAO] for r in _ler_linhas(caminho) if MARCADOR_REMOCAO in r}
+    total = 0
+    ultima = None
+    for registro in _ler_linhas(caminho):
+        if MARCADOR_REMOCAO in registro or registro.get("id_resposta") in removidas:
+            continue
+        total += 1
+        ultima = registro.get("enviado_em", ultima)
+    return {"respostas": total, "ultima_resposta": ultima, "bytes": _tamanho_particao(id_formulario)}
+
+
+def _atualizar_contadores(id_formulario, delta, enviado_em=None):
+    """Aplica a gravação recém-feita aos contadores do formulário (chamada com a trava tomada)."""
+    manifesto = _ler_manifesto()
+    entrada = manifesto.get(id_formulario, {"respostas": 0, "ultima_resposta": None, "bytes": 0})
+    entrada["respostas"] = max(0, entrada["respostas"] + delta)
+    if enviado_em:
+        entrada["ultima_resposta"] = enviado_em
+    entrada["bytes"] = _tamanho_particao(id_formulario)
+    manifesto[id_formulario] = entrada
+    _gravar_manifesto(manifesto)
+
+
+# --- Agregados por campo ---
+
+def _atualizar_agregados(id_formulario, respostas, assinatura_anterior):
+    """Soma o lote aos agregados, se eles estavam em dia com a partição antes do acréscimo (senão ficam para recalcular)."""
+    plano = definicoes_formularios.obter_plano(id_formulario)
+    atual = repositorio.carregar(_caminho_agregados(id_formulario), padrao={})
+    if plano is None or not _em_dia(atual, plano, assinatura_anterior):
+        return
+    agregados = repositorio.copia_editavel(atual)
+    for resposta in respostas:
+        agregados_respostas.acumular(agregados, plano, resposta)
+    agregados["particao"] = list(_assinatura_particao(id_formulario))
+    repositorio.salvar(_caminho_agregados(id_formulario), agregados)
+
+
+# --- Tabela em colunas ---
+
+def _converter(tipo, valor):
+    """Tipo da coluna conforme o campo: número -> float, checkbox -> bool, demais -> texto."""
+    if valor in (None, ""):
+        return False if tipo == "checkbox" else None
+    if tipo == "numero":
+        try:
+            return float(valor)
+        except (TypeError, ValueError):
+            return None
+    if tipo == "checkbox":
+        return bool(valor)
+    return valor if isinstance(valor, str) else str(valor)
+
+
+def _tabela_vazia():
+    return {"particao": None, "plano": None, "bytes": 0, "id_resposta": [], "enviado_em": [], "colunas": {}}
+
+
+def _anexar(tabela, plano, registro):
+    """Acrescenta uma linha da partição à tabela (ou retira a resposta, se for uma lápide)."""
+    ids = tabela["id_resposta"]
+    if MARCADOR_REMOCAO in registro:
+        if registro[MARCADOR_REMOCAO] in ids:
+            posicao = ids.index(registro[MARCADOR_REMOCAO])
+            for lista in [ids, tabela["enviado_em"], *tabela["colunas"].values()]:
+                del lista[posicao]
+        return
+    tipos = {c["coluna"]: c["tipo"] for c in plano["campos"]} if plano else {}
+    valores = definicoes_formularios.valores_por_coluna(plano, registro.get("respostas", {}))
+    total = len(ids)
+    for coluna in valores.keys() - tabela["colunas"].keys():
+        tabela["colunas"][coluna] = [_converter(tipos.get(coluna), None)] * total
+    for coluna, lista in tabela["colunas"].items():
+        lista.append(_converter(tipos.get(coluna), valores.get(coluna)))
+    ids.append(registro.get("id_resposta"))
+    tabela["enviado_em"].append(registro.get("enviado_em"))
+
+
+def _estender(tabela, plano, caminho):
+    """Lê a partição a partir de onde a tabela parou, só até a última linha completa."""
+    with open(caminho, "rb") as f:
+        f.seek(tabela["bytes"])
+        for linha in f:
+            if not linha.endswith(b"\n"):
+                break  # gravação em andamento ou interrompida: fica para a próxima leitura
+            tabela["bytes"] += len(linha)
+            try:
+                _anexar(tabela, plano, json.loads(linha))
+            except json.JSONDecodeError:
+                continue
+
+
+def _ler_ponto_partida(id_formulario):
+    try:
+        with open(_caminho_colunas(id_formulario), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _gravar_ponto_partida(id_formulario, tabela):
+    caminho = _caminho_colunas(id_formulario)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(tabela, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def _tabela(id_formulario):
+    """Tabela em colunas do formulário em dia com a partição (chamada com a trava tomada)."""
+    assinatura = _assinatura_particao(id_formulario)
+    if assinatura is None:
+        _colunares.pop(id_formulario, None)
+        return _tabela_vazia()
+
+    plano = definicoes_formularios.obter_plano(id_formulario)
+    versao_plano = plano["versao"] if plano else None
+    tabela = _colunares.get(id_formulario) or _ler_ponto_partida(id_formulario)
+    # A assinatura guardada só acompanha os acréscimos feitos por _gravar_lote; qualquer
+    # outra mudança da partição (ou do formulário) reconstrói a tabela
+    reconstruir = (
+        tabela is None
+        or tabela.get("plano") != versao_plano
+        or tuple(tabela.get("particao") or ()) != assinatura
+    )
+    if reconstruir:
+        tabela = _tabela_vazia()
+        tabela.update(particao=list(assinatura), plano=versao_plano)
+    if tabela["bytes"] < assinatura[1]:
+        _estender(tabela, plano, _caminho_particao(id_formulario))
+    if reconstruir:
+        _gravar_ponto_partida(id_formulario, tabela)
+    _colunares[id_formulario] = tabela
+    return tabela
+
+
+def _acompanhar_acrescimo(id_formulario, assinatura_anterior):
+    """Depois de um acréscimo: a tabela em memória que estava em dia só precisa ler as linhas novas."""
+    tabela = _colunares.get(id_formulario)
+    if tabela is not None and tuple(tabela.get("particao") or ()) == tuple(assinatura_anterior or ()):
+        tabela["particao"] = list(_assinatura_particao(id_formulario))
+
+
+# --- Migração ---
+
+def _migrar_legado():
+    """Distribui as respostas do formato antigo (arquivo único) nas partições por formulário (uma única vez)."""
+    if os.path.exists(CAMINHO_MANIFESTO):
+        return
+    if os.path.exists(CAMINHO_RESPOSTAS_JSONL):
+        origem = CAMINHO_RESPOSTAS_JSONL
+        linhas = list(_ler_linhas(origem))
+        removidas = {r[MARCADOR_REMOCAO] for r in linhas if MARCADOR_REMOCAO in r}
+        legado = [r for r in linhas if MARCADOR_REMOCAO not in r and r.get("id_resposta") not in removidas]
+    elif os.path.exists(CAMINHO_RESPOSTAS_LEGADO):
+        origem = None
+        try:
+            with open(CAMINHO_RESPOSTAS_LEGADO, "r", encoding="utf-8") as f:
+                conteudo = f.read()
+            legado = json.loads(conteudo) if conteudo.strip() else []
+        except json.JSONDecodeError as e:
+            print(f"[ERRO] Falha ao migrar respostas antigas: {e}")
+            legado = []
+    else:
+        origem = None
+        legado = []
+
+    por_formulario = {}
+    for resposta in legado:
+        por_formulario.setdefault(resposta.get("id_formulario"), []).append(resposta)
+    for id_formulario, lista in por_formulario.items():
+        _reescrever(id_formulario, lista)
+    _gravar_manifesto({id_formulario: _recontar(id_formulario) for id_formulario in por_formulario})
+    if origem:
+        os.replace(origem, f"{origem}.migrado")
+
+
+# --- Leitura/Escrita das partições ---
+
+def _reescrever(id_formulario, respostas):
+    """Grava a partição inteira de forma atômica (usado na migração e na compactação)."""
+    caminho = _caminho_particao(id_formulario)
+    os.makedirs(DIRETORIO_RESPOSTAS, exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        for resposta in respostas:
+            f.write(json.dumps(resposta, ensure_ascii=False) + "\n")
+    os.replace(temporario, caminho)
+
+
+def _acrescentar(id_formulario, registros):
+    """Acrescenta as linhas à partição com um único write() em modo O_APPEND, seguido de fsync()."""
+    conteudo = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros).encode("utf-8")
+    os.makedirs(DIRETORIO_RESPOSTAS, exist_ok=True)
+    descritor = os.open(_caminho_particao(id_formulario), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(descritor, conteudo)
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+
+def _ler_linhas(caminho):
+    """Percorre um arquivo JSON Lines linha a linha, devolvendo os registros já decodificados."""
+    if not os.path.exists(caminho):
+        return
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                continue  # linha incompleta (ex.: queda durante a gravação)
+
+
+def _linhas(id_formulario):
+    with _trava:
+        _migrar_legado()
+    return _ler_linhas(_caminho_particao(id_formulario))
+
+
+def _removidas(id_formulario):
+    return {r[MARCADOR_REMOCAO] for r in _linhas(id_formulario) if MARCADOR_REMOCAO in r}
+
+
+# --- Fila de gravação (group commit) ---
+
+def _gravar_lote(lote):
+    """Grava um lote de envios: uma escrita por formulário e uma atualização do manifesto por formulário.
+
+    Retorna {id_formulario: erro} dos formulários cujas respostas não chegaram à partição.
+    """
+    por_formulario = {}
+    for pedido in lote:
+        por_formulario.setdefault(pedido["resposta"]["id_formulario"], []).append(pedido["resposta"])
+    falhas = {}
+    with _trava:
+        _migrar_legado()
+        for id_formulario, respostas in por_formulario.items():
+            assinatura_anterior = _assinatura_particao(id_formulario)
+            try:
+                _acrescentar(id_formulario, respostas)
+            except Exception as e:
+                falhas[id_formulario] = e
+                continue
+            try:
+                _atualizar_contadores(id_formulario, len(respostas), respostas[-1].get("enviado_em"))
+                _acompanhar_acrescimo(id_formulario, assinatura_anterior)
+                _atualizar_agregados(id_formulario, respostas, assinatura_anterior)
+            except Exception as e:
+                # As respostas já estão gravadas; manifesto e agregados serão recalculados na próxima leitura
+                print(f"[AVISO] Falha ao atualizar contadores/agregados do formulário {id_formulario}: {e}")
+    return falhas
+
+
+def _executar_escritor():
+    while True:
+        lote = [_fila.get()]
+        time.sleep(INTERVALO_LOTE)
+        while len(lote) < TAMANHO_MAXIMO_LOTE:
+            try:
+                lote.append(_fila.get_nowait())
+            except queue.Empty:
+                break
+
+        inicio = time.perf_counter()
+        try:
+            falhas = _gravar_lote(lote)
+        except Exception as e:  # antes de qualquer escrita (ex.: migração dos dados antigos)
+            falhas = {pedido["resposta"]["id_formulario"]: e for pedido in lote}
+        for pedido in lote:
+            pedido["erro"] = falhas.get(pedido["resposta"]["id_formulario"])
+        if falhas:
+            print(f"[ERRO] Falha ao gravar respostas de {len(falhas)} formulário(s): {next(iter(falhas.values()))}")
+        latencia = time.perf_counter() - inicio
+
+        with _trava:
+            _metricas["lotes"] += 1
+            _metricas["respostas"] += len(lote)
+            _metricas["maior_lote"] = max(_metricas["maior_lote"], len(lote))
+            _metricas["latencia_total"] += latencia
+            _metricas["ultima_latencia"] = latencia
+        for pedido in lote:
+            pedido["gravado"].set()
+
+
+def _iniciar_escritor():
+    with _trava:
+        if _escritor["thread"] is None or not _escritor["thread"].is_alive():
+            _escritor["thread"] = threading.Thread(target=_executar_escritor, name="escritor-respostas", daemon=True)
+            _escritor["thread"].start()
+
+
+def metricas_fila():
+    """Profundidade da fila e latência das gravações em lote (em milissegundos)."""
+    with _trava:
+        lotes = _metricas["lotes"]
+        return {
+            "profundidade": _fila.qsize(),
+            "lotes": lotes,
+            "respostas": _metricas["respostas"],
+            "maior_lote": _metricas["maior_lote"],
+            "media_por_lote": (_metricas["respostas"] / lotes) if lotes else 0.0,
+            "latencia_ultima_ms": _metricas["ultima_latencia"] * 1000,
+            "latencia_media_ms": (_metricas["latencia_total"] / lotes * 1000) if lotes else 0.0,
+            "duplicadas": _metricas["duplicadas"],
+        }
+
+
+# --- Tokens de envio ---
+
+def _reservar_token(token):
+    """Registra o token no índice de envios recentes. Retorna False se ele já foi usado."""
+    with _trava_tokens:
+        if token in _tokens_recentes:
+            _metricas["duplicadas"] += 1
+            return False
+        _tokens_recentes[token] = True
+        if len(_tokens_recentes) > LIMITE_TOKENS_RECENTES:
+            _tokens_recentes.popitem(last=False)
+        return True
+
+
+def _liberar_token(token):
+    with _trava_tokens:
+        _tokens_recentes.pop(token, None)
+
+
+# --- API pública ---
+
+def registrar_resposta(resposta):
+    """Enfileira a resposta e só retorna depois que o lote dela foi gravado no disco.
+
+    Retorna False, sem gravar nada, se o id_resposta (token de envio) já foi registrado.
+    """
+    token = resposta.get("id_resposta")
+    if token and not _reservar_token(token):
+        return False
+    pedido = {"resposta": resposta, "gravado": threading.Event(), "erro": None}
+    _iniciar_escritor()
+    _fila.put(pedido)
+    if not pedido["gravado"].wait(TEMPO_LIMITE_CONFIRMACAO):
+        raise TimeoutError("A gravação da resposta não foi confirmada a tempo.")
+    if pedido["erro"] is not None:
+        _liberar_token(token)  # permite tentar de novo com o mesmo token
+        raise pedido["erro"]
+    return True
+
+
+def remover_resposta(id_formulario, id_resposta):
+    """Marca a resposta como removida; a compactação libera o espaço depois.
+
+    Retorna False, sem gravar nada, se a resposta não existe ou já foi removida.
+    """
+    with _trava:
+        _migrar_legado()
+        # A tabela em colunas só tem as respostas vivas (as lápides já foram aplicadas a ela)
+        if id_resposta not in _tabela(id_formulario)["id_resposta"]:
+            return False
+        assinatura_anterior = _assinatura_particao(id_formulario)
+        _acrescentar(id_formulario, [{MARCADOR_REMOCAO: id_resposta}])
+        _acompanhar_acrescimo(id_formulario, assinatura_anterior)
+        _atualizar_contadores(id_formulario, -1)
+    if len(_removidas(id_formulario)) >= LIMITE_LAPIDES:
+        compactar_em_segundo_plano(id_formulario)
+    return True
+
+
+def iterar_respostas(id_formulario=None):
+    """Lê as respostas em fluxo; com id_formulario, só a partição desse formulário é aberta."""
+    if id_formulario is None:
+        for id_particao in formularios_com_respostas():
+            yield from iterar_respostas(id_particao)
+        return
+    removidas = _removidas(id_formulario)
+    for registro in _linhas(id_formulario):
+        if MARCADOR_REMOCAO in registro or registro.get("id_resposta") in removidas:
+            continue
+        yield registro
+
+
+def resumo_respostas():
+    """Retorna {id_formulario: {"respostas", "ultima_resposta"}} a partir do manifesto, sem ler respostas.
+
+    Só as partições cujo tamanho não bate com o registrado no manifesto são recontadas.
+    """
+    with _trava:
+        _migrar_legado()
+        manifesto = _ler_manifesto()
+        divergentes = [i for i, info in manifesto.items() if info.get("bytes") != _tamanho_particao(i)]
+        if divergentes:
+            for id_formulario in divergentes:
+                manifesto[id_formulario] = _recontar(id_formulario)
+            _gravar_manifesto(manifesto)
+        return {
+            id_formulario: {"respostas": info.get("respostas", 0), "ultima_resposta": info.get("ultima_resposta")}
+            for id_formulario, info in manifesto.items()
+        }
+
+
+def contagens():
+    """Retorna {id_formulario: número de respostas}."""
+    return {id_formulario: info["respostas"] for id_formulario, info in resumo_respostas().items()}
+
+
+def tabela_respostas(id_formulario):
+    """Respostas do formulário em colunas prontas para um DataFrame: {rótulo: lista de valores}.
+
+    As colunas dos campos seguem a ordem do formulário e usam a pergunta atual como rótulo.
+    """
+    with _trava:
+        _migrar_legado()
+        tabela = _tabela(id_formulario)
+        plano = definicoes_formularios.obter_plano(id_formulario)
+        # Cópias rasas: outra sessão pode estender a tabela enquanto o DataFrame é montado
+        colunas = {"Enviado em": list(tabela["enviado_em"]), "ID Resposta": list(tabela["id_resposta"])}
+        rotulos = {c["coluna"]: c["pergunta"] for c in plano["campos"]} if plano else {}
+        ordem = [c for c in rotulos if c in tabela["colunas"]] + [c for c in tabela["colunas"] if c not in rotulos]
+        for coluna in ordem:
+            rotulo = rotulos.get(coluna, coluna)
+            while rotulo in colunas:
+                rotulo += " "  # perguntas repetidas viram colunas distintas
+            colunas[rotulo] = list(tabela["colunas"][coluna])
+        return colunas
+
+
+def agregados(id_formulario):
+    """Agregados por campo do formulário, recalculados só se a partição mudou por fora dos envios."""
+    with _trava:
+        _migrar_legado()
+        plano = definicoes_formularios.obter_plano(id_formulario)
+        if plano is None:
+            return None
+        atual = repositorio.carregar(_caminho_agregados(id_formulario), padrao={})
+        assinatura = _assinatura_particao(id_formulario)
+        if _em_dia(atual, plano, assinatura):
+            return atual
+        novos = agregados_respostas.novos_agregados(plano)
+        for resposta in iterar_respostas(id_formulario):
+            agregados_respostas.acumular(novos, plano, resposta)
+        novos["plano"] = plano["versao"]
+        novos["particao"] = list(assinatura) if assinatura else None
+        repositorio.salvar(_caminho_agregados(id_formulario), novos)
+        return repositorio.carregar(_caminho_agregados(id_formulario))
+
+
+def formularios_com_respostas():
+    return [id_formulario for id_formulario, total in contagens().items() if total > 0]
+
+
+def existem_respostas():
+    return bool(formularios_com_respostas())
+
+
+# --- Compactação ---
+
+def compactar(id_formulario):
+    """Reescreve a partição sem as respostas removidas e sem as lápides. Retorna quantas linhas foram descartadas."""
+    with _trava:
+        removidas = _removidas(id_formulario)
+        if not removidas:
+            return 0
+        descartadas = 0
+
+        def _mantidas():
+            nonlocal descartadas
+            for registro in _linhas(id_formulario):
+                if MARCADOR_REMOCAO in registro or registro.get("id_resposta") in removidas:
+                    descartadas += 1
+                    continue
+                yield registro
+
+        _reescrever(id_formulario, _mantidas())
+        # A compactação também corrige os contadores do manifesto e renova o ponto de partida das colunas
+        manifesto = _ler_manifesto()
+        manifesto[id_formulario] = _recontar(id_formulario)
+        _gravar_manifesto(manifesto)
+        _colunares.pop(id_formulario, None)
+        _tabela(id_formulario)
+        return descartadas
+
+
+def compactar_todos():
+    with _trava:
+        _migrar_legado()
+        return sum(compactar(id_formulario) for id_formulario in _ler_manifesto())
+
+
+def compactar_em_segundo_plano(id_formulario):
+    """Dispara a compactação de uma partição em uma thread separada (no máximo uma por vez)."""
+    if not _compactacao_ativa.acquire(blocking=False):
+        return
+
+    def _executar():
+        try:
+            compactar(id_formulario)
+        except Exception as e:
+            print(f"[ERRO] Falha ao compactar respostas: {e}")
+        finally:
+            _compactacao_ativa.release()
+
+    threading.Thread(target=_executar, name="compactacao-respostas", daemon=True).start()
+
+
+if __name__ == "__main__":
+    print(f"{compactar_todos()} linha(s) descartada(s) na compactação.")